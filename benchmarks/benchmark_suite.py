@@ -0,0 +1,153 @@
+"""
+benchmark suite for mapping construction, encoding and decoding across symbol sizes and batch sizes
+
+reports time per call, throughput and peak memory (tracemalloc) for each entry point, saves the results as JSON,
+and compares results to a saved baseline to flag slowdowns between commits
+
+usage -
+    python -m benchmarks.benchmark_suite --output results.json
+    python -m benchmarks.benchmark_suite --output new.json --compare results.json --threshold 1.25
+"""
+import argparse
+import json
+import platform
+import sys
+import time
+import tracemalloc
+
+import numpy as np
+
+from symbol_generation.probe_decoding import cistercian_to_arabic_probe
+from symbol_generation.symbol_mapping import create_symbols
+from symbol_generation.translating_cistercian_symbols import arabic_to_cistercian, cistercian_to_arabic, \
+    arabic_to_cistercian_batch, cistercian_to_arabic_batch
+
+DEFAULT_SIZES = [(7, 5), (17, 15), (64, 64), (128, 128), (256, 256), (512, 512)]
+DEFAULT_BATCH_SIZES = [1, 100, 1000, 10000]
+MAX_BATCH_PIXELS = 2 ** 27  # batch benchmarks larger than this are skipped
+MIN_SECONDS = 0.2  # each benchmark is repeated until it ran at least this long
+MAX_REPEATS = 1000
+DEFAULT_THRESHOLD = 1.25
+
+
+def measure(func, items_per_call: int = 1) -> dict:
+    """ time per call (best of the repeats), throughput and peak memory of a single call """
+    tracemalloc.start()
+    func()
+    _, peak_memory = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    timings = []
+    total_start = time.perf_counter()
+    while len(timings) < MAX_REPEATS and (time.perf_counter() - total_start < MIN_SECONDS or len(timings) < 3):
+        start = time.perf_counter()
+        func()
+        timings.append(time.perf_counter() - start)
+
+    seconds = min(timings)
+    return {
+        'seconds': seconds,
+        'items_per_second': items_per_call / seconds if seconds > 0 else float('inf'),
+        'peak_memory_bytes': peak_memory,
+        'repeats': len(timings),
+    }
+
+
+def _benchmarks(sizes: list, batch_sizes: list):
+    """ yield (name, height, width, batch size, function) """
+    numbers = np.random.default_rng(0).integers(0, 10000, size=max(batch_sizes))
+    for height, width in sizes:
+        mapping = create_symbols(symbol_height=height, symbol_width=width)
+        cistercian = arabic_to_cistercian(1993, symbol_height=height, symbol_width=width, symbol_mapping=mapping)
+
+        yield 'create_symbols', height, width, 1, lambda: create_symbols(symbol_height=height, symbol_width=width)
+        yield 'arabic_to_cistercian', height, width, 1, lambda: arabic_to_cistercian(
+            1993, symbol_height=height, symbol_width=width, symbol_mapping=mapping)
+        yield 'cistercian_to_arabic', height, width, 1, lambda: cistercian_to_arabic(cistercian, mapping)
+
+        for batch_size in batch_sizes:
+            if batch_size * height * width > MAX_BATCH_PIXELS:
+                continue
+            batch = numbers[:batch_size]
+            symbols = arabic_to_cistercian_batch(batch, symbol_height=height, symbol_width=width)
+            yield 'arabic_to_cistercian_batch', height, width, batch_size, lambda: arabic_to_cistercian_batch(
+                batch, symbol_height=height, symbol_width=width)
+            yield 'cistercian_to_arabic_batch', height, width, batch_size, lambda: cistercian_to_arabic_batch(
+                symbols, mapping)
+            yield 'cistercian_to_arabic_probe', height, width, batch_size, lambda: cistercian_to_arabic_probe(
+                symbols)
+
+
+def run_benchmarks(sizes: list = None, batch_sizes: list = None, verbose: bool = False) -> list:
+    results = []
+    for name, height, width, batch_size, func in _benchmarks(sizes or DEFAULT_SIZES,
+                                                             batch_sizes or DEFAULT_BATCH_SIZES):
+        result = {'name': name, 'height': height, 'width': width, 'batch_size': batch_size,
+                  **measure(func, items_per_call=batch_size)}
+        results.append(result)
+        if verbose:
+            print(f"{name:28s} {height:4d}x{width:<4d} batch {batch_size:6d}: {result['seconds'] * 1e3:10.3f} ms "
+                  f"{result['items_per_second']:12.0f}/s peak {result['peak_memory_bytes'] / 2 ** 20:9.2f} MiB")
+    return results
+
+
+def save_results(results: list, path: str):
+    with open(path, 'w') as f:
+        json.dump({
+            'python': sys.version,
+            'numpy': np.__version__,
+            'platform': platform.platform(),
+            'timestamp': time.time(),
+            'results': results,
+        }, f, indent=2)
+
+
+def load_results(path: str) -> list:
+    with open(path) as f:
+        return json.load(f)['results']
+
+
+def _result_key(result: dict) -> tuple:
+    return result['name'], result['height'], result['width'], result['batch_size']
+
+
+def compare_results(baseline: list, current: list, threshold: float = DEFAULT_THRESHOLD) -> list:
+    """ return the benchmarks of current that are slower than baseline by more than the threshold ratio """
+    baseline_by_key = {_result_key(result): result for result in baseline}
+    regressions = []
+    for result in current:
+        baseline_result = baseline_by_key.get(_result_key(result))
+        if baseline_result is None or baseline_result['seconds'] <= 0:
+            continue
+        ratio = result['seconds'] / baseline_result['seconds']
+        if ratio > threshold:
+            regressions.append({**result, 'baseline_seconds': baseline_result['seconds'], 'ratio': ratio})
+    return regressions
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--output', '-o', help="JSON file to save the results to")
+    parser.add_argument('--compare', '-c', help="baseline JSON results to compare to")
+    parser.add_argument('--threshold', type=float, default=DEFAULT_THRESHOLD,
+                        help="slowdown ratio above which a benchmark is flagged")
+    parser.add_argument('--quick', action='store_true', help="small sizes and batches only")
+    args = parser.parse_args(argv)
+
+    sizes, batch_sizes = (DEFAULT_SIZES[:3], DEFAULT_BATCH_SIZES[:3]) if args.quick else (None, None)
+    results = run_benchmarks(sizes=sizes, batch_sizes=batch_sizes, verbose=True)
+    if args.output:
+        save_results(results, args.output)
+
+    if args.compare:
+        regressions = compare_results(load_results(args.compare), results, threshold=args.threshold)
+        for regression in regressions:
+            print(f"SLOWER {regression['name']} {regression['height']}x{regression['width']} "
+                  f"batch {regression['batch_size']}: {regression['ratio']:.2f}x "
+                  f"({regression['baseline_seconds'] * 1e3:.3f} ms -> {regression['seconds'] * 1e3:.3f} ms)")
+        return 1 if regressions else 0
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,41 +1,207 @@
 """
 CLI script to create Cistercian number symbols
+
+without a command - interactive mode, shows the mapping and then the symbols of numbers entered one at a time
+commands for scripts -
+ - encode: encode a range or a file of numbers to a directory of images or to a .npy archive
+ - decode: decode a directory of symbol images (.pgm, .png, .npy) of any size
+ - atlas: dump the atlas of all 10,000 symbols to an atlas file, to a .pgm / .png sheet or to a .svg vector sheet
 """
 import argparse
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
 
+from symbol_generation.atlas_file import write_atlas_file
+from symbol_generation.glyph_atlas import GlyphAtlas, get_atlas, MAX_NUMBER
+from symbol_generation.resampling import cistercian_to_arabic_any_size
+from symbol_generation.sheet_rendering import write_pgm, write_png, read_pgm, read_png, render_sheet, INK, BACKGROUND
+from symbol_generation.streaming import read_number_chunks, write_symbol_chunks, encode_chunks, DEFAULT_CHUNK_SIZE
+from symbol_generation.svg_rendering import write_svg
 from symbol_generation.symbol_mapping import create_symbols, show_mapping
 from symbol_generation.translating_cistercian_symbols import arabic_to_cistercian
 
 DEFAULT_HEIGHT = 17
 DEFAULT_WIDTH = 15
 
+IMAGE_EXTENSIONS = ('.pgm', '.png', '.npy')
+FILES_PER_TASK = 1000
+
 
-def main(number_to_convert):
+def main(number_to_convert, height, width, symbol_mapping):
     cistercian = arabic_to_cistercian(arabic_number=number_to_convert, symbol_height=height, symbol_width=width,
                                       symbol_mapping=symbol_mapping)
 
     cistercian.show(title=f'Cistercian representation of {number_to_convert}')
 
 
-if __name__ == "__main__":
-    parser = argparse.ArgumentParser()
-    parser.add_argument('--height', '-hh', type=int, help="height of symbols in pixels")
-    parser.add_argument('--width', '-ww', type=int, help="width of symbols in pixels")
-    args = parser.parse_args()
-
-    height = args.height
-    width = args.width
-
-    height = height if height is not None else DEFAULT_HEIGHT
-    width = width if width is not None else DEFAULT_WIDTH
-
+def run_interactive(height, width):
     symbol_mapping = create_symbols(symbol_height=height, symbol_width=width)
     show_mapping(symbol_mapping)
 
     stop_ui = False
     while not stop_ui:
         number = int(input("Enter a number to convert to Cistercian representation (int, [0, 9999]):"))
-        main(number_to_convert=number)
+        main(number_to_convert=number, height=height, width=width, symbol_mapping=symbol_mapping)
         stop_ui = input("Do you want to try another number? (y/n)") == 'n'
 
     print("Thanks for playing!")
+
+
+def _report(verb: str, count: int, start: float, total: int = None):
+    """ progress and throughput, on stderr so stdout stays clean for results """
+    seconds = time.perf_counter() - start
+    progress = f"{count}/{total}" if total is not None else f"{count}"
+    rate = count / seconds if seconds > 0 else float('inf')
+    print(f"{verb} {progress} in {seconds:.2f}s ({rate:.0f}/s)", file=sys.stderr)
+
+
+def _symbols_to_image(symbol: np.ndarray) -> np.ndarray:
+    return np.where(symbol > 0, INK, BACKGROUND).astype(np.uint8)
+
+
+def _image_to_symbols(image: np.ndarray) -> np.ndarray:
+    """ dark pixels are ink - images are 8-bit or [0, 1] floats, color images are averaged to gray, alpha is ignored """
+    image = np.asarray(image, dtype=np.float32)
+    if image.ndim == 3:
+        image = image[:, :, :3 if image.shape[2] >= 3 else 1].mean(axis=2)
+    scale = 255 if image.max() > 1 else 1
+    return (image < scale / 2).astype(np.uint8)
+
+
+def _encode_to_directory(numbers: np.ndarray, output_dir: str, height: int, width: int, image_format: str) -> int:
+    write_image = write_png if image_format == 'png' else write_pgm
+    for number, symbol in zip(numbers, get_atlas(height, width).encode(numbers)):
+        write_image(os.path.join(output_dir, f"{number}.{image_format}"), _symbols_to_image(symbol))
+    return len(numbers)
+
+
+def _read_symbol_image(path: str) -> np.ndarray:
+    if path.endswith('.npy'):
+        return (np.load(path) > 0).astype(np.uint8)
+    if path.endswith('.pgm'):
+        return _image_to_symbols(read_pgm(path))
+    return _image_to_symbols(read_png(path))
+
+
+def _decode_files(paths: list) -> list:
+    values, _ = cistercian_to_arabic_any_size([_read_symbol_image(path) for path in paths])
+    return values.tolist()
+
+
+def _number_chunks_from_args(args):
+    if args.input is None:
+        numbers = np.arange(args.start, args.stop)
+        for start in range(0, len(numbers), DEFAULT_CHUNK_SIZE):
+            yield numbers[start:start + DEFAULT_CHUNK_SIZE]
+    elif args.input == '-':
+        yield from read_number_chunks(sys.stdin)
+    else:
+        with open(args.input) as f:
+            yield from read_number_chunks(f)
+
+
+def run_encode(args):
+    start = time.perf_counter()
+    if args.output.endswith('.npy'):
+        atlas = get_atlas(args.height, args.width)
+        count = write_symbol_chunks(encode_chunks(_number_chunks_from_args(args), atlas), args.output,
+                                    symbol_shape=(args.height, args.width), dtype=atlas.dtype)
+    else:
+        os.makedirs(args.output, exist_ok=True)
+        count = 0
+        with ProcessPoolExecutor(max_workers=args.jobs) as executor:
+            for numbers in _number_chunks_from_args(args):
+                tasks = [executor.submit(_encode_to_directory, numbers[task_start:task_start + FILES_PER_TASK],
+                                         args.output, args.height, args.width, args.format)
+                         for task_start in range(0, len(numbers), FILES_PER_TASK)]
+                for task in tasks:
+                    count += task.result()
+                _report('encoded', count, start)
+        return
+    _report('encoded', count, start)
+
+
+def run_decode(args):
+    start = time.perf_counter()
+    paths = sorted(os.path.join(args.input_dir, name) for name in os.listdir(args.input_dir)
+                   if name.endswith(IMAGE_EXTENSIONS))
+    path_chunks = [paths[chunk_start:chunk_start + FILES_PER_TASK]
+                   for chunk_start in range(0, len(paths), FILES_PER_TASK)]
+
+    output = open(args.output, 'w') if args.output else sys.stdout
+    try:
+        count = 0
+        with ProcessPoolExecutor(max_workers=args.jobs) as executor:
+            for chunk_paths, values in zip(path_chunks, executor.map(_decode_files, path_chunks)):
+                output.writelines(f"{os.path.basename(path)},{value}\n" for path, value in zip(chunk_paths, values))
+                count += len(values)
+                _report('decoded', count, start, total=len(paths))
+    finally:
+        if args.output:
+            output.close()
+
+
+def run_atlas(args):
+    start = time.perf_counter()
+    if args.output.endswith('.svg'):
+        write_svg(np.arange(MAX_NUMBER + 1), args.output, height=args.height, width=args.width, columns=args.columns)
+    elif args.output.endswith(('.pgm', '.png')):
+        render_sheet(np.arange(MAX_NUMBER + 1), args.output, height=args.height, width=args.width,
+                     columns=args.columns, jobs=args.jobs)
+    else:
+        write_atlas_file(args.output, GlyphAtlas(height=args.height, width=args.width, packed=args.packed))
+    _report('dumped atlas of', MAX_NUMBER + 1, start)
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--height', '-hh', type=int, default=DEFAULT_HEIGHT, help="height of symbols in pixels")
+    parser.add_argument('--width', '-ww', type=int, default=DEFAULT_WIDTH, help="width of symbols in pixels")
+    subparsers = parser.add_subparsers(dest='command')
+
+    encode_parser = subparsers.add_parser('encode', help="encode numbers to symbol images or a .npy archive")
+    encode_parser.add_argument('--start', type=int, default=0, help="first number of the range to encode")
+    encode_parser.add_argument('--stop', type=int, default=MAX_NUMBER + 1, help="end of the range (exclusive)")
+    encode_parser.add_argument('--input', '-i', help="text / CSV file of numbers to encode instead of a range, "
+                                                     "'-' for stdin")
+    encode_parser.add_argument('--output', '-o', required=True, help="output directory, or a .npy archive")
+    encode_parser.add_argument('--format', choices=['pgm', 'png'], default='pgm', help="format of image files")
+    encode_parser.add_argument('--jobs', '-j', type=int, help="worker processes writing image files, all cores by "
+                                                              "default - a .npy archive is written by one process")
+
+    decode_parser = subparsers.add_parser('decode', help="decode a directory of symbol images of any size")
+    decode_parser.add_argument('input_dir', help="directory of .pgm, .png or .npy symbol images")
+    decode_parser.add_argument('--output', '-o', help="output file of 'file name,number' lines, stdout by default")
+    decode_parser.add_argument('--jobs', '-j', type=int, help="worker processes, all cores by default")
+
+    atlas_parser = subparsers.add_parser('atlas', help="dump the atlas of all symbols")
+    atlas_parser.add_argument('--output', '-o', required=True, help="atlas file, or a .pgm / .png / .svg sheet image")
+    atlas_parser.add_argument('--packed', action='store_true', help="store the atlas file as packed bits")
+    atlas_parser.add_argument('--columns', type=int, default=100, help="symbols per row of a sheet image")
+    atlas_parser.add_argument('--jobs', '-j', type=int, help="worker processes rendering a .pgm / .png sheet, all "
+                                                             "cores by default")
+
+    args = parser.parse_args(argv)
+    if args.command == 'encode' and args.output.endswith('.npy') and args.jobs is not None:
+        # encoding is a memory bound gather streamed to a single file, worker processes would only add copies
+        parser.error("--jobs is only supported for a directory of images, not for a .npy archive")
+    if args.command == 'atlas' and not args.output.endswith(('.pgm', '.png')) and args.jobs is not None:
+        parser.error("--jobs is only supported for a .pgm / .png sheet, not for an atlas file or a .svg sheet")
+    return args
+
+
+if __name__ == "__main__":
+    args = parse_args()
+
+    if args.command == 'encode':
+        run_encode(args)
+    elif args.command == 'decode':
+        run_decode(args)
+    elif args.command == 'atlas':
+        run_atlas(args)
+    else:
+        run_interactive(height=args.height, width=args.width)
@@ -0,0 +1,77 @@
+"""
+This file contains the on-disk format of a glyph atlas, so the symbols of all numbers for one size are generated once
+and shared by all worker processes through the page cache
+
+format -
+ - a fixed HEADER_SIZE bytes header: magic, format version, height, width, number of symbols, packed flag and the
+   dtype of the unpacked symbols
+ - the stored symbols block of the atlas as a .npy stream, memory mapped read only when the file is opened
+"""
+import os
+import struct
+
+import numpy as np
+
+from symbol_generation.glyph_atlas import GlyphAtlas, MAX_NUMBER
+
+ATLAS_MAGIC = b'CISTERCIAN_ATLAS'
+ATLAS_VERSION = 1
+HEADER_SIZE = 64
+_HEADER_FORMAT = '<16sIIIII8s'
+
+
+def write_atlas_file(path: str, atlas: GlyphAtlas):
+    """ write the atlas to path, through a temporary file so readers never see a partially written atlas """
+    header = struct.pack(_HEADER_FORMAT, ATLAS_MAGIC, ATLAS_VERSION, atlas.height, atlas.width, MAX_NUMBER + 1,
+                         int(atlas.packed), atlas.dtype.str.encode())
+    temp_path = f"{path}.{os.getpid()}.tmp"
+    with open(temp_path, 'wb') as f:
+        f.write(header.ljust(HEADER_SIZE, b'\0'))
+        np.lib.format.write_array(f, np.ascontiguousarray(atlas.stored_glyphs), allow_pickle=False)
+    os.replace(temp_path, path)
+
+
+def _read_header(f) -> dict:
+    header = f.read(HEADER_SIZE)
+    assert len(header) == HEADER_SIZE, "Unexpected atlas file, file is shorter than the header"
+    magic, version, height, width, count, packed, dtype_str = struct.unpack_from(_HEADER_FORMAT, header)
+    assert magic == ATLAS_MAGIC, f"Unexpected atlas file, bad magic {magic}"
+    assert version == ATLAS_VERSION, f"Unsupported atlas file version {version}, supported version is {ATLAS_VERSION}"
+    assert count == MAX_NUMBER + 1, f"Unexpected atlas file, expected {MAX_NUMBER + 1} symbols, got {count}"
+    return {
+        'height': height,
+        'width': width,
+        'packed': bool(packed),
+        'dtype': np.dtype(dtype_str.rstrip(b'\0').decode()),
+    }
+
+
+def open_atlas_file(path: str, height: int = None, width: int = None) -> GlyphAtlas:
+    """
+    open an atlas file with its symbols memory mapped read only
+    if height and width are given, the file must hold an atlas of that size
+    """
+    with open(path, 'rb') as f:
+        header = _read_header(f)
+        npy_version = np.lib.format.read_magic(f)
+        read_array_header = np.lib.format.read_array_header_1_0 if npy_version == (1, 0) \
+            else np.lib.format.read_array_header_2_0
+        shape, fortran_order, stored_dtype = read_array_header(f)
+        body_offset = f.tell()
+
+    for name, expected in [('height', height), ('width', width)]:
+        assert expected is None or header[name] == expected, \
+            f"Size mismatch between atlas file and requested size, atlas {name}: {header[name]}, " \
+            f"requested {name}: {expected}"
+    assert not fortran_order, "Unexpected atlas file, symbols are not stored in C order"
+
+    stored_glyphs = np.memmap(path, dtype=stored_dtype, mode='r', offset=body_offset, shape=shape)
+    return GlyphAtlas(height=header['height'], width=header['width'], dtype=header['dtype'], packed=header['packed'],
+                      stored_glyphs=stored_glyphs)
+
+
+def get_or_create_atlas_file(path: str, height: int, width: int, **atlas_kwargs) -> GlyphAtlas:
+    """ open the atlas file at path, generating it first if it does not exist yet """
+    if not os.path.exists(path):
+        write_atlas_file(path, GlyphAtlas(height=height, width=width, **atlas_kwargs))
+    return open_atlas_file(path, height=height, width=width)
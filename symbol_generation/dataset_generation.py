@@ -0,0 +1,108 @@
+"""
+This file contains a generator of sharded (images, labels) training sets of Cistercian symbols, for training a CNN
+to read them
+
+each shard is an uncompressed .npz file with 'images' (N, height, width) and 'labels' (N,),
+shards are generated by a process pool, every shard has its own random generator seeded by (seed, shard index),
+so the dataset is the same for any number of jobs
+the symbols of a shard are drawn from the stroke masks of its labels, no atlas of all 10,000 symbols is built
+"""
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+
+from symbol_generation.glyph_atlas import MAX_NUMBER
+from symbol_generation.strokes import number_to_stroke_mask, rasterize_stroke_masks
+from symbol_generation.translating_cistercian_symbols import SYMBOL_HEIGHT, SYMBOL_WIDTH
+
+# noise_probability - probability of flipping each pixel
+# max_shift - symbols are shifted by up to max_shift pixels in each axis, uncovered pixels are zero
+DEFAULT_AUGMENTATION = {
+    'noise_probability': 0.0,
+    'max_shift': 0,
+}
+
+DEFAULT_SHARD_SIZE = 100_000
+
+
+def _shift_symbols(symbols: np.ndarray, shifts_v: np.ndarray, shifts_h: np.ndarray) -> np.ndarray:
+    """ shift each symbol by its own (vertical, horizontal) offset, filling uncovered pixels with zeros """
+    num_symbols, height, width = symbols.shape
+    source_rows = np.arange(height)[None, :] - shifts_v[:, None]  # (N, height)
+    source_cols = np.arange(width)[None, :] - shifts_h[:, None]  # (N, width)
+    valid = ((0 <= source_rows) & (source_rows < height))[:, :, None] & \
+        ((0 <= source_cols) & (source_cols < width))[:, None, :]
+    shifted = symbols[np.arange(num_symbols)[:, None, None],
+                      np.clip(source_rows, 0, height - 1)[:, :, None],
+                      np.clip(source_cols, 0, width - 1)[:, None, :]]
+    shifted[~valid] = 0
+    return shifted
+
+
+def augment_symbols(symbols: np.ndarray, augmentation: dict, rng: np.random.Generator) -> np.ndarray:
+    augmentation = {**DEFAULT_AUGMENTATION, **augmentation}
+
+    max_shift = augmentation['max_shift']
+    if max_shift > 0:
+        shifts_v, shifts_h = rng.integers(-max_shift, max_shift + 1, size=(2, len(symbols)))
+        symbols = _shift_symbols(symbols, shifts_v, shifts_h)
+
+    noise_probability = augmentation['noise_probability']
+    if noise_probability > 0:
+        symbols = symbols ^ (rng.random(size=symbols.shape) < noise_probability).astype(symbols.dtype)
+
+    return symbols
+
+
+def generate_shard(output_dir: str, shard_ix: int, num_samples: int, height: int, width: int,
+                   label_probabilities: np.ndarray = None, augmentation: dict = None, seed: int = 0) -> str:
+    """ generate a single shard and return its path """
+    rng = np.random.default_rng([seed, shard_ix])
+    labels = rng.choice(MAX_NUMBER + 1, size=num_samples, p=label_probabilities)
+    symbols = rasterize_stroke_masks(number_to_stroke_mask(labels), height=height, width=width)
+    images = augment_symbols(symbols, augmentation or {}, rng)
+
+    path = os.path.join(output_dir, f"shard_{shard_ix:05d}.npz")
+    np.savez(path, images=images, labels=labels)
+    return path
+
+
+def generate_dataset(output_dir: str, num_samples: int, sizes: tuple = ((SYMBOL_HEIGHT, SYMBOL_WIDTH),),
+                     shard_size: int = DEFAULT_SHARD_SIZE, label_probabilities: np.ndarray = None,
+                     augmentation: dict = None, seed: int = 0, jobs: int = None) -> dict:
+    """
+    generate num_samples samples in shards of up to shard_size samples
+    sizes - (height, width) of the symbols, shards cycle through the sizes
+    label_probabilities - probability of each number in [0, 9999], uniform if not given
+    jobs - number of worker processes, all cores if not given, 1 generates in the current process
+    returns a summary with the shard paths and the throughput
+    """
+    assert num_samples > 0, f"Expected a positive number of samples, got {num_samples}"
+    if label_probabilities is not None:
+        label_probabilities = np.asarray(label_probabilities, dtype=float)
+        assert label_probabilities.shape == (MAX_NUMBER + 1,), \
+            f"Expected a probability for each number in [0, {MAX_NUMBER}], got shape {label_probabilities.shape}"
+    os.makedirs(output_dir, exist_ok=True)
+
+    shard_args = []
+    for shard_ix, shard_start in enumerate(range(0, num_samples, shard_size)):
+        height, width = sizes[shard_ix % len(sizes)]
+        shard_args.append((output_dir, shard_ix, min(shard_size, num_samples - shard_start), height, width,
+                           label_probabilities, augmentation, seed))
+
+    start = time.perf_counter()
+    if jobs == 1:
+        paths = [generate_shard(*args) for args in shard_args]
+    else:
+        with ProcessPoolExecutor(max_workers=jobs) as executor:
+            paths = list(executor.map(generate_shard, *zip(*shard_args)))
+    seconds = time.perf_counter() - start
+
+    return {
+        'paths': paths,
+        'num_samples': num_samples,
+        'seconds': seconds,
+        'images_per_second': num_samples / seconds if seconds > 0 else float('inf'),
+    }
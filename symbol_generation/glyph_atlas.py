@@ -0,0 +1,167 @@
+"""
+This file contains an atlas of the precomputed symbols of all numbers in [0, 9999] for a given symbol size,
+and a bounded registry of atlases keyed by size and dtype
+"""
+from collections import OrderedDict
+
+import numpy as np
+
+from symbol_generation import instrumentation
+from symbol_generation.symbol_classes import DEFAULT_DTYPE
+from symbol_generation.symbol_mapping import create_symbols
+from symbol_generation.strokes import number_to_stroke_mask, rasterize_stroke_masks
+from symbol_generation.translating_cistercian_symbols import cistercian_to_arabic_batch
+
+MAX_NUMBER = 9999
+MAX_CACHED_ATLASES = 8
+
+_ATLAS_CACHE = OrderedDict()
+
+
+class GlyphAtlas:
+    """
+    symbols of all numbers for one size, stored as one contiguous block
+    with packed=True each row of pixels is stored as bits (np.packbits along the width), symbols are unpacked to
+    the requested dtype when read
+    stored_glyphs - an already built block (e.g. memory mapped from an atlas file) to use instead of drawing one
+    """
+    def __init__(self, height: int, width: int, dtype=DEFAULT_DTYPE, packed: bool = False,
+                 stored_glyphs: np.ndarray = None):
+        self.height = height
+        self.width = width
+        self.packed = packed
+        self._dtype = np.dtype(dtype)
+        self._symbol_mapping = None
+        self._decode_index = None
+
+        if stored_glyphs is None:
+            glyphs = rasterize_stroke_masks(number_to_stroke_mask(np.arange(MAX_NUMBER + 1)), height=height,
+                                            width=width, dtype=dtype)
+            stored_glyphs = _pack_symbols(glyphs) if packed else np.ascontiguousarray(glyphs)
+
+        stored_shape = (MAX_NUMBER + 1, height, (width + 7) // 8 if packed else width)
+        assert stored_glyphs.shape == stored_shape, \
+            f"Unexpected atlas shape, expected {stored_shape}, got {stored_glyphs.shape}"
+        # one contiguous block, read only so views handed out cannot corrupt the atlas
+        self._glyphs = stored_glyphs
+        self._glyphs.flags.writeable = False
+
+    def __repr__(self) -> str:
+        return f"GlyphAtlas({self.height}, {self.width}, dtype={self.dtype}, packed={self.packed})"
+
+    @property
+    def dtype(self) -> np.dtype:
+        return self._dtype
+
+    @property
+    def symbol_mapping(self) -> dict:
+        """ mapping of the atlas size, built on first use for the containment search fallback """
+        if self._symbol_mapping is None:
+            self._symbol_mapping = create_symbols(symbol_height=self.height, symbol_width=self.width,
+                                                  dtype=self._dtype)
+        return self._symbol_mapping
+
+    @property
+    def stored_glyphs(self) -> np.ndarray:
+        """ the symbols block as stored - packed bits for a packed atlas """
+        return self._glyphs
+
+    @property
+    def nbytes(self) -> int:
+        """ memory used by the stored symbols """
+        return self._glyphs.nbytes
+
+    @property
+    def glyphs(self) -> np.ndarray:
+        """ all symbols as a (10000, height, width) array - a new unpacked array for a packed atlas """
+        return self._unpack(self._glyphs)
+
+    def get_glyph(self, arabic_number: int) -> np.ndarray:
+        """ return the symbol of a single number - a read-only view, unless the atlas is packed """
+        assert 0 <= arabic_number <= MAX_NUMBER, \
+            f"Number out of range, supported range is [0, {MAX_NUMBER}], got {arabic_number}"
+        return self._unpack(self._glyphs[arabic_number])
+
+    @instrumentation.timed('atlas.encode')
+    def encode(self, arabic_numbers: np.ndarray) -> np.ndarray:
+        """ return the symbols of an array of numbers of shape (N,) as a new array of shape (N, height, width) """
+        arabic_numbers = np.asarray(arabic_numbers)
+        assert np.issubdtype(arabic_numbers.dtype, np.integer), \
+            f"Unsupported input, only int arrays supported, got {arabic_numbers.dtype}"
+        assert ((0 <= arabic_numbers) & (arabic_numbers <= MAX_NUMBER)).all(), \
+            f"Number out of range, supported range is [0, {MAX_NUMBER}]"
+        return self._unpack(self._glyphs[arabic_numbers])
+
+    @property
+    def decode_index(self) -> dict:
+        """ packed bits of every symbol in the atlas to its value, built on first use """
+        if self._decode_index is None:
+            packed_glyphs = self._glyphs if self.packed else _pack_symbols(self._glyphs)
+            self._decode_index = {packed.tobytes(): value for value, packed in enumerate(packed_glyphs)}
+        return self._decode_index
+
+    def lookup(self, symbol: np.ndarray):
+        """ return the value of a symbol that exactly matches a symbol in the atlas, None otherwise """
+        self._validate_symbols_size(symbol.shape)
+        value = self.decode_index.get(_pack_symbols(symbol).tobytes())
+        instrumentation.count('decode_index.hits' if value is not None else 'decode_index.misses')
+        return value
+
+    @instrumentation.timed('atlas.decode')
+    def decode(self, symbols: np.ndarray) -> np.ndarray:
+        """
+        convert an array of symbols of shape (N, height, width) to N numbers
+        exact symbols are decoded with a single hash lookup each, the rest fall back to the containment search
+        """
+        symbols = np.asarray(symbols)
+        self._validate_symbols_size(symbols.shape[1:])
+        decode_index = self.decode_index
+        values = np.array([decode_index.get(packed.tobytes(), -1) for packed in _pack_symbols(symbols)], dtype=int)
+
+        not_found = values < 0
+        if instrumentation.is_enabled():
+            num_not_found = int(not_found.sum())
+            instrumentation.count('decode_index.hits', len(values) - num_not_found)
+            instrumentation.count('decode_index.misses', num_not_found)
+        if not_found.any():
+            values[not_found] = cistercian_to_arabic_batch(symbols[not_found], self.symbol_mapping)
+        return values
+
+    def _unpack(self, stored: np.ndarray) -> np.ndarray:
+        if not self.packed:
+            return stored
+        return np.unpackbits(stored, axis=-1, count=self.width).astype(self._dtype, copy=False)
+
+    def _validate_symbols_size(self, symbol_shape: tuple):
+        assert tuple(symbol_shape) == (self.height, self.width), \
+            f"Size mismatch between symbol and atlas, symbol shape: {tuple(symbol_shape)}, " \
+            f"atlas shape: {(self.height, self.width)}"
+
+
+def _pack_symbols(symbols: np.ndarray) -> np.ndarray:
+    """ binarize symbols and pack each row of pixels to bits, (..., height, width) -> (..., height, ceil(width / 8))
+    the packed bytes of a symbol are its key in the decode index """
+    return np.packbits(symbols > 0, axis=-1)
+
+
+def get_atlas(height: int, width: int, dtype=DEFAULT_DTYPE, packed: bool = False) -> GlyphAtlas:
+    """ return the atlas for the given size and dtype, building it on first use, least recently used atlases are
+    evicted once more than MAX_CACHED_ATLASES are cached """
+    key = (height, width, np.dtype(dtype).str, packed)
+    atlas = _ATLAS_CACHE.get(key)
+    if atlas is not None:
+        _ATLAS_CACHE.move_to_end(key)
+        instrumentation.count('atlas_cache.hits')
+        return atlas
+
+    instrumentation.count('atlas_cache.misses')
+
+    atlas = GlyphAtlas(height=height, width=width, dtype=dtype, packed=packed)
+    _ATLAS_CACHE[key] = atlas
+    while len(_ATLAS_CACHE) > MAX_CACHED_ATLASES:
+        _ATLAS_CACHE.popitem(last=False)
+    return atlas
+
+
+def clear_atlas_cache():
+    _ATLAS_CACHE.clear()
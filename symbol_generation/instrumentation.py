@@ -0,0 +1,129 @@
+"""
+This file contains opt-in instrumentation of the hot paths - counters and timers for mapping builds, template scans,
+containment checks, cache hits / misses and encode / decode calls
+
+instrumentation is disabled by default, a disabled counter or timer costs a single flag check
+    enable()
+    ... encode / decode ...
+    snapshot()  # {'counters': {name: count}, 'timers': {name: {'calls': calls, 'seconds': seconds}}}
+"""
+import logging
+import threading
+import time
+from collections import defaultdict
+from functools import wraps
+
+_enabled = False
+_lock = threading.Lock()
+_counters = defaultdict(int)
+_timer_calls = defaultdict(int)
+_timer_seconds = defaultdict(float)
+
+logger = logging.getLogger(__name__)
+
+
+def enable():
+    global _enabled
+    _enabled = True
+
+
+def disable():
+    global _enabled
+    _enabled = False
+
+
+def is_enabled() -> bool:
+    return _enabled
+
+
+def reset():
+    with _lock:
+        _counters.clear()
+        _timer_calls.clear()
+        _timer_seconds.clear()
+
+
+def count(name: str, increment: int = 1):
+    if not _enabled:
+        return
+    with _lock:
+        _counters[name] += increment
+
+
+def record_time(name: str, seconds: float):
+    with _lock:
+        _timer_calls[name] += 1
+        _timer_seconds[name] += seconds
+
+
+def timed(name: str):
+    """ decorator counting calls to the decorated function and the time spent in them, when enabled """
+    def decorator(func):
+        @wraps(func)
+        def wrapper(*args, **kwargs):
+            if not _enabled:
+                return func(*args, **kwargs)
+            start = time.perf_counter()
+            try:
+                return func(*args, **kwargs)
+            finally:
+                record_time(name, time.perf_counter() - start)
+        return wrapper
+    return decorator
+
+
+def snapshot() -> dict:
+    """ a copy of the current counters and timers """
+    with _lock:
+        return {
+            'counters': dict(_counters),
+            'timers': {name: {'calls': _timer_calls[name], 'seconds': _timer_seconds[name]} for name in _timer_calls},
+        }
+
+
+def format_snapshot(stats: dict) -> str:
+    lines = [f"{name}: {value}" for name, value in sorted(stats['counters'].items())]
+    lines += [f"{name}: {timer['calls']} calls, {timer['seconds']:.6f}s" for name, timer in
+              sorted(stats['timers'].items())]
+    return '\n'.join(lines)
+
+
+class PeriodicLogger(threading.Thread):
+    """
+    a daemon thread logging a snapshot every interval seconds until stopped
+    disable_on_stop - disable instrumentation when stopped, e.g. if it was enabled only for this logger
+    """
+    def __init__(self, interval: float = 60.0, log=None, reset_after_log: bool = False, disable_on_stop: bool = False):
+        super().__init__(daemon=True)
+        self.interval = interval
+        self.log = log or logger.info
+        self.reset_after_log = reset_after_log
+        self.disable_on_stop = disable_on_stop
+        self._stop_event = threading.Event()
+
+    def run(self):
+        while not self._stop_event.wait(self.interval):
+            self.log_snapshot()
+
+    def log_snapshot(self):
+        self.log("instrumentation snapshot:\n" + format_snapshot(snapshot()))
+        if self.reset_after_log:
+            reset()
+
+    def stop(self):
+        self._stop_event.set()
+        self.join()
+        if self.disable_on_stop:
+            disable()
+
+
+def start_periodic_logging(interval: float = 60.0, log=None, reset_after_log: bool = False) -> PeriodicLogger:
+    """
+    enable instrumentation and log snapshots every interval seconds, call stop() on the result to end -
+    instrumentation is disabled again on stop() unless it was already enabled
+    """
+    periodic_logger = PeriodicLogger(interval=interval, log=log, reset_after_log=reset_after_log,
+                                     disable_on_stop=not is_enabled())
+    enable()
+    periodic_logger.start()
+    return periodic_logger
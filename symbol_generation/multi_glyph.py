@@ -0,0 +1,133 @@
+"""
+This file contains a multi glyph representation of non negative integers of any size -
+a number is split into base 10000 chunks, each chunk is a symbol and the symbols are laid out left to right as a
+horizontal strip, most significant chunk first
+
+strips of a batch all have the glyph count of its largest number, shorter numbers are padded on the left with 0
+chunks - the symbol of 0 is blank, so padding and 0 chunks are blank cells, and cells are located by their position
+in the strip and not by their ink
+
+int arrays are split with vectorized arithmetic, python ints beyond 64 bits take an object array fallback that only
+splits each number in python - the symbols of all chunks are still encoded and decoded as one batch
+"""
+import numpy as np
+
+from symbol_generation.glyph_atlas import get_atlas, MAX_NUMBER
+from symbol_generation.translating_cistercian_symbols import SYMBOL_HEIGHT, SYMBOL_WIDTH
+
+CHUNK_BASE = MAX_NUMBER + 1
+MAX_INT64_GLYPHS = 4  # 10000 ** 4 - 1 fits in int64, a fifth chunk may not
+DEFAULT_SPACING = 1
+
+
+def split_to_chunks(numbers) -> tuple:
+    """
+    split non negative integers to base 10000 chunks
+    returns the chunks (N, num_glyphs) most significant first, zero padded on the left, and the number of chunks of
+    each number (N,) - 0 needs a single chunk
+    """
+    numbers = np.asarray(numbers)
+    if numbers.dtype == object:
+        assert all(isinstance(number, (int, np.integer)) and not isinstance(number, bool) for number in numbers.flat), \
+            "Unsupported input, only int supported"
+    else:
+        assert np.issubdtype(numbers.dtype, np.integer), \
+            f"Unsupported input, only int arrays supported, got {numbers.dtype}"
+    assert numbers.ndim == 1, f"Unsupported input, expected a 1D array, got shape {numbers.shape}"
+    assert (numbers >= 0).all(), "Number out of range, only non negative numbers supported"
+
+    if len(numbers) == 0:
+        return np.zeros(shape=(0, 1), dtype=np.int64), np.zeros(shape=0, dtype=np.int64)
+
+    if numbers.dtype == object:
+        chunk_lists = []
+        for number in numbers.tolist():
+            number_chunks = [number % CHUNK_BASE]
+            number //= CHUNK_BASE
+            while number > 0:
+                number_chunks.append(number % CHUNK_BASE)
+                number //= CHUNK_BASE
+            chunk_lists.append(number_chunks)
+        num_chunks = np.array([len(number_chunks) for number_chunks in chunk_lists], dtype=np.int64)
+        chunks = np.zeros(shape=(len(numbers), int(num_chunks.max())), dtype=np.int64)
+        for ix, number_chunks in enumerate(chunk_lists):
+            chunks[ix, chunks.shape[1] - len(number_chunks):] = number_chunks[::-1]
+        return chunks, num_chunks
+
+    numbers = numbers.astype(np.uint64)  # uint64 covers every int64 and uint64 value
+    num_chunks = np.ones(shape=len(numbers), dtype=np.int64)
+    remaining = numbers // CHUNK_BASE
+    chunk_columns = [numbers % CHUNK_BASE]
+    while remaining.any():
+        num_chunks += remaining > 0
+        chunk_columns.append(remaining % CHUNK_BASE)
+        remaining = remaining // CHUNK_BASE
+    return np.stack(chunk_columns[::-1], axis=1).astype(np.int64), num_chunks
+
+
+def join_chunks(chunks: np.ndarray) -> np.ndarray:
+    """ inverse of split_to_chunks - int64 numbers, or python ints in an object array beyond 4 chunks """
+    chunks = np.asarray(chunks)
+    num_glyphs = chunks.shape[1]
+    if num_glyphs > MAX_INT64_GLYPHS:
+        chunks = chunks.astype(object)
+        powers = np.array([CHUNK_BASE ** power for power in range(num_glyphs - 1, -1, -1)], dtype=object)
+    else:
+        chunks = chunks.astype(np.int64)
+        powers = CHUNK_BASE ** np.arange(num_glyphs - 1, -1, -1, dtype=np.int64)
+    return chunks @ powers
+
+
+def strip_width(num_glyphs: int, symbol_width: int, spacing: int = DEFAULT_SPACING) -> int:
+    return num_glyphs * (symbol_width + spacing) - spacing
+
+
+def arabic_to_cistercian_multi_glyph(arabic_numbers, symbol_height: int = SYMBOL_HEIGHT,
+                                     symbol_width: int = SYMBOL_WIDTH, spacing: int = DEFAULT_SPACING,
+                                     num_glyphs: int = None) -> np.ndarray:
+    """
+    convert non negative integers of any size (N,) to strips of symbols of shape
+    (N, height, strip_width(num_glyphs, width, spacing)), spacing blank columns between symbols
+    num_glyphs - glyphs per strip, at least the chunk count of the largest number, by default exactly that
+    """
+    chunks, _ = split_to_chunks(arabic_numbers)
+    if num_glyphs is None:
+        num_glyphs = chunks.shape[1]
+    assert num_glyphs >= chunks.shape[1], \
+        f"Number out of range, {num_glyphs} glyphs hold numbers up to {CHUNK_BASE} ** {num_glyphs} - 1"
+    chunks = np.pad(chunks, ((0, 0), (num_glyphs - chunks.shape[1], 0)))
+
+    atlas = get_atlas(symbol_height, symbol_width)
+    glyphs = atlas.encode(chunks.reshape(-1)).reshape(len(chunks), num_glyphs, symbol_height, symbol_width)
+
+    strips = np.zeros(shape=(len(chunks), symbol_height, num_glyphs, symbol_width + spacing), dtype=glyphs.dtype)
+    strips[:, :, :, :symbol_width] = glyphs.transpose(0, 2, 1, 3)
+    strips = strips.reshape(len(chunks), symbol_height, num_glyphs * (symbol_width + spacing))
+    return np.ascontiguousarray(strips[:, :, :strip_width(num_glyphs, symbol_width, spacing)])
+
+
+def cistercian_multi_glyph_to_arabic(cistercian_strips: np.ndarray, symbol_height: int = SYMBOL_HEIGHT,
+                                     symbol_width: int = SYMBOL_WIDTH, spacing: int = DEFAULT_SPACING) -> np.ndarray:
+    """
+    convert strips of symbols of shape (N, height, strip width) back to integers,
+    int64 for strips of up to 4 glyphs, python ints in an object array for longer strips
+    blank cells decode as 0 chunks
+    """
+    cistercian_strips = np.asarray(cistercian_strips)
+    assert cistercian_strips.ndim == 3 and cistercian_strips.shape[1] == symbol_height, \
+        f"Unsupported input, expected strips of shape (N, {symbol_height}, strip width), " \
+        f"got shape {cistercian_strips.shape}"
+    num_strips, _, width = cistercian_strips.shape
+    num_glyphs = (width + spacing) // (symbol_width + spacing)
+    assert width == strip_width(num_glyphs, symbol_width, spacing), \
+        f"Size mismatch between strips and symbols, strip width {width} is not a whole number of " \
+        f"{symbol_width} pixel symbols with {spacing} pixel spacing"
+
+    cells = np.zeros(shape=(num_strips, symbol_height, num_glyphs * (symbol_width + spacing)), dtype=np.uint8)
+    cells[:, :, :width] = cistercian_strips > 0
+    glyphs = cells.reshape(num_strips, symbol_height, num_glyphs, symbol_width + spacing)[:, :, :, :symbol_width]
+    glyphs = glyphs.transpose(0, 2, 1, 3)
+    glyphs = glyphs.reshape(-1, symbol_height, symbol_width)
+
+    chunks = get_atlas(symbol_height, symbol_width).decode(glyphs)
+    return join_chunks(chunks.reshape(num_strips, num_glyphs))
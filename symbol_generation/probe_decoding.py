@@ -0,0 +1,81 @@
+"""
+This file contains a probe pixel decoder - instead of comparing whole symbols to templates, a few pixels of each
+stroke are read and the digits are looked up from the strokes found, the cost of a decode does not depend on the
+symbol size
+
+probes of a stroke are pixels that no other stroke draws (the central lines excluded), spread along the stroke,
+a stroke is present when most of its probes hold ink
+the 5 strokes of an order (see strokes.py) are looked up in a table of the stroke combinations of the 10 digits,
+combinations that are not a digit (damaged or noisy symbols) fall back to cistercian_to_arabic_any_size, which
+resamples large symbols before matching them to templates - no atlas of the size is built
+
+probes are computed once per size, sizes too small for every stroke to have a pixel of its own decode with the
+fallback only
+"""
+from functools import lru_cache
+
+import numpy as np
+
+from symbol_generation.resampling import cistercian_to_arabic_any_size
+from symbol_generation.strokes import get_stroke_indices, stroke_bit, CENTRAL_LINE, STROKES_PER_ORDER, \
+    DIGIT_STROKES_PER_ORDER, STROKE_DIGITS
+
+DEFAULT_PROBES_PER_STROKE = 3
+
+
+@lru_cache(maxsize=32)
+def get_probe_indices(height: int, width: int, probes_per_stroke: int = DEFAULT_PROBES_PER_STROKE):
+    """
+    flat pixel indices of the probes of the digit strokes, shape (4, 5, probes_per_stroke) - order, stroke
+    (TOP_LINE to OUTER_LINE), probe - read only, None if a stroke has no pixel of its own at this size
+    strokes with fewer pixels of their own than probes_per_stroke repeat some of them
+    """
+    stroke_indices = get_stroke_indices(height, width)
+    pixel_counts = np.bincount(np.concatenate(stroke_indices), minlength=height * width)
+    central_pixels = np.concatenate([stroke_indices[stroke_bit(order, CENTRAL_LINE)] for order in range(4)])
+    pixel_counts[central_pixels] = 0
+
+    probes = np.empty(shape=(4, DIGIT_STROKES_PER_ORDER, probes_per_stroke), dtype=np.int64)
+    for order in range(4):
+        for stroke in range(1, STROKES_PER_ORDER):
+            indices = stroke_indices[stroke_bit(order, stroke)]
+            own_indices = indices[pixel_counts[indices] == 1]
+            if len(own_indices) == 0:
+                return None
+            spread = np.linspace(0, len(own_indices) - 1, num=probes_per_stroke + 2)[1:-1]  # away from the ends
+            probes[order, stroke - 1] = own_indices[np.round(spread).astype(int)]
+    probes.flags.writeable = False
+    return probes
+
+
+def read_strokes(cistercian_symbols: np.ndarray, probes: np.ndarray) -> np.ndarray:
+    """ (N, 4, 5) boolean array, the digit strokes of each order found in symbols of shape (N, height, width) """
+    flat_symbols = cistercian_symbols.reshape(len(cistercian_symbols), -1)
+    inked_probes = flat_symbols[:, probes] > 0  # (N, 4, 5, probes), only the probe pixels are read
+    return 2 * inked_probes.sum(axis=-1) > probes.shape[-1]
+
+
+def cistercian_to_arabic_probe(cistercian_symbols: np.ndarray, fallback: bool = True) -> np.ndarray:
+    """
+    convert an array of cistercian symbols of shape (N, height, width) to N arabic numbers by reading probe pixels
+    symbols whose strokes are not digits are decoded with cistercian_to_arabic_any_size if fallback,
+    otherwise they are -1
+    """
+    cistercian_symbols = np.asarray(cistercian_symbols)
+    assert cistercian_symbols.ndim == 3, \
+        f"Unsupported input, expected an array of shape (N, height, width), got shape {cistercian_symbols.shape}"
+    height, width = cistercian_symbols.shape[1:]
+
+    probes = get_probe_indices(height, width)
+    if probes is None:
+        values = np.full(shape=len(cistercian_symbols), fill_value=-1, dtype=np.int64)
+    else:
+        strokes = read_strokes(cistercian_symbols, probes)
+        combinations = strokes @ (1 << np.arange(DIGIT_STROKES_PER_ORDER))  # (N, 4)
+        digits = STROKE_DIGITS[combinations]
+        values = np.where((digits >= 0).all(axis=1), digits @ np.array([1, 10, 100, 1000]), -1)
+
+    not_decoded = values < 0
+    if fallback and not_decoded.any():
+        values[not_decoded], _ = cistercian_to_arabic_any_size(cistercian_symbols[not_decoded])
+    return values
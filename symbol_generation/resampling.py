@@ -0,0 +1,214 @@
+"""
+This file contains resolution independent decoding - symbols of any size are resampled onto a canonical grid and
+decoded against the cached mapping of that grid, instead of building a mapping for every incoming size
+
+the canonical grid keeps the aspect ratio of the symbol -
+diagonals are drawn one pixel down per pixel across, so symbols of different aspect ratios are different shapes and
+not resamplings of each other, sizes of the same aspect ratio share a canonical grid and mapping
+diagonals stop at the edges of the symbol, so where they end depends on the aspect ratio too (e.g. in symbols wider
+than about 2/3 of their height, a diagonal from a third-height row reaches the top before the outer column) - the
+canonical grid is one with the same stroke layout as the symbol, symbols smaller than any such grid are decoded at
+their own size
+a grid of the same layout can still bend a diagonal, or blur a stroke end onto a pixel of another candidate, where the
+anchors of the symbol are spaced in other proportions than those of the grid - a grid is only used if the templates of
+the symbol still decode once resampled to it, symbols no grid passes this check for are decoded at their own size
+
+resampling is anchored on the stroke geometry (the lines and the ends of the diagonals of the source map to those of
+the canonical grid), and each canonical pixel gets the fraction of its rows or columns crossed by ink
+symbols of even width have two central columns - units and hundreds are drawn right of the middle, tens and thousands
+are mirrored and drawn left of it - the two are merged into one before resampling
+"""
+from functools import lru_cache
+
+import numpy as np
+
+from symbol_generation.symbol_mapping import create_symbols
+from symbol_generation.translating_cistercian_symbols import cistercian_to_arabic_tolerant, _order_regions, \
+    _stack_symbol_templates
+
+CANONICAL_WIDTHS = range(15, 32, 2)  # odd, tried in turn for a grid of the same stroke layout as the symbol
+MIN_CANONICAL_HEIGHT = 6
+MIN_CANDIDATE_DISTANCE = 2  # pixels, within the region of the order - resampling blurs a stroke end by a pixel
+RESAMPLE_CHUNK_PIXELS = 2 ** 24
+
+
+def _stroke_anchors(height: int, width: int) -> tuple:
+    """
+    row and column coordinates of the strokes of a symbol of odd width - the outer edges, and the pixel centers of
+    the lines and of the ends of the diagonals (at the symbol edges, or where they cross a third-height row)
+    anchors are in a fixed order, anchor i of a size corresponds to anchor i of any other size
+    """
+    third_height, mid_width = int(round(height / 3)), width // 2
+    half_width = width - 1 - mid_width
+    diagonal_down = min(half_width, height - 1)  # rows (and columns) crossed by the diagonals starting on a top row
+    diagonal_up = min(half_width, third_height)  # by the diagonals starting on a third-height row
+    rows = np.array([0, third_height - diagonal_up, third_height, diagonal_down, height - 1 - diagonal_down,
+                     height - 1 - third_height, height - 1 - third_height + diagonal_up, height - 1]) + 0.5
+    cols = np.array([0, mid_width - diagonal_down, mid_width - diagonal_up, mid_width, mid_width + diagonal_up,
+                     mid_width + diagonal_down, width - 1]) + 0.5
+    return np.concatenate([[0], rows, [height]]), np.concatenate([[0], cols, [width]])
+
+
+def _same_order(anchors: np.ndarray, canonical_anchors: np.ndarray, may_meet: bool) -> bool:
+    """
+    True if the canonical anchors are in the same order - anchors are never swapped, anchors that meet stay together
+    and, if may_meet, anchors less than a canonical pixel apart may meet
+    """
+    gaps = anchors[:, None] - anchors[None, :]
+    canonical_order = np.sign(canonical_anchors[:, None] - canonical_anchors[None, :])
+    same_order = canonical_order == np.sign(gaps)
+    if may_meet:
+        same_order |= (canonical_order == 0) & (np.abs(gaps) < anchors[-1] / canonical_anchors[-1])
+    return same_order.all()
+
+
+def _is_faithful(templates: np.ndarray, canonical_height: int, canonical_width: int) -> bool:
+    """
+    True if the templates of a symbol size (4, 10, height, width), resampled to the canonical grid, decode to their
+    own digits, and any two candidates of an order are at least MIN_CANDIDATE_DISTANCE pixels apart within the region
+    of the order
+    """
+    canonical_mapping = get_canonical_mapping(canonical_height, canonical_width)
+    canonical_templates = _stack_symbol_templates(canonical_mapping) > 0
+    resampled = resample_symbols(templates.reshape(40, *templates.shape[2:]), canonical_height, canonical_width)
+    values, _ = cistercian_to_arabic_tolerant(resampled, canonical_mapping)
+    if (values != (np.arange(10)[None, :] * 10 ** np.arange(4)[:, None]).ravel()).any():
+        return False
+    order_regions = _order_regions(canonical_templates)
+    for order in range(4):
+        region_templates = canonical_templates[order].reshape(10, -1)[:, order_regions[order]]
+        distances = (region_templates[:, None] != region_templates[None, :]).sum(axis=2)
+        if distances[~np.eye(10, dtype=bool)].min() < MIN_CANDIDATE_DISTANCE:
+            return False
+    return True
+
+
+@lru_cache(maxsize=256)
+def canonical_shape(height: int, width: int) -> tuple:
+    """
+    the canonical grid of a symbol size - the narrowest of CANONICAL_WIDTHS keeping the aspect ratio and the stroke
+    layout (see _stroke_anchors) of the symbol, failing that the narrowest that only merges strokes less than a
+    canonical pixel apart
+    symbols too small to be downsampled, or of a layout no canonical grid has, are their own canonical grid
+    """
+    odd_width = width - 1 if width % 2 == 0 and width > 1 else width
+    row_anchors, col_anchors = _stroke_anchors(height, odd_width)
+    templates = None  # of the symbol size, built when a grid of the same layout is found
+    for may_meet in (False, True):
+        for canonical_width in CANONICAL_WIDTHS:
+            canonical_height = int(round(canonical_width * height / width))
+            if canonical_width >= odd_width or canonical_height >= height:
+                break
+            if canonical_height < MIN_CANONICAL_HEIGHT:
+                continue
+            canonical_row_anchors, canonical_col_anchors = _stroke_anchors(canonical_height, canonical_width)
+            if _same_order(row_anchors, canonical_row_anchors, may_meet) and \
+                    _same_order(col_anchors, canonical_col_anchors, may_meet):
+                if templates is None:
+                    templates = _stack_symbol_templates(create_symbols(symbol_height=height, symbol_width=width))
+                if _is_faithful(templates, canonical_height, canonical_width):
+                    return canonical_height, canonical_width
+    return height, width
+
+
+@lru_cache(maxsize=256)
+def get_canonical_mapping(height: int, width: int) -> dict:
+    """
+    the mapping of a canonical grid - sizes decoded at their own size are their own grid, so there are about as many
+    grids as distinct incoming sizes of no shared aspect ratio, each mapping is 37 small symbols
+    """
+    return create_symbols(symbol_height=height, symbol_width=width)
+
+
+def _edges(source_anchors: np.ndarray, target_anchors: np.ndarray) -> np.ndarray:
+    """ source coordinates of the target pixel edges, the stroke anchors of the target map to those of the source """
+    _, unique = np.unique(target_anchors, return_index=True)
+    return np.interp(np.arange(int(target_anchors[-1]) + 1), target_anchors[unique], source_anchors[unique])
+
+
+def _overlap_matrix(edges: np.ndarray, source_size: int) -> np.ndarray:
+    """ (target, source) overlap of each target cell [edges[i], edges[i + 1]) with each source pixel [j, j + 1) """
+    source_pixels = np.arange(source_size)
+    low = np.maximum(edges[:-1, None], source_pixels[None, :])
+    high = np.minimum(edges[1:, None], source_pixels[None, :] + 1)
+    return np.clip(high - low, 0, None).astype(np.float32)
+
+
+def _merge_central_columns(symbols: np.ndarray) -> np.ndarray:
+    """ merge the two central columns of symbols of even width, the result has the odd width - 1 """
+    center = symbols.shape[-1] // 2
+    merged_center = np.maximum(symbols[..., center - 1:center], symbols[..., center:center + 1])
+    return np.concatenate([symbols[..., :center - 1], merged_center, symbols[..., center + 1:]], axis=-1)
+
+
+@lru_cache(maxsize=64)
+def _resampling_matrices(source_shape: tuple, target_shape: tuple) -> tuple:
+    source_rows, source_cols = _stroke_anchors(*source_shape)
+    target_rows, target_cols = _stroke_anchors(*target_shape)
+    rows = _overlap_matrix(_edges(source_rows, target_rows), source_shape[0])
+    cols = _overlap_matrix(_edges(source_cols, target_cols), source_shape[1])
+    return rows, cols
+
+
+def resample_symbols(symbols: np.ndarray, height: int, width: int) -> np.ndarray:
+    """
+    resample symbols of shape (N, source height, source width) to float32 symbols of shape (N, height, width)
+    a target pixel is the larger of the fraction of its columns and the fraction of its rows that hold ink,
+    so a one pixel wide line keeps full strength at any scale
+    large inputs are processed in chunks of about RESAMPLE_CHUNK_PIXELS source pixels to bound memory
+    """
+    symbols = np.asarray(symbols)
+    source_height, source_width = symbols.shape[1:]
+    if (source_height, source_width) == (height, width):
+        return (symbols > 0).astype(np.float32)
+    is_even_width = source_width % 2 == 0 and source_width > 1
+    if is_even_width:
+        source_width -= 1
+    rows, cols = _resampling_matrices((source_height, source_width), (height, width))
+    rows_any, cols_any = (rows > 0).astype(np.float32), (cols > 0).astype(np.float32)
+    rows_fraction = rows / rows.sum(axis=1, keepdims=True)
+    cols_fraction = cols / cols.sum(axis=1, keepdims=True)
+
+    resampled = np.empty(shape=(len(symbols), height, width), dtype=np.float32)
+    chunk_size = max(1, RESAMPLE_CHUNK_PIXELS // max(1, int(np.prod(symbols.shape[1:]))))
+    for start in range(0, len(symbols), chunk_size):
+        chunk = (symbols[start:start + chunk_size] > 0).astype(np.float32)
+        if is_even_width:
+            chunk = _merge_central_columns(chunk)
+        inked_columns = ((rows_any @ chunk) > 0).astype(np.float32) @ cols_fraction.T
+        inked_rows = rows_fraction @ ((chunk @ cols_any.T) > 0).astype(np.float32)
+        np.maximum(inked_columns, inked_rows, out=resampled[start:start + chunk_size])
+    return resampled
+
+
+def cistercian_to_arabic_any_size(cistercian_symbols) -> tuple:
+    """
+    convert symbols of any size to arabic numbers -
+    either an array of shape (N, height, width) or a sequence of N 2D symbols of mixed sizes
+    symbols are grouped by canonical grid, each group is resampled and decoded in one batch
+    returns the numbers (N,) and the per order confidence (N, 4) of cistercian_to_arabic_tolerant
+    """
+    if isinstance(cistercian_symbols, np.ndarray):
+        groups = {cistercian_symbols.shape[1:]: (np.arange(len(cistercian_symbols)), cistercian_symbols)}
+    else:
+        indices_by_shape = {}
+        for ix, symbol in enumerate(cistercian_symbols):
+            indices_by_shape.setdefault(np.shape(symbol), []).append(ix)
+        groups = {shape: (np.array(indices), np.stack([cistercian_symbols[ix] for ix in indices]))
+                  for shape, indices in indices_by_shape.items()}
+
+    resampled_by_canonical_shape = {}
+    for shape, (indices, symbols) in groups.items():
+        target_shape = canonical_shape(*shape)
+        resampled = resample_symbols(symbols, *target_shape)
+        resampled_by_canonical_shape.setdefault(target_shape, []).append((indices, resampled))
+
+    num_symbols = sum(len(indices) for indices, _ in groups.values())
+    values = np.zeros(shape=num_symbols, dtype=int)
+    confidences = np.zeros(shape=(num_symbols, 4), dtype=np.float32)
+    for target_shape, resampled in resampled_by_canonical_shape.items():
+        indices = np.concatenate([group_indices for group_indices, _ in resampled])
+        symbols = np.concatenate([group_symbols for _, group_symbols in resampled])
+        values[indices], confidences[indices] = cistercian_to_arabic_tolerant(symbols,
+                                                                              get_canonical_mapping(*target_shape))
+    return values, confidences
@@ -0,0 +1,139 @@
+"""
+This file contains segmentation of binary images holding many symbols (multi glyph strips, rows and pages of symbols)
+into the bounding box of each symbol, and decoding of all symbols found in one batch
+
+segmentation uses projections only -
+ - rows of symbols are the runs of rows holding ink of vertical strokes at least min_symbol_height long (rows of
+   symbols are separated by at least one row without such ink) - every symbol has a central line spanning its full
+   height, and specks of noise between rows of symbols are ignored instead of merging them into one
+ - every symbol has a central line spanning its full height, symbols are found by the columns of a row of symbols
+   that are (almost) fully inked
+ - the width of the symbols of a row is the widest ink extent around their central lines, unless given
+
+expected input - a 2D array, ink is > 0 (see sheet_rendering for converting 8-bit images, where ink is dark)
+symbols of a row are expected to have the same height and to be top and bottom aligned
+the symbol of 0 is blank and cannot be found - images of fixed layout that may hold zeros (multi glyph strips, sheets)
+are better decoded by position, e.g. with multi_glyph.cistercian_multi_glyph_to_arabic
+"""
+import numpy as np
+
+from symbol_generation.resampling import cistercian_to_arabic_any_size
+
+DEFAULT_MIN_CENTRAL_FILL = 0.9  # fraction of the row height a column must be inked to be a central line
+DEFAULT_MIN_SYMBOL_HEIGHT = 5  # shorter vertical runs of ink are noise when finding rows of symbols
+
+
+def _runs(mask: np.ndarray) -> tuple:
+    """ starts and (exclusive) ends of the runs of True in a 1D boolean array """
+    edges = np.diff(np.concatenate([[0], mask.astype(np.int8), [0]]))
+    return np.flatnonzero(edges == 1), np.flatnonzero(edges == -1)
+
+
+def _long_vertical_runs(ink: np.ndarray, min_length: int) -> np.ndarray:
+    """ the pixels of a 2D boolean array that are in vertical runs of True at least min_length long """
+    column_major = ink.T
+    starts = column_major.copy()
+    starts[:, 1:] &= ~column_major[:, :-1]
+    run_ids = np.cumsum(starts) * column_major.reshape(-1)  # 0 off the runs
+    run_lengths = np.bincount(run_ids)
+    run_lengths[0] = 0
+    return (run_lengths[run_ids] >= min_length).reshape(column_major.shape).T
+
+
+def _row_boxes(band: np.ndarray, symbol_width: int, min_central_fill: float) -> tuple:
+    """
+    left and (exclusive) right column of each symbol in a band of rows holding one row of symbols
+    every inked column belongs to the nearest central line, the symbols of the row extend by the widest extent of
+    ink on either side of their central line, unless the symbol width is given
+    symbols of even width have two central columns (tens and thousands are mirrored to the left of the units'),
+    a symbol with only one of them gets the other on the side opposite to its ink
+    """
+    column_fill = band.mean(axis=0)
+    central_starts, central_ends = _runs(column_fill >= min_central_fill)
+    if len(central_starts) == 0:
+        return np.zeros(shape=0, dtype=int), np.zeros(shape=0, dtype=int)
+    central_lefts, central_rights = central_starts, central_ends - 1
+
+    inked_columns = np.flatnonzero(column_fill > 0)
+    midpoints = (central_rights[:-1] + central_lefts[1:]) / 2
+    owners = np.searchsorted(midpoints, inked_columns, side='right')
+    left_extents = np.zeros(shape=len(central_starts), dtype=int)
+    right_extents = np.zeros(shape=len(central_starts), dtype=int)
+    np.maximum.at(left_extents, owners, central_lefts[owners] - inked_columns)
+    np.maximum.at(right_extents, owners, inked_columns - central_rights[owners])
+
+    if symbol_width is None:
+        is_even_width = (central_ends - central_starts == 2).any()
+        extent = max(left_extents.max(), right_extents.max())
+    else:
+        is_even_width = symbol_width % 2 == 0
+        extent = (symbol_width - 1) // 2
+
+    if is_even_width:
+        is_single = central_ends - central_starts == 1
+        is_left_only = is_single & (left_extents > 0) & (right_extents == 0)  # tens and thousands only
+        central_lefts = np.where(is_single & ~is_left_only, central_lefts - 1, central_lefts)
+        central_rights = np.where(is_left_only, central_rights + 1, central_rights)
+
+    return central_lefts - extent, central_rights + extent + 1
+
+
+def find_symbol_boxes(image: np.ndarray, symbol_width: int = None,
+                      min_central_fill: float = DEFAULT_MIN_CENTRAL_FILL,
+                      min_symbol_height: int = DEFAULT_MIN_SYMBOL_HEIGHT) -> np.ndarray:
+    """
+    return the bounding boxes of the symbols in a binary image as an int array of shape (M, 4) -
+    (top, bottom, left, right) with exclusive bottom and right, in reading order
+    symbol_width - the width of the symbols in pixels, estimated per row of symbols if not given
+    min_symbol_height - the height of the smallest symbols, shorter vertical strokes do not make a row of symbols
+    """
+    image = np.asarray(image)
+    assert image.ndim == 2, f"Unsupported input, expected a 2D image, got shape {image.shape}"
+    ink = image > 0
+
+    boxes = []
+    for top, bottom in zip(*_runs(_long_vertical_runs(ink, min_symbol_height).any(axis=1))):
+        lefts, rights = _row_boxes(ink[top:bottom], symbol_width, min_central_fill)
+        boxes.append(np.stack([np.full_like(lefts, top), np.full_like(lefts, bottom), lefts, rights], axis=1))
+    if not boxes:
+        return np.zeros(shape=(0, 4), dtype=int)
+    return np.concatenate(boxes)
+
+
+def crop_symbols(image: np.ndarray, boxes: np.ndarray) -> list:
+    """
+    crop the boxes of find_symbol_boxes from the image, boxes reaching past the image edges are padded with blank
+    pixels - returns a list of 2D symbols, boxes of a row of symbols are cropped together with one gather
+    """
+    image = np.asarray(image)
+    if len(boxes) == 0:
+        return []
+    pad = max(0, -int(boxes[:, 2].min()), int(boxes[:, 3].max()) - image.shape[1])
+    padded = np.pad(image, ((0, 0), (pad, pad)))
+
+    symbols = []
+    row_starts = np.flatnonzero(np.diff(np.concatenate([[-1], boxes[:, 0]])) != 0)
+    for start, end in zip(row_starts, list(row_starts[1:]) + [len(boxes)]):
+        top, bottom = boxes[start, :2]
+        widths = boxes[start:end, 3] - boxes[start:end, 2]
+        if (widths == widths[0]).all():
+            columns = boxes[start:end, 2, None] + pad + np.arange(widths[0])  # (symbols, width)
+            symbols.extend(padded[top:bottom, columns].transpose(1, 0, 2))
+        else:
+            symbols.extend(padded[top:bottom, left + pad:right + pad] for left, right in boxes[start:end, 2:])
+    return symbols
+
+
+def cistercian_page_to_arabic(image: np.ndarray, symbol_width: int = None,
+                              min_central_fill: float = DEFAULT_MIN_CENTRAL_FILL,
+                              min_symbol_height: int = DEFAULT_MIN_SYMBOL_HEIGHT) -> tuple:
+    """
+    find, crop and decode all symbols in a binary image in one batch (any size, see resampling)
+    returns the numbers (M,), the per order confidences (M, 4) and the boxes (M, 4) of the symbols in reading order
+    """
+    boxes = find_symbol_boxes(image, symbol_width=symbol_width, min_central_fill=min_central_fill,
+                              min_symbol_height=min_symbol_height)
+    if len(boxes) == 0:
+        return np.zeros(shape=0, dtype=int), np.zeros(shape=(0, 4), dtype=np.float32), boxes
+    values, confidences = cistercian_to_arabic_any_size(crop_symbols(image, boxes))
+    return values, confidences, boxes
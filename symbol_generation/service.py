@@ -0,0 +1,247 @@
+"""
+This file contains an asyncio encode / decode service over a line protocol on TCP,
+concurrent requests are coalesced into batches that are encoded / decoded with a single vectorized atlas call
+
+protocol - one JSON object per line each way, responses carry the id of their request and may arrive out of order
+    {"id": 1, "op": "encode", "number": 1993}         -> {"id": 1, "symbol": [[0, 0, 1, 0, 0], ...]}
+    {"id": 2, "op": "decode", "symbol": [[...], ...]}  -> {"id": 2, "number": 1993}
+    invalid requests                                   -> {"id": 3, "error": "..."}
+
+usage -
+    python -m symbol_generation.service serve --port 8765
+    python -m symbol_generation.service load-test --port 8765 --requests 10000 --concurrency 64
+"""
+import argparse
+import asyncio
+import json
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+
+from symbol_generation.glyph_atlas import get_atlas, MAX_NUMBER
+
+DEFAULT_HOST = '127.0.0.1'
+DEFAULT_PORT = 8765
+DEFAULT_MAX_BATCH_SIZE = 1024
+DEFAULT_MAX_DELAY = 0.002  # seconds the first request of a batch waits for others to join
+MAX_LINE_SIZE = 2 ** 24
+
+
+class MicroBatcher:
+    """
+    coalesce items submitted concurrently into batches of up to max_batch_size items, a batch is processed once it
+    is full or max_delay seconds after its first item arrived
+    process_batch(items) -> results runs on the executor so the event loop stays responsive
+    """
+    def __init__(self, process_batch, max_batch_size: int = DEFAULT_MAX_BATCH_SIZE,
+                 max_delay: float = DEFAULT_MAX_DELAY, executor=None):
+        self.process_batch = process_batch
+        self.max_batch_size = max_batch_size
+        self.max_delay = max_delay
+        self.executor = executor
+        self.num_batches = 0
+        self.num_items = 0
+        self._items = []
+        self._futures = []
+        self._timer = None
+
+    async def submit(self, item):
+        future = asyncio.get_running_loop().create_future()
+        self._items.append(item)
+        self._futures.append(future)
+        if len(self._items) >= self.max_batch_size:
+            self._flush()
+        elif self._timer is None:
+            self._timer = asyncio.get_running_loop().call_later(self.max_delay, self._flush)
+        return await future
+
+    def _flush(self):
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+        items, futures = self._items, self._futures
+        self._items, self._futures = [], []
+        if items:
+            asyncio.ensure_future(self._run_batch(items, futures))
+
+    async def _run_batch(self, items: list, futures: list):
+        self.num_batches += 1
+        self.num_items += len(items)
+        try:
+            results = await asyncio.get_running_loop().run_in_executor(self.executor, self.process_batch, items)
+        except Exception as e:
+            for future in futures:
+                if not future.done():
+                    future.set_exception(e)
+            return
+        for future, result in zip(futures, results):
+            if not future.done():
+                future.set_result(result)
+
+
+class CistercianService:
+    """ encode / decode batchers for one symbol size, and the line protocol connection handler """
+    def __init__(self, height: int, width: int, max_batch_size: int = DEFAULT_MAX_BATCH_SIZE,
+                 max_delay: float = DEFAULT_MAX_DELAY, executor=None):
+        self.atlas = get_atlas(height, width)
+        self.executor = executor or ThreadPoolExecutor(max_workers=1)  # numpy releases the GIL in the batch calls
+        self.encoder = MicroBatcher(self._encode_batch, max_batch_size, max_delay, self.executor)
+        self.decoder = MicroBatcher(self._decode_batch, max_batch_size, max_delay, self.executor)
+
+    def _encode_batch(self, numbers: list) -> list:
+        return self.atlas.encode(np.array(numbers, dtype=np.int64)).tolist()
+
+    def _decode_batch(self, symbols: list) -> list:
+        return self.atlas.decode(np.stack(symbols)).tolist()
+
+    async def handle_request(self, request: dict) -> dict:
+        response = {'id': request.get('id')}
+        op = request.get('op')
+        if op == 'encode':
+            number = request.get('number')
+            if isinstance(number, bool) or not isinstance(number, int) or not 0 <= number <= MAX_NUMBER:
+                return {**response, 'error': f"Number out of range, supported range is [0, {MAX_NUMBER}], got {number}"}
+            return {**response, 'symbol': await self.encoder.submit(number)}
+        if op == 'decode':
+            try:
+                symbol = np.asarray(request.get('symbol'), dtype=np.int64)
+            except (TypeError, ValueError, OverflowError) as e:
+                return {**response, 'error': f"Unsupported symbol, {e}"}
+            max_pixel = np.iinfo(self.atlas.dtype).max
+            if symbol.size and not 0 <= symbol.min() <= symbol.max() <= max_pixel:
+                return {**response, 'error': f"Unsupported symbol, pixels must be in [0, {max_pixel}]"}
+            if symbol.shape != (self.atlas.height, self.atlas.width):
+                return {**response, 'error': f"Size mismatch between symbol and service, symbol shape: "
+                                             f"{symbol.shape}, service shape: {(self.atlas.height, self.atlas.width)}"}
+            return {**response, 'number': await self.decoder.submit(symbol.astype(self.atlas.dtype))}
+        return {**response, 'error': f"Unsupported op {op}, supported ops are 'encode', 'decode'"}
+
+    async def _respond(self, line: bytes, writer: asyncio.StreamWriter):
+        try:
+            request = json.loads(line)
+            assert isinstance(request, dict), "Expected a JSON object per line"
+        except (ValueError, AssertionError) as e:
+            response = {'id': None, 'error': f"Unsupported request, {e}"}
+        else:
+            try:
+                response = await self.handle_request(request)
+            except Exception as e:  # every request gets a response line, the client never waits on a failed one
+                response = {'id': request.get('id'), 'error': f"Failed to handle request, {e!r}"}
+        writer.write(json.dumps(response, separators=(',', ':')).encode() + b'\n')
+
+    async def handle_connection(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        """ requests of a connection are handled concurrently, so a pipelining client fills batches on its own """
+        pending = set()
+        try:
+            while True:
+                line = await reader.readline()
+                if not line:
+                    break
+                if not line.strip():
+                    continue
+                task = asyncio.ensure_future(self._respond(line, writer))
+                pending.add(task)
+                task.add_done_callback(pending.discard)
+                await writer.drain()
+            if pending:
+                await asyncio.gather(*pending)
+            await writer.drain()
+        except ConnectionError:
+            pass
+        finally:
+            writer.close()
+
+
+async def start_server(host: str = DEFAULT_HOST, port: int = DEFAULT_PORT, height: int = 17, width: int = 15,
+                       max_batch_size: int = DEFAULT_MAX_BATCH_SIZE, max_delay: float = DEFAULT_MAX_DELAY) -> tuple:
+    """ return the started asyncio server and its service, port 0 picks a free port """
+    service = CistercianService(height, width, max_batch_size=max_batch_size, max_delay=max_delay)
+    server = await asyncio.start_server(service.handle_connection, host, port, limit=MAX_LINE_SIZE)
+    return server, service
+
+
+async def _client_worker(host: str, port: int, requests: list, latencies: list, responses: dict):
+    reader, writer = await asyncio.open_connection(host, port, limit=MAX_LINE_SIZE)
+    try:
+        for request in requests:
+            start = time.perf_counter()
+            writer.write(json.dumps(request, separators=(',', ':')).encode() + b'\n')
+            await writer.drain()
+            response = json.loads(await reader.readline())
+            latencies.append(time.perf_counter() - start)
+            responses[response['id']] = response
+    finally:
+        writer.close()
+
+
+async def run_load_test(host: str = DEFAULT_HOST, port: int = DEFAULT_PORT, num_requests: int = 10000,
+                        concurrency: int = 64, op: str = 'encode', height: int = 17, width: int = 15,
+                        seed: int = 0) -> dict:
+    """
+    send num_requests requests over concurrency connections, one request in flight per connection,
+    return the throughput and the p50 / p99 latency in seconds and the responses by request id
+    decode requests are the symbols of random numbers of the given size, encoded locally
+    """
+    numbers = np.random.default_rng(seed).integers(0, MAX_NUMBER + 1, size=num_requests)
+    if op == 'encode':
+        requests = [{'id': ix, 'op': 'encode', 'number': int(number)} for ix, number in enumerate(numbers)]
+    else:
+        symbols = get_atlas(height, width).encode(numbers).tolist()
+        requests = [{'id': ix, 'op': 'decode', 'symbol': symbol} for ix, symbol in enumerate(symbols)]
+
+    latencies, responses = [], {}
+    start = time.perf_counter()
+    await asyncio.gather(*[_client_worker(host, port, requests[worker::concurrency], latencies, responses)
+                           for worker in range(concurrency)])
+    seconds = time.perf_counter() - start
+    return {
+        'requests': num_requests,
+        'seconds': seconds,
+        'requests_per_second': num_requests / seconds,
+        'p50': float(np.percentile(latencies, 50)),
+        'p99': float(np.percentile(latencies, 99)),
+        'numbers': numbers,
+        'responses': responses,
+    }
+
+
+async def _serve(args):
+    server, _ = await start_server(args.host, args.port, args.height, args.width, args.max_batch_size,
+                                   args.max_delay)
+    print(f"serving {args.height}x{args.width} symbols on {args.host}:{server.sockets[0].getsockname()[1]}")
+    async with server:
+        await server.serve_forever()
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--host', default=DEFAULT_HOST)
+    parser.add_argument('--port', type=int, default=DEFAULT_PORT)
+    parser.add_argument('--height', '-hh', type=int, default=17, help="height of symbols in pixels")
+    parser.add_argument('--width', '-ww', type=int, default=15, help="width of symbols in pixels")
+    subparsers = parser.add_subparsers(dest='command', required=True)
+
+    serve_parser = subparsers.add_parser('serve', help="run the service")
+    serve_parser.add_argument('--max-batch-size', type=int, default=DEFAULT_MAX_BATCH_SIZE)
+    serve_parser.add_argument('--max-delay', type=float, default=DEFAULT_MAX_DELAY,
+                              help="seconds a request waits for others to join its batch")
+
+    load_test_parser = subparsers.add_parser('load-test', help="measure latency and throughput of a running service")
+    load_test_parser.add_argument('--requests', type=int, default=10000)
+    load_test_parser.add_argument('--concurrency', type=int, default=64)
+    load_test_parser.add_argument('--op', choices=['encode', 'decode'], default='encode')
+
+    return parser.parse_args(argv)
+
+
+if __name__ == "__main__":
+    args = parse_args()
+    if args.command == 'serve':
+        asyncio.run(_serve(args))
+    else:
+        stats = asyncio.run(run_load_test(args.host, args.port, args.requests, args.concurrency, args.op,
+                                          args.height, args.width))
+        print(f"{stats['requests']} {args.op} requests in {stats['seconds']:.2f}s "
+              f"({stats['requests_per_second']:.0f}/s), p50 {stats['p50'] * 1e3:.2f} ms, "
+              f"p99 {stats['p99'] * 1e3:.2f} ms")
@@ -0,0 +1,229 @@
+"""
+This file contains a headless renderer that tiles many symbols into a single sheet image (e.g. a wall chart of all
+10,000 numbers), without a matplotlib figure per symbol
+
+sheets are 8-bit grayscale, black ink on a white background, written as binary PGM or PNG using the standard library
+PGM and 8-bit PNG images (e.g. symbol images to decode) are read with the standard library too
+large sheets are split into tiles (bands of symbol rows) rendered by parallel workers into a shared memory map,
+every worker draws only the symbols of its tile with the stroke engine, no atlas of all 10,000 symbols is built
+"""
+import os
+import struct
+import tempfile
+import zlib
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+
+from symbol_generation.strokes import number_to_stroke_mask, rasterize_stroke_masks
+
+INK = 0
+BACKGROUND = 255
+DEFAULT_ROWS_PER_TILE = 16
+
+
+def sheet_shape(num_symbols: int, height: int, width: int, columns: int, padding: int) -> tuple:
+    """ (height, width) in pixels of a sheet of num_symbols symbols, padding pixels around every symbol """
+    rows = -(-num_symbols // columns)
+    return rows * (height + padding) + padding, columns * (width + padding) + padding
+
+
+def tile_symbols(symbols: np.ndarray, columns: int, padding: int = 1, out: np.ndarray = None) -> np.ndarray:
+    """
+    tile symbols of shape (N, height, width) row by row into a sheet of the given number of columns
+    out - a preallocated (e.g. memory mapped) uint8 array of sheet_shape to render into
+    """
+    num_symbols, height, width = symbols.shape
+    shape = sheet_shape(num_symbols, height, width, columns, padding)
+    if out is None:
+        out = np.empty(shape=shape, dtype=np.uint8)
+    assert out.shape == shape, f"Unexpected sheet shape, expected {shape}, got {out.shape}"
+
+    rows = -(-num_symbols // columns)
+    cells = np.full(shape=(rows * columns, height + padding, width + padding), fill_value=BACKGROUND,
+                    dtype=np.uint8)
+    cells[:num_symbols, :height, :width] = np.where(symbols > 0, INK, BACKGROUND)
+    # (rows, columns, cell height, cell width) -> (rows, cell height, columns, cell width) -> pixels
+    cells = cells.reshape(rows, columns, height + padding, width + padding).transpose(0, 2, 1, 3)
+
+    out[:padding] = BACKGROUND
+    out[:, :padding] = BACKGROUND
+    out[padding:, padding:] = cells.reshape(shape[0] - padding, shape[1] - padding)
+    return out
+
+
+def _pgm_header(shape: tuple) -> bytes:
+    return f"P5\n{shape[1]} {shape[0]}\n255\n".encode('ascii')
+
+
+def write_pgm(path: str, image: np.ndarray):
+    with open(path, 'wb') as f:
+        f.write(_pgm_header(image.shape))
+        f.write(np.ascontiguousarray(image, dtype=np.uint8).tobytes())
+
+
+def read_pgm(path: str) -> np.ndarray:
+    """ read a binary (P5) 8-bit PGM image """
+    with open(path, 'rb') as f:
+        header_fields = []
+        while len(header_fields) < 4:
+            line = f.readline()
+            assert line, f"Unexpected end of PGM file {path}"
+            header_fields += line.split(b'#')[0].split()
+        magic, width, height, max_value = header_fields
+        assert magic == b'P5' and int(max_value) < 256, f"Unsupported PGM file {path}, only 8-bit binary PGM supported"
+        return np.frombuffer(f.read(int(width) * int(height)), dtype=np.uint8).reshape(int(height), int(width))
+
+
+def _png_chunk(chunk_type: bytes, data: bytes) -> bytes:
+    return struct.pack('>I', len(data)) + chunk_type + data + struct.pack('>I', zlib.crc32(chunk_type + data))
+
+
+def write_png(path: str, image: np.ndarray, rows_per_chunk: int = 256):
+    """ write an 8-bit grayscale PNG, compressing rows_per_chunk rows at a time so memory mapped images stream """
+    image_height, image_width = image.shape
+    compressor = zlib.compressobj()
+    with open(path, 'wb') as f:
+        f.write(b'\x89PNG\r\n\x1a\n')
+        f.write(_png_chunk(b'IHDR', struct.pack('>IIBBBBB', image_width, image_height, 8, 0, 0, 0, 0)))
+        for start in range(0, image_height, rows_per_chunk):
+            rows = np.asarray(image[start:start + rows_per_chunk], dtype=np.uint8)
+            scanlines = np.zeros(shape=(len(rows), image_width + 1), dtype=np.uint8)  # filter type 0 per row
+            scanlines[:, 1:] = rows
+            compressed = compressor.compress(scanlines.tobytes())
+            if compressed:
+                f.write(_png_chunk(b'IDAT', compressed))
+        f.write(_png_chunk(b'IDAT', compressor.flush()))
+        f.write(_png_chunk(b'IEND', b''))
+
+
+PNG_CHANNELS = {0: 1, 2: 3, 3: 1, 4: 2, 6: 4}  # by color type - gray, RGB, palette, gray and alpha, RGBA
+
+
+def _png_chunks(path: str):
+    with open(path, 'rb') as f:
+        assert f.read(8) == b'\x89PNG\r\n\x1a\n', f"Unsupported file {path}, not a PNG file"
+        while True:
+            header = f.read(8)
+            if len(header) < 8:
+                return
+            length, chunk_type = struct.unpack('>I4s', header)
+            data = f.read(length)
+            f.read(4)  # crc
+            yield chunk_type, data
+            if chunk_type == b'IEND':
+                return
+
+
+def _unfilter_png_rows(filtered: np.ndarray, bytes_per_pixel: int) -> np.ndarray:
+    """ undo the per row filters of PNG scanlines of shape (height, 1 + row bytes) """
+    rows = np.zeros(shape=(len(filtered), filtered.shape[1] - 1), dtype=np.uint8)
+    previous = np.zeros(shape=rows.shape[1], dtype=np.int64)
+    for ix, (filter_type, row) in enumerate(zip(filtered[:, 0], filtered[:, 1:].astype(np.int64))):
+        if filter_type == 1:  # sub - a running sum per channel
+            row = np.cumsum(row.reshape(-1, bytes_per_pixel), axis=0).reshape(-1)
+        elif filter_type == 2:  # up
+            row = row + previous
+        elif filter_type in (3, 4):  # average, paeth - each pixel depends on the one before it
+            row = row.tolist()
+            above = previous.tolist()
+            for x in range(len(row)):
+                left = row[x - bytes_per_pixel] if x >= bytes_per_pixel else 0
+                if filter_type == 3:
+                    row[x] = (row[x] + (left + above[x]) // 2) & 0xff
+                else:
+                    upper_left = above[x - bytes_per_pixel] if x >= bytes_per_pixel else 0
+                    estimate = left + above[x] - upper_left
+                    distances = abs(estimate - left), abs(estimate - above[x]), abs(estimate - upper_left)
+                    predictor = (left, above[x], upper_left)[distances.index(min(distances))]
+                    row[x] = (row[x] + predictor) & 0xff
+            row = np.array(row, dtype=np.int64)
+        else:
+            assert filter_type == 0, f"Unsupported PNG filter type {filter_type}"
+        previous = row & 0xff
+        rows[ix] = previous
+    return rows
+
+
+def read_png(path: str) -> np.ndarray:
+    """
+    read an 8-bit, non interlaced PNG image - (height, width) for grayscale and palette images (palette images are
+    converted to gray), (height, width, channels) for gray and alpha, RGB and RGBA images
+    """
+    idat, palette = [], None
+    for chunk_type, data in _png_chunks(path):
+        if chunk_type == b'IHDR':
+            width, height, bit_depth, color_type, _, _, interlace = struct.unpack('>IIBBBBB', data)
+            assert bit_depth == 8 and color_type in PNG_CHANNELS and interlace == 0, \
+                f"Unsupported PNG file {path}, only 8-bit non interlaced PNG supported"
+        elif chunk_type == b'PLTE':
+            palette = np.frombuffer(data, dtype=np.uint8).reshape(-1, 3)
+        elif chunk_type == b'IDAT':
+            idat.append(data)
+
+    channels = PNG_CHANNELS[color_type]
+    filtered = np.frombuffer(zlib.decompress(b''.join(idat)), dtype=np.uint8)
+    filtered = filtered[:height * (1 + width * channels)].reshape(height, 1 + width * channels)
+    image = _unfilter_png_rows(filtered, channels).reshape(height, width, channels)
+    if color_type == 3:
+        assert palette is not None, f"Unsupported PNG file {path}, palette image without a palette"
+        return palette[image[:, :, 0]].mean(axis=2).round().astype(np.uint8)
+    return image[:, :, 0] if channels == 1 else image
+
+
+def _render_tile(sheet_path: str, offset: int, shape: tuple, numbers: np.ndarray, first_row: int, height: int,
+                 width: int, columns: int, padding: int):
+    """ render the symbol rows starting at first_row into their band of the memory mapped sheet """
+    sheet = np.memmap(sheet_path, dtype=np.uint8, mode='r+', offset=offset, shape=shape)
+    band_start = first_row * (height + padding)
+    band = sheet[band_start:band_start + sheet_shape(len(numbers), height, width, columns, padding)[0]]
+    symbols = rasterize_stroke_masks(number_to_stroke_mask(numbers), height=height, width=width)
+    tile_symbols(symbols, columns=columns, padding=padding, out=band)
+    sheet.flush()
+
+
+def render_sheet(numbers: np.ndarray, path: str, height: int, width: int, columns: int = 100, padding: int = 2,
+                 jobs: int = None, rows_per_tile: int = DEFAULT_ROWS_PER_TILE) -> tuple:
+    """
+    render the symbols of numbers to a .pgm or .png sheet, return the sheet shape
+    the sheet is split into tiles of rows_per_tile symbol rows, rendered by jobs worker processes
+    (all cores if not given, 1 renders in the current process) into a memory map -
+    the PGM file itself, or a temporary raw file that is then streamed to PNG
+    """
+    numbers = np.asarray(numbers)
+    assert len(numbers) > 0, "Expected at least one number to render"
+    assert ((0 <= numbers) & (numbers <= 9999)).all(), "Number out of range, supported range is [0, 9999]"
+    shape = sheet_shape(len(numbers), height, width, columns, padding)
+    is_png = path.endswith('.png')
+    assert is_png or path.endswith('.pgm'), f"Unsupported sheet format {path}, supported formats are .pgm, .png"
+
+    if is_png:
+        fd, sheet_path = tempfile.mkstemp(suffix='.raw', dir=os.path.dirname(os.path.abspath(path)))
+        os.close(fd)
+        offset = 0
+    else:
+        sheet_path = path
+        header = _pgm_header(shape)
+        with open(sheet_path, 'wb') as f:
+            f.write(header)
+        offset = len(header)
+    with open(sheet_path, 'r+b') as f:
+        f.truncate(offset + shape[0] * shape[1])
+
+    symbols_per_tile = rows_per_tile * columns
+    tile_args = [(sheet_path, offset, shape, numbers[start:start + symbols_per_tile], start // columns, height,
+                  width, columns, padding) for start in range(0, len(numbers), symbols_per_tile)]
+    try:
+        if jobs == 1:
+            for args in tile_args:
+                _render_tile(*args)
+        else:
+            with ProcessPoolExecutor(max_workers=jobs) as executor:
+                list(executor.map(_render_tile, *zip(*tile_args)))
+
+        if is_png:
+            write_png(path, np.memmap(sheet_path, dtype=np.uint8, mode='r', shape=shape))
+    finally:
+        if is_png:
+            os.remove(sheet_path)
+    return shape
@@ -0,0 +1,123 @@
+"""
+This file contains generator based pipeline stages for translating streams of numbers and symbols in chunks,
+memory use depends on the chunk size only and not on the size of the input
+
+numbers are read from text / CSV files (or stdin) one number per line,
+symbols are written to and read from .npy files (the header is completed when the stream ends) or raw binary streams
+"""
+import struct
+
+import numpy as np
+
+from symbol_generation.glyph_atlas import GlyphAtlas
+
+DEFAULT_CHUNK_SIZE = 65536
+
+_NPY_MAGIC = b'\x93NUMPY\x01\x00'
+_NPY_HEADER_SIZE = 128  # fixed, so the header can be rewritten with the final count after streaming the body
+
+
+def read_number_chunks(file_obj, chunk_size: int = DEFAULT_CHUNK_SIZE, column: int = 0, delimiter: str = ',',
+                       skip_header: bool = False):
+    """ yield int64 arrays of up to chunk_size numbers, read from the given column of each non-empty line """
+    chunk = []
+    for line_ix, line in enumerate(file_obj):
+        if skip_header and line_ix == 0:
+            continue
+        line = line.strip()
+        if not line:
+            continue
+        chunk.append(int(line.split(delimiter)[column]))
+        if len(chunk) == chunk_size:
+            yield np.array(chunk, dtype=np.int64)
+            chunk = []
+    if chunk:
+        yield np.array(chunk, dtype=np.int64)
+
+
+def write_number_chunks(number_chunks, file_obj) -> int:
+    """ write numbers one per line, return the number of numbers written """
+    count = 0
+    for numbers in number_chunks:
+        if len(numbers):
+            file_obj.write('\n'.join(map(str, numbers.tolist())) + '\n')
+        count += len(numbers)
+    return count
+
+
+def encode_chunks(number_chunks, atlas: GlyphAtlas):
+    for numbers in number_chunks:
+        yield atlas.encode(numbers)
+
+
+def decode_chunks(symbol_chunks, atlas: GlyphAtlas):
+    for symbols in symbol_chunks:
+        yield atlas.decode(symbols)
+
+
+def _npy_header(shape: tuple, dtype: np.dtype) -> bytes:
+    header = repr({'descr': np.lib.format.dtype_to_descr(np.dtype(dtype)), 'fortran_order': False, 'shape': shape})
+    header = header.ljust(_NPY_HEADER_SIZE - len(_NPY_MAGIC) - 2 - 1) + '\n'
+    return _NPY_MAGIC + struct.pack('<H', len(header)) + header.encode('latin1')
+
+
+def write_symbol_chunks(symbol_chunks, path: str, symbol_shape: tuple, dtype) -> int:
+    """
+    write symbol chunks of the given (height, width) shape to path as they arrive, return the number of symbols
+    a .npy path gets a header holding the final count, any other path is written raw
+    """
+    is_npy = path.endswith('.npy')
+    count = 0
+    with open(path, 'wb') as f:
+        if is_npy:
+            f.write(_npy_header((0,) + tuple(symbol_shape), dtype))
+        for symbols in symbol_chunks:
+            assert symbols.shape[1:] == tuple(symbol_shape), \
+                f"Size mismatch between symbols and stream, symbol shape: {symbols.shape[1:]}, " \
+                f"stream shape: {tuple(symbol_shape)}"
+            f.write(np.ascontiguousarray(symbols, dtype=dtype).tobytes())
+            count += len(symbols)
+        if is_npy:
+            f.seek(0)
+            f.write(_npy_header((count,) + tuple(symbol_shape), dtype))
+    return count
+
+
+def read_symbol_chunks(file_obj, chunk_size: int = DEFAULT_CHUNK_SIZE, symbol_shape: tuple = None, dtype=None):
+    """
+    yield arrays of up to chunk_size symbols read from a binary file object (e.g. sys.stdin.buffer)
+    without symbol_shape the stream is expected to start with a .npy header, otherwise it is raw symbols of the
+    given (height, width) shape and dtype
+    """
+    if symbol_shape is None:
+        npy_version = np.lib.format.read_magic(file_obj)
+        read_array_header = np.lib.format.read_array_header_1_0 if npy_version == (1, 0) \
+            else np.lib.format.read_array_header_2_0
+        shape, fortran_order, dtype = read_array_header(file_obj)
+        assert not fortran_order, "Unexpected symbols stream, symbols are not stored in C order"
+        symbol_shape = shape[1:]
+    dtype = np.dtype(dtype)
+
+    symbol_nbytes = int(np.prod(symbol_shape)) * dtype.itemsize
+    while True:
+        data = file_obj.read(chunk_size * symbol_nbytes)
+        if not data:
+            break
+        assert len(data) % symbol_nbytes == 0, "Unexpected end of symbols stream, the last symbol is incomplete"
+        yield np.frombuffer(data, dtype=dtype).reshape((-1,) + tuple(symbol_shape))
+
+
+def encode_stream(input_file, output_path: str, atlas: GlyphAtlas, chunk_size: int = DEFAULT_CHUNK_SIZE,
+                  **read_kwargs) -> int:
+    """ read numbers from a text file object and write their symbols to output_path, return the count """
+    number_chunks = read_number_chunks(input_file, chunk_size=chunk_size, **read_kwargs)
+    return write_symbol_chunks(encode_chunks(number_chunks, atlas), output_path,
+                               symbol_shape=(atlas.height, atlas.width), dtype=atlas.dtype)
+
+
+def decode_stream(input_file, output_file, atlas: GlyphAtlas, chunk_size: int = DEFAULT_CHUNK_SIZE,
+                  raw: bool = False) -> int:
+    """ read symbols from a binary file object and write their numbers to a text file object, return the count """
+    read_kwargs = {'symbol_shape': (atlas.height, atlas.width), 'dtype': atlas.dtype} if raw else {}
+    symbol_chunks = read_symbol_chunks(input_file, chunk_size=chunk_size, **read_kwargs)
+    return write_number_chunks(decode_chunks(symbol_chunks, atlas), output_file)
@@ -0,0 +1,69 @@
+"""
+This file contains a compact glyph representation - a symbol stored as the integer bitmask of its strokes
+(see strokes.py) instead of a dense height x width array
+
+composition of glyphs of different orders is a bitwise OR, equality and hashing compare a single int, and pixels are
+only drawn when requested, at any size
+    StrokeGlyph.from_number(1000) | StrokeGlyph.from_number(993) == StrokeGlyph.from_number(1993)
+    StrokeGlyph.from_number(1993).rasterize(height=512, width=512)
+
+for many glyphs, use arrays of stroke masks (uint32, 4 bytes per glyph) with the vectorized helpers of strokes.py -
+number_to_stroke_mask, np.bitwise_or to compose (unchecked - masks sharing an order compose to strokes that are not
+a number), == to compare, stroke_mask_to_number and rasterize_stroke_masks
+"""
+import numpy as np
+
+from symbol_generation.strokes import number_to_stroke_mask, stroke_mask_to_number, rasterize_stroke_mask, \
+    stroke_bit, CENTRAL_LINE
+from symbol_generation.symbol_classes import DEFAULT_DTYPE
+from symbol_generation.translating_cistercian_symbols import CistercianNumber
+
+
+class StrokeGlyph:
+    __slots__ = ('stroke_mask',)
+
+    def __init__(self, stroke_mask: int = 0):
+        self.stroke_mask = int(stroke_mask)
+
+    @classmethod
+    def from_number(cls, arabic_number: int) -> "StrokeGlyph":
+        assert 0 <= arabic_number <= 9999, f"Number out of range, supported range is [0, 9999], got {arabic_number}"
+        return cls(number_to_stroke_mask(arabic_number))
+
+    def __or__(self, other: "StrokeGlyph") -> "StrokeGlyph":
+        """ compose glyphs of different orders, like CistercianNumber.add_symbol """
+        for order, (used, other_used) in enumerate(zip(self.order_used, other.order_used)):
+            if used and other_used:
+                raise Exception(f'Cannot compose {self!r} and {other!r}, both use order {order}')
+        return StrokeGlyph(self.stroke_mask | other.stroke_mask)
+
+    def __eq__(self, other):
+        return isinstance(other, StrokeGlyph) and self.stroke_mask == other.stroke_mask
+
+    def __hash__(self):
+        return hash(self.stroke_mask)
+
+    def __repr__(self) -> str:
+        return f"StrokeGlyph({self.stroke_mask:#x})"
+
+    @property
+    def order_used(self) -> list:
+        return [bool(self.stroke_mask >> stroke_bit(order, CENTRAL_LINE) & 1) for order in range(4)]
+
+    @property
+    def value(self) -> int:
+        value = int(stroke_mask_to_number(self.stroke_mask))
+        if value < 0:
+            raise Exception(f'Unexpected strokes {self!r} - the strokes of an order are not a digit')
+        return value
+
+    def rasterize(self, height: int, width: int, dtype=DEFAULT_DTYPE) -> np.ndarray:
+        """ draw the symbol of shape (height, width) """
+        return rasterize_stroke_mask(self.stroke_mask, height, width, dtype=dtype)
+
+    def to_cistercian_number(self, height: int, width: int, dtype=DEFAULT_DTYPE) -> CistercianNumber:
+        cistercian_number = CistercianNumber(height=height, width=width, dtype=dtype)
+        cistercian_number.set_symbol(self.rasterize(height, width, dtype))
+        cistercian_number.order_used = self.order_used
+        cistercian_number.value = self.value
+        return cistercian_number
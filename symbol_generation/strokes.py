@@ -0,0 +1,154 @@
+"""
+This file contains a stroke engine - every Cistercian symbol is a union of strokes (see symbol_classes.py),
+the pixels of each stroke are computed once per symbol size as flat index arrays,
+so symbols are drawn from a bitmask of strokes with vectorized scatters and no per-pixel python work
+
+strokes of the units (order 0), drawn exactly as in create_symbols -
+ - central line, full image height
+ - top of image, half-width, right of image
+ - third-height of image, half-width, right of image
+ - diagonal from top > down to third-height, right of image
+ - diagonal from third-height > up to top, right of image
+ - right of image, 0 to third-of-image height
+
+the strokes of the tens, hundreds and thousands are the same flips used in create_symbols,
+each order has its own flipped copy of the central line, for odd widths all four copies are the same pixels
+
+bit (order * STROKES_PER_ORDER + stroke) of a stroke mask is set when that stroke is drawn
+"""
+from functools import lru_cache
+
+import numpy as np
+
+from symbol_generation.symbol_classes import CistercianSymbol, DEFAULT_DTYPE, TOP, TOP_THIRD, RIGHT
+
+CENTRAL_LINE = 0
+TOP_LINE = 1
+TOP_THIRD_LINE = 2
+DIAGONAL_DOWN = 3
+DIAGONAL_UP = 4
+OUTER_LINE = 5
+
+STROKES_PER_ORDER = 6
+NUM_STROKES = 4 * STROKES_PER_ORDER
+DIGIT_STROKES_PER_ORDER = STROKES_PER_ORDER - 1  # all strokes but the central line
+
+# strokes of each digit on top of the central line, same composition as create_symbols (5 is 4 + top line, etc.)
+DIGIT_STROKES = {
+    1: (TOP_LINE,),
+    2: (TOP_THIRD_LINE,),
+    3: (DIAGONAL_DOWN,),
+    4: (DIAGONAL_UP,),
+    5: (DIAGONAL_UP, TOP_LINE),
+    6: (OUTER_LINE,),
+    7: (OUTER_LINE, TOP_LINE),
+    8: (OUTER_LINE, TOP_THIRD_LINE),
+    9: (OUTER_LINE, TOP_THIRD_LINE, TOP_LINE),
+}
+
+
+def stroke_bit(order: int, stroke: int) -> int:
+    return order * STROKES_PER_ORDER + stroke
+
+
+def _create_digit_stroke_masks() -> np.ndarray:
+    """ (4, 10) array, the stroke mask of digit * 10 ** order, zero has no strokes """
+    digit_stroke_masks = np.zeros(shape=(4, 10), dtype=np.uint32)
+    for order in range(4):
+        for digit, strokes in DIGIT_STROKES.items():
+            for stroke in (CENTRAL_LINE,) + strokes:
+                digit_stroke_masks[order, digit] |= 1 << stroke_bit(order, stroke)
+    return digit_stroke_masks
+
+
+DIGIT_STROKE_MASKS = _create_digit_stroke_masks()
+
+
+def _create_stroke_digits() -> np.ndarray:
+    """ (2 ** 5,) array, the digit of each combination of the 5 digit strokes of an order, -1 if not a digit """
+    stroke_digits = np.full(shape=2 ** DIGIT_STROKES_PER_ORDER, fill_value=-1, dtype=np.int64)
+    stroke_digits[0] = 0
+    for digit, strokes in DIGIT_STROKES.items():
+        stroke_digits[sum(1 << (stroke - 1) for stroke in strokes)] = digit
+    return stroke_digits
+
+
+STROKE_DIGITS = _create_stroke_digits()
+
+
+def number_to_stroke_mask(arabic_numbers: np.ndarray) -> np.ndarray:
+    """ the stroke masks of an array of numbers in [0, 9999] """
+    arabic_numbers = np.asarray(arabic_numbers)
+    stroke_masks = np.zeros(shape=arabic_numbers.shape, dtype=np.uint32)
+    for order in range(4):
+        stroke_masks |= DIGIT_STROKE_MASKS[order][arabic_numbers // pow(10, order) % 10]
+    return stroke_masks
+
+
+def stroke_mask_to_number(stroke_masks: np.ndarray) -> np.ndarray:
+    """ the numbers of an array of stroke masks, -1 where the strokes of an order are not a digit """
+    stroke_masks = np.asarray(stroke_masks).astype(np.int64)
+    numbers = np.zeros(shape=stroke_masks.shape, dtype=np.int64)
+    is_number = np.ones(shape=stroke_masks.shape, dtype=bool)
+    for order in range(4):
+        combinations = stroke_masks >> stroke_bit(order, TOP_LINE) & (2 ** DIGIT_STROKES_PER_ORDER - 1)
+        digits = STROKE_DIGITS[combinations]
+        is_number &= digits >= 0
+        numbers += digits * pow(10, order)
+    return np.where(is_number, numbers, -1)
+
+
+def _draw_unit_stroke(symbol: CistercianSymbol, stroke: int):
+    if stroke == CENTRAL_LINE:
+        symbol.add_central_full_vertical_line()
+    elif stroke == TOP_LINE:
+        symbol.add_horizontal_line(location_str=TOP, direction_str=RIGHT)
+    elif stroke == TOP_THIRD_LINE:
+        symbol.add_horizontal_line(location_str=TOP_THIRD, direction_str=RIGHT)
+    elif stroke == DIAGONAL_DOWN:
+        symbol.add_diagonal_line(start_height_on_middle=TOP, end_height=TOP_THIRD, direction_str=RIGHT)
+    elif stroke == DIAGONAL_UP:
+        symbol.add_diagonal_line(start_height_on_middle=TOP_THIRD, end_height=TOP, direction_str=RIGHT)
+    elif stroke == OUTER_LINE:
+        symbol.add_vertical_line(width_str=RIGHT, start_str=TOP, end_str=TOP_THIRD)
+    else:
+        raise Exception(f'Unexpected stroke {stroke}')
+
+
+@lru_cache(maxsize=32)
+def get_stroke_indices(height: int, width: int) -> tuple:
+    """ flat pixel indices of all NUM_STROKES strokes for the given size, indexed by stroke bit, read only """
+    stroke_indices = [None] * NUM_STROKES
+    for stroke in range(STROKES_PER_ORDER):
+        symbol = CistercianSymbol(height=height, width=width, is_zero=True)
+        _draw_unit_stroke(symbol, stroke)
+        rows, cols = np.nonzero(symbol.get_symbol())
+        # same flips as create_symbols - tens: left-right, hundreds: up-down, thousands: both
+        flipped_rows, flipped_cols = height - 1 - rows, width - 1 - cols
+        for order, (order_rows, order_cols) in enumerate([(rows, cols), (rows, flipped_cols),
+                                                          (flipped_rows, cols), (flipped_rows, flipped_cols)]):
+            indices = np.sort(order_rows * width + order_cols)
+            indices.flags.writeable = False
+            stroke_indices[stroke_bit(order, stroke)] = indices
+    return tuple(stroke_indices)
+
+
+def rasterize_stroke_mask(stroke_mask: int, height: int, width: int, dtype=DEFAULT_DTYPE) -> np.ndarray:
+    """ draw a single symbol of shape (height, width) from its stroke mask """
+    stroke_indices = get_stroke_indices(height, width)
+    active = [stroke_indices[bit] for bit in range(NUM_STROKES) if int(stroke_mask) >> bit & 1]
+    symbol = np.zeros(shape=height * width, dtype=dtype)
+    if active:
+        symbol[np.concatenate(active)] = 1
+    return symbol.reshape(height, width)
+
+
+def rasterize_stroke_masks(stroke_masks: np.ndarray, height: int, width: int, dtype=DEFAULT_DTYPE) -> np.ndarray:
+    """ draw an array of stroke masks of shape (N,) to symbols of shape (N, height, width), one scatter per stroke """
+    stroke_masks = np.asarray(stroke_masks)
+    symbols = np.zeros(shape=(len(stroke_masks), height * width), dtype=dtype)
+    for bit, indices in enumerate(get_stroke_indices(height, width)):
+        rows = np.flatnonzero(stroke_masks >> bit & 1)
+        if len(rows):
+            symbols[rows[:, None], indices] = 1
+    return symbols.reshape(-1, height, width)
@@ -0,0 +1,114 @@
+"""
+This file contains a vector (SVG) backend - symbols are drawn as path data built from the strokes of symbol_classes.py
+in continuous coordinates, so they print sharp at any size without rasterizing
+
+the path data of the 36 templates (9 digits x 4 orders) is built once per symbol size and cached, the path of a number
+is the central line and the templates of its digits
+sheets of many symbols are streamed to the file one chunk of path elements at a time, without building a document
+tree in memory
+"""
+from functools import lru_cache
+
+import numpy as np
+
+from symbol_generation.strokes import DIGIT_STROKES, CENTRAL_LINE, TOP_LINE, TOP_THIRD_LINE, DIAGONAL_DOWN, \
+    DIAGONAL_UP, OUTER_LINE
+
+DEFAULT_SYMBOL_HEIGHT = 70
+DEFAULT_SYMBOL_WIDTH = 50
+DEFAULT_STROKE_WIDTH = 3
+DEFAULT_CHUNK_SIZE = 1000
+
+# (x0, y0, x1, y1) of the strokes of the units as fractions of the symbol width and height
+UNIT_STROKE_SEGMENTS = {
+    CENTRAL_LINE: (0.5, 0, 0.5, 1),
+    TOP_LINE: (0.5, 0, 1, 0),
+    TOP_THIRD_LINE: (0.5, 1 / 3, 1, 1 / 3),
+    DIAGONAL_DOWN: (0.5, 0, 1, 1 / 3),
+    DIAGONAL_UP: (0.5, 1 / 3, 1, 0),
+    OUTER_LINE: (1, 0, 1, 1 / 3),
+}
+
+
+def _format(coordinate: float) -> str:
+    return f"{round(coordinate, 3):g}"
+
+
+@lru_cache(maxsize=None)
+def _stroke_path(order: int, stroke: int, height: float, width: float) -> str:
+    """ path data of a stroke, same flips as create_symbols - tens: left-right, hundreds: up-down, thousands: both """
+    x0, y0, x1, y1 = UNIT_STROKE_SEGMENTS[stroke]
+    if order in (1, 3):
+        x0, x1 = 1 - x0, 1 - x1
+    if order in (2, 3):
+        y0, y1 = 1 - y0, 1 - y1
+    return f"M{_format(x0 * width)} {_format(y0 * height)}L{_format(x1 * width)} {_format(y1 * height)}"
+
+
+@lru_cache(maxsize=256)
+def get_template_path(digit: int, order: int, height: float = DEFAULT_SYMBOL_HEIGHT,
+                      width: float = DEFAULT_SYMBOL_WIDTH) -> str:
+    """ path data of the strokes of digit * 10 ** order, without the central line """
+    if digit == 0:
+        return ''
+    return ''.join(_stroke_path(order, stroke, height, width) for stroke in DIGIT_STROKES[digit])
+
+
+@lru_cache(maxsize=4 * 10000)
+def get_number_path(arabic_number: int, height: float = DEFAULT_SYMBOL_HEIGHT,
+                    width: float = DEFAULT_SYMBOL_WIDTH) -> str:
+    """ path data of the symbol of a number, empty for 0 """
+    assert 0 <= arabic_number <= 9999, f"Number out of range, supported range is [0, 9999], got {arabic_number}"
+    if arabic_number == 0:
+        return ''
+    return _stroke_path(0, CENTRAL_LINE, height, width) + ''.join(
+        get_template_path(arabic_number // pow(10, order) % 10, order, height, width) for order in range(4))
+
+
+def _svg_header(image_width: float, image_height: float, stroke_width: float) -> str:
+    return f'<svg xmlns="http://www.w3.org/2000/svg" width="{_format(image_width)}" ' \
+           f'height="{_format(image_height)}" viewBox="0 0 {_format(image_width)} {_format(image_height)}">\n' \
+           f'<rect width="100%" height="100%" fill="white"/>\n' \
+           f'<g fill="none" stroke="black" stroke-width="{_format(stroke_width)}" stroke-linecap="square">\n'
+
+
+_SVG_FOOTER = '</g>\n</svg>\n'
+
+
+def symbol_to_svg(arabic_number: int, height: float = DEFAULT_SYMBOL_HEIGHT, width: float = DEFAULT_SYMBOL_WIDTH,
+                  stroke_width: float = DEFAULT_STROKE_WIDTH) -> str:
+    """ a standalone SVG document of a single symbol, with a margin of a stroke width """
+    return _svg_header(width + 2 * stroke_width, height + 2 * stroke_width, stroke_width) + \
+        f'<path transform="translate({_format(stroke_width)} {_format(stroke_width)})" ' \
+        f'd="{get_number_path(arabic_number, height, width)}"/>\n' + _SVG_FOOTER
+
+
+def write_svg(numbers: np.ndarray, path: str, height: float = DEFAULT_SYMBOL_HEIGHT,
+              width: float = DEFAULT_SYMBOL_WIDTH, columns: int = 100, padding: float = None,
+              stroke_width: float = DEFAULT_STROKE_WIDTH, chunk_size: int = DEFAULT_CHUNK_SIZE) -> tuple:
+    """
+    write a sheet of the symbols of numbers, row by row in the given number of columns, to an SVG file
+    padding - space around every symbol, half the symbol width by default
+    path elements are written chunk_size at a time, returns the (height, width) of the sheet
+    """
+    numbers = np.asarray(numbers)
+    assert numbers.ndim == 1 and len(numbers) > 0, "Expected a non empty 1D array of numbers to render"
+    assert ((0 <= numbers) & (numbers <= 9999)).all(), "Number out of range, supported range is [0, 9999]"
+    if padding is None:
+        padding = width / 2
+
+    rows = -(-len(numbers) // columns)
+    sheet_shape = (rows * (height + padding) + padding, columns * (width + padding) + padding)
+    with open(path, 'w') as f:
+        f.write(_svg_header(sheet_shape[1], sheet_shape[0], stroke_width))
+        for start in range(0, len(numbers), chunk_size):
+            elements = []
+            for ix, number in enumerate(numbers[start:start + chunk_size].tolist(), start=start):
+                if number == 0:
+                    continue
+                x, y = padding + ix % columns * (width + padding), padding + ix // columns * (height + padding)
+                elements.append(f'<path transform="translate({_format(x)} {_format(y)})" '
+                                f'd="{get_number_path(number, height, width)}"/>\n')
+            f.write(''.join(elements))
+        f.write(_SVG_FOOTER)
+    return sheet_shape
@@ -31,11 +31,13 @@ diagonal lines, starting from central line | -
  - from two-third-height > down, right of image
  - from two-third-height > down, left of image
 """
-from copy import deepcopy
+import hashlib
+import struct
 
-import matplotlib.pyplot as plt
 import numpy as np
 
+from symbol_generation import instrumentation
+
 TOP = 'top'
 BOTTOM = 'bottom'
 TOP_THIRD = 'top_third'
@@ -46,23 +48,53 @@ MIDDLE = 'mid'
 UP = 'up'
 DOWN = 'down'
 
+# symbol pixels are binary, a single byte per pixel instead of the 8 bytes of numpy's default float64
+DEFAULT_DTYPE = np.uint8
+DIGEST_SIZE = 16
+
 
 class Symbol:
-    def __init__(self, height, width):
+    def __init__(self, height, width, dtype=DEFAULT_DTYPE):
         self.height = height
         self.width = width
-        self.symbol = np.zeros(shape=(height, width))
+        self.symbol = np.zeros(shape=(height, width), dtype=dtype)
 
 
 class CistercianSymbol(Symbol):
-    def __init__(self, height: int, width: int, is_zero: bool = False):
-        super().__init__(height, width)
+    frozen = False  # read only, e.g. shared by interned CistercianNumbers
+
+    def __init__(self, height: int, width: int, is_zero: bool = False, dtype=DEFAULT_DTYPE):
+        super().__init__(height, width, dtype)
         self.third_height = int(round(height / 3))
         self.mid_width = int(round(width // 2))
         if not is_zero:  # all symbols have a central line
             self.add_central_full_vertical_line()
 
+    @property
+    def symbol(self) -> np.ndarray:
+        return self._symbol
+
+    @symbol.setter
+    def symbol(self, new_symbol: np.ndarray):
+        self._symbol = new_symbol
+        self._digest = None
+
+    def digest(self) -> bytes:
+        """
+        a content digest of the size and the inked pixels (packed bits), computed once and cached until the symbol is
+        changed through set_symbol or the add_* methods - changing the array in place directly is not tracked
+        """
+        if self._digest is None:
+            packed = np.packbits(self._symbol != 0, axis=-1)
+            self._digest = hashlib.blake2b(struct.pack('<II', *self._symbol.shape) + packed.tobytes(),
+                                           digest_size=DIGEST_SIZE).digest()
+        return self._digest
+
     def __eq__(self, other):
+        if not isinstance(other, CistercianSymbol):
+            return NotImplemented
+        if self.digest() != other.digest():  # symbols of different digests always differ
+            return False
         return \
             self.height == other.height and \
             self.width == other.width and \
@@ -70,13 +102,26 @@ class CistercianSymbol(Symbol):
             self.mid_width == other.mid_width and \
             (self.get_symbol() == other.get_symbol()).all()
 
+    def __hash__(self):
+        """ symbols must not be changed while they are in a set or a dict, frozen symbols are safe """
+        return hash(self.digest())
+
     def set_symbol(self, new_symbol: np.ndarray):
+        if self.frozen:
+            raise Exception(f'Cannot modify a read-only {self!r}, modify a copy() instead')
         self.symbol = new_symbol
 
+    def freeze(self):
+        """ make the symbol read-only - set_symbol raises and the array is not writeable """
+        self.symbol.flags.writeable = False
+        self.frozen = True
+
     def get_symbol(self):
         return self.symbol
 
     def show(self, **kwargs):
+        import matplotlib.pyplot as plt  # imported on use, headless users never need matplotlib
+
         plt.imshow(1 - self.symbol, cmap='gray')
         title = kwargs.get('title')
         if title:
@@ -88,19 +133,21 @@ class CistercianSymbol(Symbol):
 
     def _add_vertical_line(self, start: int, end: int, x: int):
         self.symbol[start:end, x] = 1
+        self._digest = None
 
     def _add_horizontal_line(self, start: int, end: int, y: int):
         self.symbol[y, start:end] = 1
+        self._digest = None
 
     def _add_diagonal_line(self, start_h: int, end_h: int, start_v: int, end_v: int):
         step_h = int((int(start_h < end_h) - 1 / 2) * 2)  # convert 0/1 to -1/1
         step_v = int((int(start_v < end_v) - 1 / 2) * 2)  # convert 0/1 to -1/1
-        range_h = range(start_h, end_h, step_h)
-        v = start_v
-        for h in range_h:
-            if 0 <= v < self.symbol.shape[0]:
-                self.symbol[v, h] = 1
-                v += step_v
+        range_h = np.arange(start_h, end_h, step_h)
+        range_v = start_v + step_v * np.arange(len(range_h))
+        # the line stops at the first row outside of the symbol
+        in_symbol = np.logical_and.accumulate((0 <= range_v) & (range_v < self.symbol.shape[0]))
+        self.symbol[range_v[in_symbol], range_h[in_symbol]] = 1
+        self._digest = None
 
     def _get_height(self, height_str: str) -> int:
         if height_str == TOP:
@@ -149,10 +196,12 @@ class CistercianSymbol(Symbol):
         end_v = self._get_height(end_height)
         self._add_diagonal_line(start_h, end_h, start_v, end_v)
 
+    @instrumentation.timed('get_value')
     def get_value(self, mapping: dict) -> int:
         value_to_return = None
         for value, symbol in mapping.items():  # O(M) - always going over the same mapping --> O(1)
-            diff_symbols = self.get_symbol() - symbol.get_symbol()
+            instrumentation.count('get_value.template_scans')
+            diff_symbols = self.get_symbol() != symbol.get_symbol()  # no subtraction, it is undefined for bool
             if not diff_symbols.any():
                 value_to_return = value
                 break
@@ -161,14 +210,21 @@ class CistercianSymbol(Symbol):
             raise Exception(f'Unexpected symbol - does not match any symbol in existing mapping')
         return value_to_return
 
+    def _derive(self, new_symbol: np.ndarray) -> "CistercianSymbol":
+        """ a symbol with the same attributes holding the given array, only the array is copied, not the object """
+        derived = type(self).__new__(type(self))
+        derived.__dict__.update(self.__dict__)
+        derived.symbol = new_symbol
+        derived.frozen = False
+        return derived
+
+    def copy(self) -> "CistercianSymbol":
+        return self._derive(self.get_symbol().copy())
+
     def fliplr(self) -> "CistercianSymbol":
         """ flip the symbol left-right - return a copy """
-        flipped = deepcopy(self)
-        flipped.symbol = np.fliplr(flipped.get_symbol())
-        return flipped
+        return self._derive(np.fliplr(self.get_symbol()).copy())
 
     def flipud(self) -> "CistercianSymbol":
         """ flip the symbol up-down - return a copy """
-        flipped = deepcopy(self)
-        flipped.symbol = np.flipud(flipped.get_symbol())
-        return flipped
+        return self._derive(np.flipud(self.get_symbol()).copy())
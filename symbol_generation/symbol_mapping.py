@@ -1,47 +1,46 @@
 """
 This file contains function that creates a mapping of the available values to their symbol instances
 """
-from copy import deepcopy
-import matplotlib.pyplot as plt
+from symbol_generation import instrumentation
+from symbol_generation.symbol_classes import CistercianSymbol, TOP, TOP_THIRD, RIGHT, UP, DEFAULT_DTYPE
 
-from symbol_generation.symbol_classes import CistercianSymbol, TOP, TOP_THIRD, RIGHT, UP
 
-
-def create_symbols(symbol_height: int, symbol_width: int) -> dict:
+@instrumentation.timed('create_symbols')
+def create_symbols(symbol_height: int, symbol_width: int, dtype=DEFAULT_DTYPE) -> dict:
     # 1
-    one = CistercianSymbol(height=symbol_height, width=symbol_width)
+    one = CistercianSymbol(height=symbol_height, width=symbol_width, dtype=dtype)
     one.add_horizontal_line(location_str=TOP, direction_str=RIGHT)
 
     # 2
-    two = CistercianSymbol(height=symbol_height, width=symbol_width)
+    two = CistercianSymbol(height=symbol_height, width=symbol_width, dtype=dtype)
     two.add_horizontal_line(location_str=TOP_THIRD, direction_str=RIGHT)
 
     # 3
-    three = CistercianSymbol(height=symbol_height, width=symbol_width)
+    three = CistercianSymbol(height=symbol_height, width=symbol_width, dtype=dtype)
     three.add_diagonal_line(start_height_on_middle=TOP, end_height=TOP_THIRD, direction_str=RIGHT)
 
     # 4
-    four = CistercianSymbol(height=symbol_height, width=symbol_width)
+    four = CistercianSymbol(height=symbol_height, width=symbol_width, dtype=dtype)
     four.add_diagonal_line(start_height_on_middle=TOP_THIRD, end_height=TOP, direction_str=RIGHT)
 
     # 5
-    five = deepcopy(four)  # 5 is 4 with an additional horizontal line
+    five = four.copy()  # 5 is 4 with an additional horizontal line
     five.add_horizontal_line(location_str=TOP, direction_str=RIGHT)
 
     # 6
-    six = CistercianSymbol(height=symbol_height, width=symbol_width)
+    six = CistercianSymbol(height=symbol_height, width=symbol_width, dtype=dtype)
     six.add_vertical_line(width_str=RIGHT, start_str=TOP, end_str=TOP_THIRD)
 
     # 7
-    seven = deepcopy(six)  # 7 is 6 with an additional horizontal line
+    seven = six.copy()  # 7 is 6 with an additional horizontal line
     seven.add_horizontal_line(location_str=TOP, direction_str=RIGHT)
 
     # 8
-    eight = deepcopy(six)  # 8 is 6 with an additional horizontal line
+    eight = six.copy()  # 8 is 6 with an additional horizontal line
     eight.add_horizontal_line(location_str=TOP_THIRD, direction_str=RIGHT)
 
     # 9
-    nine = deepcopy(eight)  # 9 is 8 with an additional horizontal line
+    nine = eight.copy()  # 9 is 8 with an additional horizontal line
     nine.add_horizontal_line(location_str=TOP, direction_str=RIGHT)
 
     # 10-90 are flips left to right of 1-9
@@ -78,7 +77,7 @@ def create_symbols(symbol_height: int, symbol_width: int) -> dict:
     nine_thousand = ninety.flipud()
 
     number_to_symbol = {
-        0: CistercianSymbol(height=symbol_height, width=symbol_width, is_zero=True),
+        0: CistercianSymbol(height=symbol_height, width=symbol_width, is_zero=True, dtype=dtype),
         1: one,
         2: two,
         3: three,
@@ -121,6 +120,8 @@ def create_symbols(symbol_height: int, symbol_width: int) -> dict:
 
 
 def show_mapping(symbol_mapping: dict):
+    import matplotlib.pyplot as plt  # imported on use, headless users never need matplotlib
+
     fig, ax = plt.subplots(nrows=4, ncols=9)
     fig.suptitle('Available Cistercian Symbols')
 
@@ -1,35 +1,76 @@
 """
 script to create Cistercian symbols from Arabic numerals and back
 """
+from collections import OrderedDict
+from functools import lru_cache
+
 import numpy as np
 
-from symbol_generation.symbol_classes import Symbol, CistercianSymbol
+from symbol_generation import instrumentation
+from symbol_generation.symbol_classes import Symbol, CistercianSymbol, DEFAULT_DTYPE
 from symbol_generation.symbol_mapping import create_symbols
+from symbol_generation.strokes import number_to_stroke_mask, rasterize_stroke_masks
 
 SYMBOL_HEIGHT = 7
 SYMBOL_WIDTH = 5
+MAX_INTERNED_NUMBERS = 4096
+
+_INTERNED_NUMBERS = OrderedDict()
+
+
+@lru_cache(maxsize=None)
+def get_default_symbol_mapping() -> dict:
+    """ the mapping of the default symbol size, built on first use instead of at import """
+    return create_symbols(symbol_height=SYMBOL_HEIGHT, symbol_width=SYMBOL_WIDTH)
+
 
-SYMBOL_MAPPING = create_symbols(symbol_height=SYMBOL_HEIGHT, symbol_width=SYMBOL_WIDTH)
+def __getattr__(name: str):
+    # SYMBOL_MAPPING is still available as a module attribute, it is only built when accessed
+    if name == 'SYMBOL_MAPPING':
+        return get_default_symbol_mapping()
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
 
 
 class CistercianNumber(Symbol):
-    def __init__(self, height: int, width: int):
-        super().__init__(height, width)
-        self.symbol = CistercianSymbol(height=height, width=width, is_zero=True)
+    def __init__(self, height: int, width: int, dtype=DEFAULT_DTYPE):
+        super().__init__(height, width, dtype)
+        self.symbol = CistercianSymbol(height=height, width=width, is_zero=True, dtype=dtype)
         self.order_used = [False, False, False, False]
         self.value = 0
 
     def __eq__(self, other):
+        if not isinstance(other, CistercianNumber):
+            return NotImplemented
         return \
+            self.value == other.value and \
             self.height == other.height and \
             self.width == other.width and \
             self.order_used == other.order_used and \
-            self.value == other.value and \
             self.symbol == other.symbol
 
+    def __hash__(self):
+        """ numbers must not be changed while they are in a set or a dict, interned numbers are safe """
+        return hash((self.value, self.symbol.digest()))
+
     def __str__(self):
         return f"CistercianNumber({self.value})"
 
+    @property
+    def frozen(self) -> bool:
+        return self.symbol.frozen
+
+    def freeze(self):
+        """ make the number read-only - add_symbol and set_symbol raise, the symbol array is not writeable """
+        self.symbol.freeze()
+
+    def copy(self) -> "CistercianNumber":
+        """ a mutable copy, e.g. of an interned number """
+        cistercian_number = CistercianNumber.__new__(CistercianNumber)
+        cistercian_number.__dict__.update(self.__dict__)
+        cistercian_number.symbol = self.symbol.copy()
+        cistercian_number.order_used = list(self.order_used)
+        return cistercian_number
+
     def show(self, **kwargs):
         self.symbol.show(**kwargs)
 
@@ -39,8 +80,14 @@ class CistercianNumber(Symbol):
     def set_symbol(self, new_symbol: np.ndarray):
         self.symbol.set_symbol(new_symbol)
 
-    def add_symbol(self, symbol: CistercianSymbol, symbol_mapping: dict = SYMBOL_MAPPING):
+    def add_symbol(self, symbol: CistercianSymbol, symbol_mapping: dict = None):
         """ Assumption - the symbol here is a valid singular symbol from mapping and not a combined symbol"""
+        if self.frozen:
+            raise Exception(f'Cannot add a symbol to a read-only {self}, add it to a copy() instead')
+
+        if symbol_mapping is None:
+            symbol_mapping = get_default_symbol_mapping()
+
         symbol_value = symbol.get_value(symbol_mapping)
         if symbol_value == 0:  # skip zeroes
             return
@@ -57,17 +104,36 @@ class CistercianNumber(Symbol):
         self.value += symbol_value
 
 
+@instrumentation.timed('arabic_to_cistercian')
 def arabic_to_cistercian(arabic_number: int, symbol_height: int = SYMBOL_HEIGHT, symbol_width: int = SYMBOL_WIDTH,
-                         symbol_mapping: dict = None) -> CistercianNumber:
+                         symbol_mapping: dict = None, atlas=None, intern: bool = False) -> CistercianNumber:
+    """
+    convert arabic number to cistercian number by adding the symbol of each digit from the mapping
+    if a GlyphAtlas is given, the symbol is copied from the atlas instead and its size is used
+    intern - return a shared read-only instance, built on first use and cached per number, size and dtype
+    (the MAX_INTERNED_NUMBERS most recently used are kept), use copy() for a mutable instance
+    """
     assert isinstance(arabic_number, int) or arabic_number == int(arabic_number), \
         f"Unsupported input, only int supported, got {arabic_number}"
 
     assert 0 <= arabic_number <= 9999, f"Number out of range, supported range is [0, 9999], got {arabic_number}"
 
+    if intern:
+        return _interned_arabic_to_cistercian(int(arabic_number), symbol_height, symbol_width, symbol_mapping, atlas)
+
+    if atlas is not None:
+        cistercian_number = CistercianNumber(height=atlas.height, width=atlas.width, dtype=atlas.dtype)
+        arabic_number = int(arabic_number)
+        cistercian_number.set_symbol(np.array(atlas.get_glyph(arabic_number)))  # own copy, the atlas is read only
+        cistercian_number.order_used = [arabic_number // pow(10, order) % 10 > 0 for order in range(4)]
+        cistercian_number.value = arabic_number
+        return cistercian_number
+
     if symbol_mapping is None:
-        symbol_mapping = SYMBOL_MAPPING
+        symbol_mapping = get_default_symbol_mapping()
 
-    cistercian_number = CistercianNumber(height=symbol_height, width=symbol_width)
+    cistercian_number = CistercianNumber(height=symbol_height, width=symbol_width,
+                                         dtype=symbol_mapping[0].get_symbol().dtype)
     order = 0
     while arabic_number > 0:
         value = arabic_number % 10 * pow(10, order)
@@ -79,6 +145,74 @@ def arabic_to_cistercian(arabic_number: int, symbol_height: int = SYMBOL_HEIGHT,
     return cistercian_number
 
 
+def _interned_arabic_to_cistercian(arabic_number: int, symbol_height: int, symbol_width: int, symbol_mapping: dict,
+                                   atlas) -> CistercianNumber:
+    if atlas is not None:
+        key = (arabic_number, atlas.height, atlas.width, atlas.dtype.str)
+    else:
+        dtype = symbol_mapping[0].get_symbol().dtype if symbol_mapping is not None else np.dtype(DEFAULT_DTYPE)
+        key = (arabic_number, symbol_height, symbol_width, dtype.str)
+
+    cistercian_number = _INTERNED_NUMBERS.get(key)
+    if cistercian_number is not None:
+        _INTERNED_NUMBERS.move_to_end(key)
+        instrumentation.count('interned_numbers.hits')
+        return cistercian_number
+
+    instrumentation.count('interned_numbers.misses')
+    cistercian_number = arabic_to_cistercian(arabic_number, symbol_height=symbol_height, symbol_width=symbol_width,
+                                             symbol_mapping=symbol_mapping, atlas=atlas)
+    cistercian_number.freeze()
+    _INTERNED_NUMBERS[key] = cistercian_number
+    while len(_INTERNED_NUMBERS) > MAX_INTERNED_NUMBERS:
+        _INTERNED_NUMBERS.popitem(last=False)
+    return cistercian_number
+
+
+def clear_interned_numbers():
+    _INTERNED_NUMBERS.clear()
+
+
+def _stack_symbol_templates(symbol_mapping: dict) -> np.ndarray:
+    """ arrange the mapping as a (4, 10, height, width) array - templates[order, digit] is the symbol of
+    digit * 10 ** order, digit 0 of every order is the empty (zero) symbol """
+    zero = symbol_mapping[0].get_symbol()
+    templates = np.empty(shape=(4, 10) + zero.shape, dtype=zero.dtype)
+    for order in range(4):
+        templates[order, 0] = zero
+        for digit in range(1, 10):
+            templates[order, digit] = symbol_mapping[digit * pow(10, order)].get_symbol()
+    return templates
+
+
+@instrumentation.timed('arabic_to_cistercian_batch')
+def arabic_to_cistercian_batch(arabic_numbers: np.ndarray, symbol_height: int = SYMBOL_HEIGHT,
+                               symbol_width: int = SYMBOL_WIDTH, symbol_mapping: dict = None) -> np.ndarray:
+    """
+    convert an array of arabic numbers of shape (N,) to an array of cistercian symbols of shape (N, height, width)
+    without a mapping the symbols are drawn by the stroke engine, otherwise digits are split and the templates of
+    each order are gathered from the mapping for the whole batch at once
+    """
+    arabic_numbers = np.asarray(arabic_numbers)
+    assert np.issubdtype(arabic_numbers.dtype, np.integer), \
+        f"Unsupported input, only int arrays supported, got {arabic_numbers.dtype}"
+    assert arabic_numbers.ndim == 1, f"Unsupported input, expected a 1D array, got shape {arabic_numbers.shape}"
+    assert ((0 <= arabic_numbers) & (arabic_numbers <= 9999)).all(), \
+        "Number out of range, supported range is [0, 9999]"
+
+    if symbol_mapping is None:
+        return rasterize_stroke_masks(number_to_stroke_mask(arabic_numbers), height=symbol_height, width=symbol_width)
+
+    templates = _stack_symbol_templates(symbol_mapping)
+
+    symbols = templates[0][arabic_numbers % 10]
+    for order in range(1, 4):
+        digits = arabic_numbers // pow(10, order) % 10
+        np.maximum(symbols, templates[order][digits], out=symbols)
+
+    return symbols
+
+
 def _validate_cistercian_number_size(cistercian: CistercianNumber, symbol_mapping: dict):
     symbol_shape = cistercian.get_symbol().shape
     mapping_shape = symbol_mapping[0].get_symbol().shape
@@ -87,6 +221,7 @@ def _validate_cistercian_number_size(cistercian: CistercianNumber, symbol_mappin
 
 
 def _find_symbols_contained_in_given_symbol(given_symbol: np.ndarray, symbol_mapping: dict) -> list:
+    instrumentation.count('containment_checks', len(symbol_mapping))
     symbol_candidates = [None, None, None, None]
     for value, symbol in symbol_mapping.items():
         current_symbol = symbol.get_symbol()
@@ -106,17 +241,129 @@ def _find_symbols_contained_in_given_symbol(given_symbol: np.ndarray, symbol_map
     return [candidate[0] for candidate in symbol_candidates if candidate is not None]
 
 
-def cistercian_to_arabic(cistercian: CistercianNumber, symbol_mapping: dict) -> int:
+@instrumentation.timed('cistercian_to_arabic')
+def cistercian_to_arabic(cistercian: CistercianNumber, symbol_mapping: dict = None, atlas=None) -> int:
     """
     convert cistercian number to arabic number by comparing symbol, without using 'value' property
     assumption: the given cistercian number is of the same shape as the mapping
+    if a GlyphAtlas of the same size is given, exact symbols are decoded with a single lookup in its index,
+    the mapping is optional then - symbols not in the index are searched in the atlas' mapping
     """
+    given_symbol = cistercian.get_symbol()
+    if atlas is not None:
+        value = atlas.lookup(given_symbol)
+        if value is not None:
+            return value
+        if symbol_mapping is None:
+            symbol_mapping = atlas.symbol_mapping
+
+    if symbol_mapping is None:
+        symbol_mapping = get_default_symbol_mapping()
+
     _validate_cistercian_number_size(cistercian, symbol_mapping)
 
-    given_symbol = cistercian.get_symbol()
     symbol_candidate_values = _find_symbols_contained_in_given_symbol(given_symbol, symbol_mapping)
 
     # sum all candidate values
     number = np.sum(symbol_candidate_values)
 
     return number
+
+
+@instrumentation.timed('cistercian_to_arabic_batch')
+def cistercian_to_arabic_batch(cistercian_symbols: np.ndarray, symbol_mapping: dict) -> np.ndarray:
+    """
+    convert an array of cistercian symbols of shape (N, height, width) to an array of N arabic numbers
+    the containment of all 36 templates in all symbols is tested at once with a single matrix product,
+    per order the contained template with the largest overlap is taken, same as cistercian_to_arabic
+    """
+    cistercian_symbols = np.asarray(cistercian_symbols)
+    assert cistercian_symbols.ndim == 3, \
+        f"Unsupported input, expected an array of shape (N, height, width), got shape {cistercian_symbols.shape}"
+
+    templates = _stack_symbol_templates(symbol_mapping)
+    symbol_shape, mapping_shape = cistercian_symbols.shape[1:], templates.shape[2:]
+    assert symbol_shape == mapping_shape, \
+        f"Size mismatch between symbol and mapping, symbol shape: {symbol_shape}, mapping shape: {mapping_shape}"
+
+    # float32 products are exact for pixel counts below 2 ** 24 and run through BLAS
+    flat_templates = templates[:, 1:].reshape(36, -1).astype(np.float32)
+    flat_symbols = cistercian_symbols.reshape(len(cistercian_symbols), -1).astype(np.float32)
+    template_sizes = flat_templates.sum(axis=1)
+
+    symbol_overlap = flat_symbols @ flat_templates.T  # (N, 36)
+    is_contained = (symbol_overlap == template_sizes) & (template_sizes > 0)
+
+    # score each contained template by its size, argmax keeps the first of equally sized candidates
+    scores = np.where(is_contained, template_sizes, -1).reshape(-1, 4, 9)
+    digits = np.where(scores.max(axis=2) > 0, scores.argmax(axis=2) + 1, 0)
+
+    return digits @ np.array([1, 10, 100, 1000])
+
+
+def _order_regions(templates: np.ndarray) -> np.ndarray:
+    """
+    (4, height * width) boolean array, the pixels that only the strokes of each order can draw -
+    pixels of the central line and pixels shared with the strokes of another order are left out
+    """
+    flat_templates = templates.reshape(4, 10, -1) > 0
+    order_pixels = flat_templates.any(axis=1)
+    central_pixels = flat_templates[:, 1:].all(axis=1).any(axis=0)  # the only pixels common to all digits
+    return order_pixels & ~central_pixels & (order_pixels.sum(axis=0) == 1)
+
+
+def _indistinct_candidates(templates: np.ndarray, order_regions: np.ndarray) -> np.ndarray:
+    """
+    (4, 10) boolean array, the candidates of each order that are the same as another candidate of the order within
+    the region of the order - symbols too small to tell them apart
+    """
+    flat_templates = templates.reshape(4, 10, -1) > 0
+    indistinct = np.zeros(shape=(4, 10), dtype=bool)
+    for order in range(4):
+        _, inverse, counts = np.unique(flat_templates[order][:, order_regions[order]], axis=0, return_inverse=True,
+                                       return_counts=True)
+        indistinct[order] = counts[inverse.reshape(-1)] > 1
+    return indistinct
+
+
+@instrumentation.timed('cistercian_to_arabic_tolerant')
+def cistercian_to_arabic_tolerant(cistercian_symbols: np.ndarray, symbol_mapping: dict = None) -> tuple:
+    """
+    convert an array of possibly noisy cistercian symbols of shape (N, height, width) to N arabic numbers
+    for each order, all 10 candidates (zero included) are scored by the fraction of pixels in the region of the order
+    that agree with the candidate, the best candidate is taken - a missing or extra pixel lowers the score instead of
+    breaking exact containment
+    pixel values are expected in [0, 1], grey levels count as partial agreement
+    returns the numbers (N,) and the agreement of the chosen candidate of each order (N, 4) as confidence -
+    0 if the chosen candidate is the same as another candidate of the order within its region (symbol sizes too small
+    to tell them apart), the digit is a guess then
+    """
+    if symbol_mapping is None:
+        symbol_mapping = get_default_symbol_mapping()
+
+    cistercian_symbols = np.asarray(cistercian_symbols)
+    assert cistercian_symbols.ndim == 3, \
+        f"Unsupported input, expected an array of shape (N, height, width), got shape {cistercian_symbols.shape}"
+
+    templates = _stack_symbol_templates(symbol_mapping)
+    symbol_shape, mapping_shape = cistercian_symbols.shape[1:], templates.shape[2:]
+    assert symbol_shape == mapping_shape, \
+        f"Size mismatch between symbol and mapping, symbol shape: {symbol_shape}, mapping shape: {mapping_shape}"
+
+    flat_symbols = np.clip(cistercian_symbols.reshape(len(cistercian_symbols), -1), 0, 1).astype(np.float32)
+    flat_templates = (templates.reshape(4, 10, -1) > 0).astype(np.float32)
+    order_regions = _order_regions(templates)
+    indistinct = _indistinct_candidates(templates, order_regions)
+
+    digits = np.zeros(shape=(len(cistercian_symbols), 4), dtype=int)
+    confidences = np.zeros(shape=(len(cistercian_symbols), 4), dtype=np.float32)
+    for order in range(4):
+        region = order_regions[order]
+        assert region.any(), f"Symbol size {mapping_shape} is too small to separate the strokes of order {order}"
+        region_symbols, region_templates = flat_symbols[:, region], flat_templates[order][:, region]
+        # ink on ink plus background on background, for every symbol and candidate
+        agreement = region_symbols @ region_templates.T + (1 - region_symbols) @ (1 - region_templates).T
+        digits[:, order] = agreement.argmax(axis=1)
+        confidences[:, order] = np.where(indistinct[order, digits[:, order]], 0, agreement.max(axis=1) / region.sum())
+
+    return digits @ np.array([1, 10, 100, 1000]), confidences
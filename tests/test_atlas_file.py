@@ -0,0 +1,86 @@
+import os
+import struct
+import tempfile
+import unittest
+
+import numpy as np
+
+from symbol_generation.atlas_file import write_atlas_file, open_atlas_file, get_or_create_atlas_file, HEADER_SIZE
+from symbol_generation.glyph_atlas import GlyphAtlas
+from symbol_generation.translating_cistercian_symbols import arabic_to_cistercian, cistercian_to_arabic
+
+
+class TestAtlasFile(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls) -> None:
+        cls.temp_dir = tempfile.TemporaryDirectory()
+        cls.atlas = GlyphAtlas(height=7, width=5)
+        cls.path = os.path.join(cls.temp_dir.name, 'atlas_7x5.bin')
+        write_atlas_file(cls.path, cls.atlas)
+
+    @classmethod
+    def tearDownClass(cls) -> None:
+        cls.temp_dir.cleanup()
+
+    def test_round_trip(self):
+        loaded = open_atlas_file(self.path, height=7, width=5)
+        self.assertIsInstance(loaded.stored_glyphs, np.memmap)
+        self.assertEqual((loaded.height, loaded.width, loaded.dtype, loaded.packed), (7, 5, np.uint8, False))
+        np.testing.assert_array_equal(loaded.glyphs, self.atlas.glyphs)
+
+    def test_npy_compatible_body(self):
+        with open(self.path, 'rb') as f:
+            f.seek(HEADER_SIZE)
+            np.testing.assert_array_equal(np.load(f), self.atlas.glyphs)
+
+    def test_read_only(self):
+        loaded = open_atlas_file(self.path)
+        with self.assertRaises(ValueError):
+            loaded.get_glyph(5)[0, 0] = 0
+
+    def test_packed(self):
+        path = os.path.join(self.temp_dir.name, 'atlas_17x15_packed.bin')
+        write_atlas_file(path, GlyphAtlas(height=17, width=15, dtype=bool, packed=True))
+        loaded = open_atlas_file(path)
+        self.assertEqual((loaded.dtype, loaded.packed), (bool, True))
+        np.testing.assert_array_equal(loaded.decode(loaded.encode(np.array([0, 1735, 9999]))), [0, 1735, 9999])
+
+    def test_size_mismatch(self):
+        with self.assertRaisesRegex(AssertionError, "Size mismatch between atlas file and requested size"):
+            open_atlas_file(self.path, height=17, width=15)
+
+    def test_bad_version(self):
+        path = os.path.join(self.temp_dir.name, 'atlas_bad_version.bin')
+        with open(self.path, 'rb') as f:
+            content = bytearray(f.read())
+        struct.pack_into('<I', content, 16, 99)
+        with open(path, 'wb') as f:
+            f.write(content)
+        with self.assertRaisesRegex(AssertionError, "Unsupported atlas file version 99"):
+            open_atlas_file(path)
+
+    def test_bad_magic(self):
+        path = os.path.join(self.temp_dir.name, 'not_an_atlas.bin')
+        with open(path, 'wb') as f:
+            f.write(b'\0' * 100)
+        with self.assertRaisesRegex(AssertionError, "bad magic"):
+            open_atlas_file(path)
+
+    def test_get_or_create(self):
+        path = os.path.join(self.temp_dir.name, 'atlas_9x7.bin')
+        atlas = get_or_create_atlas_file(path, height=9, width=7)
+        self.assertTrue(os.path.exists(path))
+        self.assertIsInstance(atlas.stored_glyphs, np.memmap)
+        self.assertIsInstance(get_or_create_atlas_file(path, height=9, width=7).stored_glyphs, np.memmap)
+
+    def test_translation_with_atlas(self):
+        loaded = open_atlas_file(self.path)
+        for number in [0, 5, 1030, 1993, 9000]:
+            cistercian = arabic_to_cistercian(number, atlas=loaded)
+            self.assertEqual(cistercian, arabic_to_cistercian(number))
+            self.assertEqual(cistercian_to_arabic(cistercian, atlas=loaded), number)
+
+    def test_translation_with_atlas_integral_float(self):
+        cistercian = arabic_to_cistercian(5.0, atlas=open_atlas_file(self.path))
+        self.assertEqual(cistercian, arabic_to_cistercian(5))
+        self.assertIsInstance(cistercian.value, int)
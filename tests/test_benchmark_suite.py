@@ -0,0 +1,41 @@
+import os
+import tempfile
+import unittest
+from unittest import mock
+
+from benchmarks import benchmark_suite
+from benchmarks.benchmark_suite import run_benchmarks, save_results, load_results, compare_results
+
+
+class TestBenchmarkSuite(unittest.TestCase):
+    def test_run_save_load(self):
+        with mock.patch.object(benchmark_suite, 'MIN_SECONDS', 0):
+            results = run_benchmarks(sizes=[(7, 5)], batch_sizes=[1, 10])
+        self.assertEqual([result['name'] for result in results], [
+            'create_symbols', 'arabic_to_cistercian', 'cistercian_to_arabic',
+            'arabic_to_cistercian_batch', 'cistercian_to_arabic_batch', 'cistercian_to_arabic_probe',
+            'arabic_to_cistercian_batch', 'cistercian_to_arabic_batch', 'cistercian_to_arabic_probe',
+        ])
+        for result in results:
+            self.assertGreater(result['seconds'], 0)
+            self.assertGreater(result['items_per_second'], 0)
+            self.assertGreaterEqual(result['peak_memory_bytes'], 0)
+
+        with tempfile.TemporaryDirectory() as temp_dir:
+            path = os.path.join(temp_dir, 'results.json')
+            save_results(results, path)
+            self.assertEqual(load_results(path), results)
+
+    def test_compare(self):
+        baseline = [
+            {'name': 'a', 'height': 7, 'width': 5, 'batch_size': 1, 'seconds': 1.0},
+            {'name': 'b', 'height': 7, 'width': 5, 'batch_size': 1, 'seconds': 1.0},
+        ]
+        current = [
+            {'name': 'a', 'height': 7, 'width': 5, 'batch_size': 1, 'seconds': 1.1},
+            {'name': 'b', 'height': 7, 'width': 5, 'batch_size': 1, 'seconds': 2.0},
+            {'name': 'c', 'height': 7, 'width': 5, 'batch_size': 1, 'seconds': 9.0},  # no baseline
+        ]
+        regressions = compare_results(baseline, current, threshold=1.25)
+        self.assertEqual([regression['name'] for regression in regressions], ['b'])
+        self.assertAlmostEqual(regressions[0]['ratio'], 2.0)
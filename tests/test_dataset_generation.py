@@ -0,0 +1,76 @@
+import tempfile
+import unittest
+from unittest import mock
+
+import numpy as np
+
+from symbol_generation.dataset_generation import generate_dataset, augment_symbols, _shift_symbols
+from symbol_generation.glyph_atlas import get_atlas
+from symbol_generation.translating_cistercian_symbols import arabic_to_cistercian_batch
+
+
+class TestShiftSymbols(unittest.TestCase):
+    def test_shift(self):
+        symbols = np.arange(1, 13, dtype=np.uint8).reshape(1, 3, 4)
+        shifted = _shift_symbols(symbols, np.array([1]), np.array([-1]))
+        expected = np.array([[
+            [0, 0, 0, 0],
+            [2, 3, 4, 0],
+            [6, 7, 8, 0],
+        ]])
+        np.testing.assert_array_equal(shifted, expected)
+
+    def test_no_augmentation(self):
+        symbols = get_atlas(7, 5).encode(np.array([1, 2, 3]))
+        np.testing.assert_array_equal(augment_symbols(symbols, {}, np.random.default_rng(0)), symbols)
+
+
+class TestGenerateDataset(unittest.TestCase):
+    def setUp(self) -> None:
+        self.temp_dir = tempfile.TemporaryDirectory()
+
+    def tearDown(self) -> None:
+        self.temp_dir.cleanup()
+
+    def test_shards(self):
+        summary = generate_dataset(self.temp_dir.name, num_samples=250, sizes=[(7, 5), (17, 15)], shard_size=100,
+                                   jobs=1)
+        self.assertEqual(len(summary['paths']), 3)
+        self.assertGreater(summary['images_per_second'], 0)
+
+        shard_sizes = []
+        for shard_ix, path in enumerate(summary['paths']):
+            with np.load(path) as shard:
+                images, labels = shard['images'], shard['labels']
+            height, width = [(7, 5), (17, 15)][shard_ix % 2]
+            self.assertEqual(images.shape[1:], (height, width))
+            np.testing.assert_array_equal(images, get_atlas(height, width).encode(labels))
+            shard_sizes.append(len(labels))
+        self.assertEqual(shard_sizes, [100, 100, 50])
+
+    def test_large_symbols_build_no_atlas(self):
+        with mock.patch('symbol_generation.glyph_atlas.GlyphAtlas') as glyph_atlas:
+            summary = generate_dataset(self.temp_dir.name, num_samples=20, sizes=[(280, 200)], jobs=1)
+        glyph_atlas.assert_not_called()
+        with np.load(summary['paths'][0]) as shard:
+            np.testing.assert_array_equal(shard['images'], arabic_to_cistercian_batch(
+                shard['labels'], symbol_height=280, symbol_width=200))
+
+    def test_deterministic_across_jobs(self):
+        augmentation = {'noise_probability': 0.05, 'max_shift': 1}
+        single = generate_dataset(f"{self.temp_dir.name}/single", num_samples=300, shard_size=100,
+                                  augmentation=augmentation, seed=3, jobs=1)
+        parallel = generate_dataset(f"{self.temp_dir.name}/parallel", num_samples=300, shard_size=100,
+                                    augmentation=augmentation, seed=3, jobs=2)
+        for single_path, parallel_path in zip(single['paths'], parallel['paths']):
+            with np.load(single_path) as single_shard, np.load(parallel_path) as parallel_shard:
+                np.testing.assert_array_equal(single_shard['images'], parallel_shard['images'])
+                np.testing.assert_array_equal(single_shard['labels'], parallel_shard['labels'])
+
+    def test_label_probabilities(self):
+        label_probabilities = np.zeros(10000)
+        label_probabilities[[7, 1993]] = 0.5
+        summary = generate_dataset(self.temp_dir.name, num_samples=50, label_probabilities=label_probabilities,
+                                   jobs=1)
+        with np.load(summary['paths'][0]) as shard:
+            self.assertEqual(set(shard['labels']), {7, 1993})
@@ -0,0 +1,138 @@
+import unittest
+from unittest import mock
+
+import numpy as np
+
+from symbol_generation import glyph_atlas
+from symbol_generation.glyph_atlas import GlyphAtlas, get_atlas, clear_atlas_cache
+from symbol_generation.symbol_mapping import create_symbols
+from symbol_generation.translating_cistercian_symbols import arabic_to_cistercian, cistercian_to_arabic, \
+    CistercianNumber
+
+
+class TestGlyphAtlas(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls) -> None:
+        cls.atlas = GlyphAtlas(height=7, width=5)
+
+    def test_shape(self):
+        self.assertEqual(self.atlas.glyphs.shape, (10000, 7, 5))
+        self.assertTrue(self.atlas.glyphs.flags.c_contiguous)
+
+    def test_get_glyph(self):
+        for number in [0, 5, 1993, 9999]:
+            np.testing.assert_array_equal(self.atlas.get_glyph(number), arabic_to_cistercian(number).get_symbol())
+
+    def test_get_glyph_read_only(self):
+        with self.assertRaises(ValueError):
+            self.atlas.get_glyph(5)[0, 0] = 1
+
+    def test_encode(self):
+        numbers = np.array([2047, 0, 6002, 2047])
+        glyphs = self.atlas.encode(numbers)
+        self.assertEqual(glyphs.shape, (4, 7, 5))
+        for number, glyph in zip(numbers, glyphs):
+            np.testing.assert_array_equal(glyph, arabic_to_cistercian(int(number)).get_symbol())
+
+    def test_encode_other_size(self):
+        atlas = GlyphAtlas(height=17, width=15)
+        mapping = create_symbols(symbol_height=17, symbol_width=15)
+        expected = arabic_to_cistercian(1735, symbol_height=17, symbol_width=15, symbol_mapping=mapping)
+        np.testing.assert_array_equal(atlas.encode(np.array([1735]))[0], expected.get_symbol())
+
+    def test_number_out_of_range(self):
+        with self.assertRaisesRegex(AssertionError, "Number out of range"):
+            self.atlas.encode(np.array([10000]))
+
+        with self.assertRaisesRegex(AssertionError, "Number out of range"):
+            self.atlas.get_glyph(-1)
+
+
+class TestAtlasDecode(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls) -> None:
+        cls.atlas = GlyphAtlas(height=7, width=5)
+
+    def test_decode_index_covers_all_numbers(self):
+        self.assertEqual(len(self.atlas.decode_index), 10000)
+
+    def test_decode_exact(self):
+        numbers = np.arange(10000)
+        np.testing.assert_array_equal(self.atlas.decode(self.atlas.encode(numbers)), numbers)
+
+    def test_decode_fallback(self):
+        # 1000 with an extra pixel is not in the index, the containment search still finds 1000
+        symbol = self.atlas.encode(np.array([1000]))
+        symbol[0, 0, 4] = 1
+        self.assertIsNone(self.atlas.lookup(symbol[0]))
+        np.testing.assert_array_equal(self.atlas.decode(symbol), [1000])
+
+    def test_lookup(self):
+        self.assertEqual(self.atlas.lookup(self.atlas.get_glyph(1993)), 1993)
+
+    def test_size_mismatch(self):
+        with self.assertRaisesRegex(AssertionError, "Size mismatch between symbol and atlas"):
+            self.atlas.decode(np.zeros(shape=(2, 50, 50)))
+
+    def test_cistercian_to_arabic_with_atlas(self):
+        for number in [0, 7, 1735, 9000]:
+            cistercian = arabic_to_cistercian(number)
+            self.assertEqual(cistercian_to_arabic(cistercian, self.atlas.symbol_mapping, atlas=self.atlas), number)
+
+        cistercian = CistercianNumber(height=7, width=5)
+        cistercian.set_symbol(np.array([
+            [0, 0, 1, 0, 1],
+            [0, 0, 1, 0, 0],
+            [0, 0, 1, 0, 0],
+            [0, 0, 1, 0, 0],
+            [0, 0, 1, 0, 0],
+            [0, 0, 1, 0, 0],
+            [1, 1, 1, 0, 0],
+        ]))
+        self.assertEqual(cistercian_to_arabic(cistercian, self.atlas.symbol_mapping, atlas=self.atlas), 1000)
+
+
+class TestPackedAtlas(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls) -> None:
+        cls.atlas = GlyphAtlas(height=17, width=15)
+        cls.packed_atlas = GlyphAtlas(height=17, width=15, packed=True)
+
+    def test_memory(self):
+        self.assertEqual(self.atlas.nbytes, 10000 * 17 * 15)
+        self.assertEqual(self.packed_atlas.nbytes, 10000 * 17 * 2)
+
+    def test_same_symbols(self):
+        numbers = np.array([0, 9, 1735, 9999])
+        np.testing.assert_array_equal(self.packed_atlas.encode(numbers), self.atlas.encode(numbers))
+        np.testing.assert_array_equal(self.packed_atlas.get_glyph(1993), self.atlas.get_glyph(1993))
+        self.assertEqual(self.packed_atlas.encode(numbers).dtype, self.atlas.dtype)
+
+    def test_decode(self):
+        numbers = np.arange(0, 10000, 7)
+        np.testing.assert_array_equal(self.packed_atlas.decode(self.packed_atlas.encode(numbers)), numbers)
+        self.assertEqual(self.packed_atlas.lookup(self.atlas.get_glyph(1993)), 1993)
+
+
+class TestAtlasCache(unittest.TestCase):
+    def setUp(self) -> None:
+        clear_atlas_cache()
+
+    def tearDown(self) -> None:
+        clear_atlas_cache()
+
+    def test_cached_per_size_and_dtype(self):
+        atlas = get_atlas(7, 5)
+        self.assertIs(get_atlas(7, 5), atlas)
+        self.assertIsNot(get_atlas(7, 5, dtype=np.float64), atlas)
+        self.assertIsNot(get_atlas(7, 5, packed=True), atlas)
+        self.assertEqual(get_atlas(7, 5, dtype=bool).dtype, bool)
+
+    def test_lru_eviction(self):
+        with mock.patch.object(glyph_atlas, 'MAX_CACHED_ATLASES', 2):
+            first = get_atlas(7, 5)
+            second = get_atlas(9, 7)
+            self.assertIs(get_atlas(7, 5), first)  # first is now the most recently used
+            get_atlas(11, 9)  # evicts second
+            self.assertIs(get_atlas(7, 5), first)
+            self.assertIsNot(get_atlas(9, 7), second)
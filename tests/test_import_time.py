@@ -0,0 +1,40 @@
+import os
+import subprocess
+import sys
+import unittest
+
+# startup budget for importing the translation module in a fresh interpreter, numpy import included
+IMPORT_TIME_BUDGET_SECONDS = 1.5
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+IMPORT_SCRIPT = """
+import sys
+import time
+start = time.perf_counter()
+import symbol_generation.translating_cistercian_symbols as translating
+elapsed = time.perf_counter() - start
+print(elapsed)
+print('matplotlib' in sys.modules)
+print(translating.get_default_symbol_mapping.cache_info().currsize)
+"""
+
+
+class TestImportTime(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls) -> None:
+        output = subprocess.run([sys.executable, '-c', IMPORT_SCRIPT], capture_output=True, text=True, check=True,
+                                cwd=REPO_ROOT)
+        elapsed, matplotlib_imported, mappings_built = output.stdout.split()
+        cls.elapsed = float(elapsed)
+        cls.matplotlib_imported = matplotlib_imported == 'True'
+        cls.mappings_built = int(mappings_built)
+
+    def test_import_time_budget(self):
+        self.assertLess(self.elapsed, IMPORT_TIME_BUDGET_SECONDS)
+
+    def test_matplotlib_not_imported(self):
+        self.assertFalse(self.matplotlib_imported)
+
+    def test_mapping_not_built(self):
+        self.assertEqual(self.mappings_built, 0)
@@ -0,0 +1,79 @@
+import unittest
+
+import numpy as np
+
+from symbol_generation import instrumentation
+from symbol_generation.glyph_atlas import GlyphAtlas, get_atlas, clear_atlas_cache
+from symbol_generation.symbol_mapping import create_symbols
+from symbol_generation.translating_cistercian_symbols import arabic_to_cistercian, cistercian_to_arabic
+
+
+class TestInstrumentation(unittest.TestCase):
+    def setUp(self) -> None:
+        instrumentation.reset()
+        instrumentation.enable()
+
+    def tearDown(self) -> None:
+        instrumentation.disable()
+        instrumentation.reset()
+
+    def test_disabled_records_nothing(self):
+        instrumentation.disable()
+        mapping = create_symbols(symbol_height=7, symbol_width=5)
+        cistercian_to_arabic(arabic_to_cistercian(1993, symbol_mapping=mapping), mapping)
+        self.assertEqual(instrumentation.snapshot(), {'counters': {}, 'timers': {}})
+
+    def test_mapping_build_and_decode(self):
+        mapping = create_symbols(symbol_height=7, symbol_width=5)
+        cistercian = arabic_to_cistercian(1993, symbol_mapping=mapping)
+        self.assertEqual(cistercian_to_arabic(cistercian, mapping), 1993)
+
+        stats = instrumentation.snapshot()
+        self.assertEqual(stats['timers']['create_symbols']['calls'], 1)
+        self.assertEqual(stats['timers']['arabic_to_cistercian']['calls'], 1)
+        self.assertEqual(stats['timers']['cistercian_to_arabic']['calls'], 1)
+        self.assertGreater(stats['timers']['create_symbols']['seconds'], 0)
+        self.assertEqual(stats['counters']['containment_checks'], len(mapping))
+
+    def test_template_scans(self):
+        mapping = create_symbols(symbol_height=7, symbol_width=5)
+        instrumentation.reset()
+        self.assertEqual(mapping[5].get_value(mapping), 5)
+        stats = instrumentation.snapshot()
+        self.assertEqual(stats['counters']['get_value.template_scans'], list(mapping).index(5) + 1)
+        self.assertEqual(stats['timers']['get_value']['calls'], 1)
+
+    def test_cache_hits_and_misses(self):
+        clear_atlas_cache()
+        get_atlas(7, 5)
+        get_atlas(7, 5)
+        atlas = GlyphAtlas(height=7, width=5)
+        atlas.decode(np.stack([atlas.get_glyph(5), np.ones(shape=(7, 5), dtype=np.uint8)]))
+
+        counters = instrumentation.snapshot()['counters']
+        self.assertEqual(counters['atlas_cache.misses'], 1)
+        self.assertEqual(counters['atlas_cache.hits'], 1)
+        self.assertEqual(counters['decode_index.hits'], 1)
+        self.assertEqual(counters['decode_index.misses'], 1)
+
+    def test_periodic_logger(self):
+        messages = []
+        periodic_logger = instrumentation.start_periodic_logging(interval=60, log=messages.append,
+                                                                 reset_after_log=True)
+        create_symbols(symbol_height=7, symbol_width=5)
+        periodic_logger.log_snapshot()
+        periodic_logger.stop()
+
+        self.assertEqual(len(messages), 1)
+        self.assertIn('create_symbols: 1 calls', messages[0])
+        self.assertEqual(instrumentation.snapshot()['timers'], {})
+        self.assertTrue(instrumentation.is_enabled())  # enabled before the logger started
+
+    def test_periodic_logger_restores_disabled(self):
+        instrumentation.disable()
+        periodic_logger = instrumentation.start_periodic_logging(interval=60, log=lambda message: None)
+        self.assertTrue(instrumentation.is_enabled())
+        periodic_logger.stop()
+        self.assertFalse(instrumentation.is_enabled())
+        create_symbols(symbol_height=7, symbol_width=5)
+        self.assertEqual(instrumentation.snapshot(), {'counters': {}, 'timers': {}})
@@ -0,0 +1,79 @@
+import unittest
+
+import numpy as np
+
+from symbol_generation.glyph_atlas import get_atlas
+from symbol_generation.multi_glyph import split_to_chunks, join_chunks, strip_width, \
+    arabic_to_cistercian_multi_glyph, cistercian_multi_glyph_to_arabic
+
+
+class TestChunks(unittest.TestCase):
+    def test_split_int64(self):
+        chunks, num_chunks = split_to_chunks(np.array([0, 9999, 10000, 123456789012], dtype=np.int64))
+        np.testing.assert_array_equal(chunks, [[0, 0, 0], [0, 0, 9999], [0, 1, 0], [1234, 5678, 9012]])
+        np.testing.assert_array_equal(num_chunks, [1, 1, 2, 3])
+
+    def test_split_int64_max(self):
+        chunks, num_chunks = split_to_chunks(np.array([np.iinfo(np.int64).max]))
+        np.testing.assert_array_equal(chunks, [[922, 3372, 368, 5477, 5807]])
+        self.assertEqual(join_chunks(chunks)[0], np.iinfo(np.int64).max)
+
+    def test_split_big_ints(self):
+        numbers = np.array([2 ** 100, 5, 10 ** 40], dtype=object)
+        chunks, num_chunks = split_to_chunks(numbers)
+        np.testing.assert_array_equal(num_chunks, [8, 1, 11])
+        self.assertEqual(join_chunks(chunks).tolist(), numbers.tolist())
+
+    def test_negative(self):
+        with self.assertRaisesRegex(AssertionError, "Number out of range"):
+            split_to_chunks(np.array([5, -1]))
+
+    def test_bool(self):
+        for numbers in (np.array([True, False]), np.array([True, 10 ** 20], dtype=object)):
+            with self.assertRaisesRegex(AssertionError, "only int"):
+                split_to_chunks(numbers)
+
+
+class TestMultiGlyph(unittest.TestCase):
+    def test_strip_layout(self):
+        strips = arabic_to_cistercian_multi_glyph(np.array([19930001, 7]), symbol_height=7, symbol_width=5)
+        self.assertEqual(strips.shape, (2, 7, strip_width(2, 5)))
+        atlas = get_atlas(7, 5)
+        np.testing.assert_array_equal(strips[0, :, :5], atlas.get_glyph(1993))
+        np.testing.assert_array_equal(strips[0, :, 6:], atlas.get_glyph(1))
+        np.testing.assert_array_equal(strips[:, :, 5], 0)  # spacing
+        np.testing.assert_array_equal(strips[1, :, :5], 0)  # padding 0 chunk
+        np.testing.assert_array_equal(strips[1, :, 6:], atlas.get_glyph(7))
+
+    def test_round_trip_int64(self):
+        numbers = np.random.default_rng(0).integers(0, np.iinfo(np.int64).max, size=1000, dtype=np.int64)
+        numbers[:3] = [0, 10000, 9999]
+        for spacing in [0, 1, 3]:
+            strips = arabic_to_cistercian_multi_glyph(numbers, symbol_height=17, symbol_width=15, spacing=spacing)
+            decoded = cistercian_multi_glyph_to_arabic(strips, symbol_height=17, symbol_width=15, spacing=spacing)
+            self.assertEqual([int(value) for value in decoded], numbers.tolist())
+
+    def test_round_trip_big_ints(self):
+        numbers = [3 ** 90, 0, 10 ** 20, 2 ** 64]
+        strips = arabic_to_cistercian_multi_glyph(np.array(numbers, dtype=object))
+        self.assertEqual(cistercian_multi_glyph_to_arabic(strips).tolist(), numbers)
+
+    def test_zero_chunks_kept(self):
+        strips = arabic_to_cistercian_multi_glyph(np.array([100000000, 1]), num_glyphs=4)
+        self.assertEqual(strips.shape[2], strip_width(4, 5))
+        np.testing.assert_array_equal(cistercian_multi_glyph_to_arabic(strips), [100000000, 1])
+
+    def test_empty(self):
+        strips = arabic_to_cistercian_multi_glyph(np.array([], dtype=np.int64))
+        self.assertEqual(strips.shape, (0, 7, strip_width(1, 5)))
+        self.assertEqual(arabic_to_cistercian_multi_glyph(np.array([], dtype=np.int64), num_glyphs=3).shape,
+                         (0, 7, strip_width(3, 5)))
+        self.assertEqual(cistercian_multi_glyph_to_arabic(strips).shape, (0,))
+
+    def test_num_glyphs_too_small(self):
+        with self.assertRaisesRegex(AssertionError, "Number out of range"):
+            arabic_to_cistercian_multi_glyph(np.array([10 ** 9]), num_glyphs=2)
+
+    def test_strip_width_mismatch(self):
+        with self.assertRaisesRegex(AssertionError, "Size mismatch"):
+            cistercian_multi_glyph_to_arabic(np.zeros(shape=(1, 7, 12)))
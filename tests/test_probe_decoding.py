@@ -0,0 +1,72 @@
+import unittest
+from unittest import mock
+
+import numpy as np
+
+from symbol_generation import probe_decoding
+from symbol_generation.probe_decoding import get_probe_indices, cistercian_to_arabic_probe
+from symbol_generation.strokes import STROKE_DIGITS
+from symbol_generation.translating_cistercian_symbols import arabic_to_cistercian_batch
+
+
+class TestStrokeDigits(unittest.TestCase):
+    def test_digits(self):
+        self.assertEqual(sorted(STROKE_DIGITS[STROKE_DIGITS >= 0].tolist()), list(range(10)))
+        self.assertEqual(STROKE_DIGITS[0], 0)
+
+
+class TestProbeIndices(unittest.TestCase):
+    def test_shape(self):
+        probes = get_probe_indices(17, 15)
+        self.assertEqual(probes.shape, (4, 5, 3))
+        self.assertFalse(probes.flags.writeable)
+        stroke_probes = [set(stroke.tolist()) for stroke in probes.reshape(20, 3)]
+        self.assertEqual(len(set.union(*stroke_probes)), sum(map(len, stroke_probes)))  # strokes never share probes
+
+    def test_too_small(self):
+        self.assertIsNone(get_probe_indices(7, 5))
+
+
+class TestProbeDecode(unittest.TestCase):
+    def test_sizes(self):
+        numbers = np.arange(10000)
+        for height, width in [(10, 8), (17, 15), (20, 14), (64, 48), (7, 5)]:
+            symbols = arabic_to_cistercian_batch(numbers, symbol_height=height, symbol_width=width)
+            np.testing.assert_array_equal(cistercian_to_arabic_probe(symbols), numbers,
+                                          err_msg=f"size {height}x{width}")
+
+    def test_reads_probes_only(self):
+        numbers = np.array([1993, 0, 6002])
+        symbols = arabic_to_cistercian_batch(numbers, symbol_height=512, symbol_width=512)
+        probes = get_probe_indices(512, 512)
+        flat_symbols = symbols.reshape(3, -1)
+        masked = np.zeros_like(flat_symbols)
+        masked[:, probes] = flat_symbols[:, probes]  # every pixel that is not a probe is blank
+        np.testing.assert_array_equal(cistercian_to_arabic_probe(masked.reshape(symbols.shape)), numbers)
+
+    def test_fallback(self):
+        symbols = arabic_to_cistercian_batch(np.array([1993, 5, 3]), symbol_height=17, symbol_width=15)
+        symbols[1] |= symbols[2]  # both diagonals and the top line are not a digit
+        symbols = symbols[:2]
+        self.assertEqual(cistercian_to_arabic_probe(symbols, fallback=False).tolist(), [1993, -1])
+        with mock.patch.object(probe_decoding, 'cistercian_to_arabic_any_size',
+                               return_value=(np.array([7]), None)) as any_size:
+            self.assertEqual(cistercian_to_arabic_probe(symbols).tolist(), [1993, 7])
+        self.assertEqual(len(any_size.call_args[0][0]), 1)
+
+    def test_fallback_builds_no_atlas(self):
+        symbols = arabic_to_cistercian_batch(np.array([1993, 5, 3]), symbol_height=256, symbol_width=256)
+        symbols.reshape(3, -1)[0, get_probe_indices(256, 256)[0, 4]] = 1  # specks on the probes of the outer line
+        self.assertEqual(cistercian_to_arabic_probe(symbols, fallback=False).tolist(), [-1, 5, 3])
+        with mock.patch('symbol_generation.glyph_atlas.GlyphAtlas') as glyph_atlas:
+            self.assertEqual(cistercian_to_arabic_probe(symbols).tolist(), [1993, 5, 3])
+        glyph_atlas.assert_not_called()
+
+    def test_fallback_wide_sizes(self):
+        numbers = np.arange(3, 10000, 10)  # units of 3, whose diagonal and outer line are not a digit
+        for height, width in [(28, 45), (46, 73), (119, 176)]:
+            symbols = arabic_to_cistercian_batch(numbers, symbol_height=height, symbol_width=width)
+            symbols.reshape(len(numbers), -1)[:, get_probe_indices(height, width)[0, 4]] = 1  # specks on the outer line
+            self.assertTrue((cistercian_to_arabic_probe(symbols, fallback=False) == -1).all())
+            np.testing.assert_array_equal(cistercian_to_arabic_probe(symbols), numbers,
+                                          err_msg=f"size {height}x{width}")
@@ -0,0 +1,71 @@
+import unittest
+
+import numpy as np
+
+from symbol_generation.resampling import canonical_shape, resample_symbols, cistercian_to_arabic_any_size, \
+    get_canonical_mapping
+from symbol_generation.translating_cistercian_symbols import arabic_to_cistercian_batch
+
+
+class TestCanonicalShape(unittest.TestCase):
+    def test_keeps_aspect_ratio(self):
+        self.assertEqual(canonical_shape(70, 50), canonical_shape(700, 500))
+        self.assertEqual(canonical_shape(512, 512), (15, 15))
+        self.assertEqual(canonical_shape(200, 225), (13, 15))
+
+    def test_keeps_stroke_layout(self):
+        self.assertEqual(canonical_shape(700, 500), (43, 31))  # in (21, 15) the diagonals would reach the outer column
+
+    def test_small_symbols_keep_their_size(self):
+        self.assertEqual(canonical_shape(7, 5), (7, 5))
+        self.assertEqual(canonical_shape(10, 13), (10, 13))
+
+    def test_unfaithful_grids_are_skipped(self):
+        # (11, 17) has the stroke layout of 119x176 but bends its diagonals, a wider grid keeps them apart
+        self.assertEqual(canonical_shape(119, 176), (13, 19))
+
+
+class TestResampleSymbols(unittest.TestCase):
+    def test_same_size(self):
+        symbols = arabic_to_cistercian_batch(np.array([1993, 5]), symbol_height=21, symbol_width=15)
+        np.testing.assert_array_equal(resample_symbols(symbols, 21, 15), symbols)
+
+    def test_thin_lines_keep_full_strength(self):
+        symbols = arabic_to_cistercian_batch(np.array([1]), symbol_height=210, symbol_width=150)
+        resampled = resample_symbols(symbols, 21, 15)
+        np.testing.assert_allclose(resampled[0, :, 7], np.ones(21), rtol=1e-6)  # central line
+        np.testing.assert_allclose(resampled[0, 0, 7:], np.ones(8), rtol=1e-6)  # top line of 1
+
+
+class TestAnySizeDecode(unittest.TestCase):
+    def test_sizes(self):
+        for height, width in [(7, 5), (10, 8), (17, 15), (20, 14), (64, 48), (51, 37), (90, 60), (200, 200), (333, 222),
+                              (1000, 700), (6, 5), (7, 7), (7, 8), (7, 9), (8, 9), (8, 10), (8, 11), (9, 11), (9, 12),
+                              (10, 12), (10, 13), (200, 225), (85, 63), (50, 200)]:
+            numbers = np.arange(0, 10000, 7 if height < 100 else 97)
+            symbols = arabic_to_cistercian_batch(numbers, symbol_height=height, symbol_width=width)
+            values, confidences = cistercian_to_arabic_any_size(symbols)
+            np.testing.assert_array_equal(values, numbers, err_msg=f"size {height}x{width}")
+            self.assertEqual(confidences.shape, (len(numbers), 4))
+
+    def test_wide_sizes_all_numbers(self):
+        # wide sizes whose anchors are spaced in other proportions than those of the narrower grids of the same layout
+        numbers = np.arange(10000)
+        for height, width in [(10, 17), (13, 21), (28, 45), (30, 50), (31, 49), (46, 73), (119, 176)]:
+            symbols = arabic_to_cistercian_batch(numbers, symbol_height=height, symbol_width=width)
+            values, _ = cistercian_to_arabic_any_size(symbols)
+            np.testing.assert_array_equal(values, numbers, err_msg=f"size {height}x{width}")
+
+    def test_mixed_sizes(self):
+        numbers = [1993, 7, 2047, 9999, 0]
+        sizes = [(7, 5), (70, 50), (512, 512), (17, 15), (35, 25)]
+        symbols = [arabic_to_cistercian_batch(np.array([number]), symbol_height=height, symbol_width=width)[0]
+                   for number, (height, width) in zip(numbers, sizes)]
+        values, _ = cistercian_to_arabic_any_size(symbols)
+        np.testing.assert_array_equal(values, numbers)
+
+    def test_mapping_shared_by_aspect_ratio(self):
+        get_canonical_mapping.cache_clear()
+        for height, width in [(70, 50), (140, 100), (700, 500)]:
+            cistercian_to_arabic_any_size(arabic_to_cistercian_batch(np.array([5]), height, width))
+        self.assertEqual(get_canonical_mapping.cache_info().currsize, 1)
@@ -0,0 +1,72 @@
+import unittest
+
+import numpy as np
+
+from symbol_generation.multi_glyph import arabic_to_cistercian_multi_glyph
+from symbol_generation.segmentation import find_symbol_boxes, crop_symbols, cistercian_page_to_arabic
+from symbol_generation.sheet_rendering import tile_symbols, INK
+from symbol_generation.translating_cistercian_symbols import arabic_to_cistercian_batch
+
+
+def _page(numbers: np.ndarray, height: int, width: int, columns: int = 20, padding: int = 2) -> np.ndarray:
+    symbols = arabic_to_cistercian_batch(numbers, symbol_height=height, symbol_width=width)
+    return (tile_symbols(symbols, columns=columns, padding=padding) == INK).astype(np.uint8)
+
+
+class TestFindSymbolBoxes(unittest.TestCase):
+    def test_boxes(self):
+        boxes = find_symbol_boxes(_page(np.array([1993, 5, 6002]), height=7, width=5, columns=2, padding=1))
+        np.testing.assert_array_equal(boxes, [[1, 8, 1, 6], [1, 8, 7, 12], [9, 16, 1, 6]])
+
+    def test_crop(self):
+        numbers = np.array([1993, 5, 6002])
+        page = _page(numbers, height=17, width=14, columns=2)
+        symbols = crop_symbols(page, find_symbol_boxes(page))
+        np.testing.assert_array_equal(symbols, arabic_to_cistercian_batch(numbers, symbol_height=17, symbol_width=14))
+
+    def test_given_width(self):
+        page = _page(np.array([10, 1, 11]), height=20, width=14)
+        np.testing.assert_array_equal(find_symbol_boxes(page, symbol_width=14), find_symbol_boxes(page))
+
+    def test_blank_image(self):
+        self.assertEqual(find_symbol_boxes(np.zeros(shape=(10, 10))).shape, (0, 4))
+
+
+class TestPageDecode(unittest.TestCase):
+    def test_sizes(self):
+        numbers = np.random.default_rng(0).integers(1, 10000, size=1000)
+        for height, width in [(7, 5), (17, 15), (20, 14), (64, 48)]:
+            values, confidences, boxes = cistercian_page_to_arabic(_page(numbers, height, width))
+            np.testing.assert_array_equal(values, numbers, err_msg=f"size {height}x{width}")
+            self.assertEqual(confidences.shape, (len(numbers), 4))
+            np.testing.assert_array_equal(boxes[:, 1] - boxes[:, 0], height)
+            np.testing.assert_array_equal(boxes[:, 3] - boxes[:, 2], width)
+
+    def test_wide_page(self):
+        numbers = np.arange(100, 200)
+        values, _, boxes = cistercian_page_to_arabic(_page(numbers, height=28, width=45))
+        np.testing.assert_array_equal(values, numbers)
+        np.testing.assert_array_equal(boxes[:, 3] - boxes[:, 2], 45)
+
+    def test_scaled_page(self):
+        numbers = np.random.default_rng(1).integers(1, 10000, size=200)
+        page = np.kron(_page(numbers, height=17, width=15), np.ones(shape=(3, 3), dtype=np.uint8))
+        values, _, _ = cistercian_page_to_arabic(page)
+        np.testing.assert_array_equal(values, numbers)
+
+    def test_multi_glyph_strip(self):
+        strip = arabic_to_cistercian_multi_glyph(np.array([1234567891234]), symbol_height=17, symbol_width=15,
+                                                 spacing=0)[0]
+        values, _, _ = cistercian_page_to_arabic(strip)
+        np.testing.assert_array_equal(values, [1, 2345, 6789, 1234])
+
+    def test_noisy_page(self):
+        rng = np.random.default_rng(2)
+        numbers = rng.integers(1, 10000, size=200)
+        page = _page(numbers, height=17, width=15, padding=2)
+        for gap_top in range(2 + 17, page.shape[0] - 17, 17 + 2):  # a speck across the blank rows between rows
+            blank_columns = np.flatnonzero(~page[gap_top - 1].astype(bool) & ~page[gap_top + 2].astype(bool))
+            page[gap_top:gap_top + 2, rng.choice(blank_columns)] = 1
+        values, _, boxes = cistercian_page_to_arabic(page)
+        np.testing.assert_array_equal(values, numbers)
+        np.testing.assert_array_equal(boxes[:, 1] - boxes[:, 0], 17)
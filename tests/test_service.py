@@ -0,0 +1,110 @@
+import asyncio
+import json
+import unittest
+
+import numpy as np
+
+from symbol_generation.glyph_atlas import get_atlas
+from symbol_generation.service import MicroBatcher, start_server, run_load_test
+
+
+async def _with_server(coroutine_function, **server_kwargs):
+    server, service = await start_server(port=0, height=7, width=5, **server_kwargs)
+    try:
+        return await coroutine_function(server.sockets[0].getsockname()[1], service)
+    finally:
+        server.close()
+        await server.wait_closed()
+
+
+class TestMicroBatcher(unittest.TestCase):
+    def test_coalesces_concurrent_items(self):
+        batches = []
+
+        def process_batch(items):
+            batches.append(list(items))
+            return [item * 2 for item in items]
+
+        async def run():
+            batcher = MicroBatcher(process_batch, max_batch_size=4, max_delay=0.01)
+            return await asyncio.gather(*[batcher.submit(item) for item in range(10)])
+
+        self.assertEqual(asyncio.run(run()), [item * 2 for item in range(10)])
+        self.assertEqual([len(batch) for batch in batches], [4, 4, 2])
+
+    def test_batch_error_reaches_every_item(self):
+        def process_batch(items):
+            raise ValueError("bad batch")
+
+        async def run():
+            batcher = MicroBatcher(process_batch, max_delay=0.001)
+            return await asyncio.gather(batcher.submit(1), batcher.submit(2), return_exceptions=True)
+
+        self.assertTrue(all(isinstance(result, ValueError) for result in asyncio.run(run())))
+
+
+class TestService(unittest.TestCase):
+    def test_load_test_encode(self):
+        async def run(port, service):
+            return await run_load_test(port=port, num_requests=200, concurrency=20, op='encode', height=7,
+                                       width=5), service
+
+        stats, service = asyncio.run(_with_server(run))
+        expected = get_atlas(7, 5).encode(stats['numbers'])
+        for ix, symbol in enumerate(expected):
+            np.testing.assert_array_equal(stats['responses'][ix]['symbol'], symbol)
+        self.assertLessEqual(stats['p50'], stats['p99'])
+        self.assertLess(service.encoder.num_batches, 200)  # concurrent requests were coalesced
+
+    def test_load_test_decode(self):
+        async def run(port, service):
+            return await run_load_test(port=port, num_requests=100, concurrency=10, op='decode', height=7, width=5)
+
+        stats = asyncio.run(_with_server(run))
+        self.assertEqual([stats['responses'][ix]['number'] for ix in range(100)], stats['numbers'].tolist())
+
+    def test_pipelined_requests_and_errors(self):
+        async def run(port, service):
+            reader, writer = await asyncio.open_connection('127.0.0.1', port)
+            requests = [{'id': 0, 'op': 'encode', 'number': 1993},
+                        {'id': 1, 'op': 'encode', 'number': 10000},
+                        {'id': 2, 'op': 'decode', 'symbol': [[0, 1], [1, 0]]},
+                        {'id': 3, 'op': 'translate'},
+                        {'id': 4, 'op': 'decode', 'symbol': get_atlas(7, 5).get_glyph(6002).tolist()},
+                        {'id': 5, 'op': 'encode', 'number': True},
+                        {'id': 6, 'op': 'decode', 'symbol': [[256] * 5] * 7},
+                        {'id': 7, 'op': 'decode', 'symbol': [[-1] * 5] * 7},
+                        {'id': 8, 'op': 'decode', 'symbol': [[2 ** 70] * 5] * 7}]
+            writer.write(b''.join(json.dumps(request).encode() + b'\n' for request in requests) + b'not json\n')
+            await writer.drain()
+            responses = [json.loads(await reader.readline()) for _ in range(len(requests) + 1)]
+            writer.close()
+            return {response['id']: response for response in responses}
+
+        responses = asyncio.run(_with_server(run))
+        np.testing.assert_array_equal(responses[0]['symbol'], get_atlas(7, 5).get_glyph(1993))
+        self.assertIn("Number out of range", responses[1]['error'])
+        self.assertIn("Size mismatch", responses[2]['error'])
+        self.assertIn("Unsupported op", responses[3]['error'])
+        self.assertEqual(responses[4]['number'], 6002)
+        self.assertIn("Number out of range", responses[5]['error'])
+        for ix in (6, 7, 8):
+            self.assertIn("Unsupported symbol", responses[ix]['error'])
+        self.assertIn("Unsupported request", responses[None]['error'])
+
+    def test_failed_request_gets_error_line(self):
+        async def run(port, service):
+            async def fail(request):
+                raise RuntimeError("boom")
+
+            service.handle_request = fail
+            reader, writer = await asyncio.open_connection('127.0.0.1', port)
+            writer.write(b'{"id": 9, "op": "encode", "number": 5}\n')
+            await writer.drain()
+            response = json.loads(await asyncio.wait_for(reader.readline(), timeout=5))
+            writer.close()
+            return response
+
+        response = asyncio.run(_with_server(run))
+        self.assertEqual(response['id'], 9)
+        self.assertIn("boom", response['error'])
@@ -0,0 +1,125 @@
+import os
+import struct
+import tempfile
+import unittest
+import zlib
+from unittest import mock
+
+import numpy as np
+
+from symbol_generation.glyph_atlas import get_atlas
+from symbol_generation.sheet_rendering import sheet_shape, tile_symbols, write_pgm, write_png, render_sheet, read_pgm, \
+    read_png, _png_chunk
+from symbol_generation.translating_cistercian_symbols import arabic_to_cistercian_batch
+
+
+def _write_filtered_png(path: str, image: np.ndarray, color_type: int):
+    """ a PNG of an (height, width, channels) image, row i filtered with filter type i % 5 """
+    height, width, channels = image.shape
+    pixels = image.reshape(height, width * channels).astype(np.int64)
+    scanlines = []
+    for y in range(height):
+        row, above = pixels[y], pixels[y - 1] if y > 0 else np.zeros(width * channels, dtype=np.int64)
+        left = np.concatenate([np.zeros(channels, dtype=np.int64), row[:-channels]])
+        upper_left = np.concatenate([np.zeros(channels, dtype=np.int64), above[:-channels]])
+        estimate = left + above - upper_left
+        distances = np.stack([np.abs(estimate - left), np.abs(estimate - above), np.abs(estimate - upper_left)])
+        paeth = np.choose(np.argmin(distances, axis=0), [left, above, upper_left])
+        predictors = [0, left, above, (left + above) // 2, paeth]
+        scanlines.append(bytes([y % 5]) + ((row - predictors[y % 5]) % 256).astype(np.uint8).tobytes())
+    with open(path, 'wb') as f:
+        f.write(b'\x89PNG\r\n\x1a\n')
+        f.write(_png_chunk(b'IHDR', struct.pack('>IIBBBBB', width, height, 8, color_type, 0, 0, 0)))
+        f.write(_png_chunk(b'IDAT', zlib.compress(b''.join(scanlines))))
+        f.write(_png_chunk(b'IEND', b''))
+
+
+class TestTileSymbols(unittest.TestCase):
+    def test_sheet_shape(self):
+        self.assertEqual(sheet_shape(10, 7, 5, columns=4, padding=1), (3 * 8 + 1, 4 * 6 + 1))
+
+    def test_tile(self):
+        symbols = get_atlas(7, 5).encode(np.arange(10))
+        sheet = tile_symbols(symbols, columns=4, padding=1)
+        self.assertEqual(sheet.shape, (25, 25))
+        self.assertEqual(sheet.dtype, np.uint8)
+        for ix, symbol in enumerate(symbols):
+            row, column = divmod(ix, 4)
+            cell = sheet[1 + row * 8:1 + row * 8 + 7, 1 + column * 6:1 + column * 6 + 5]
+            np.testing.assert_array_equal(cell, np.where(symbol > 0, 0, 255))
+        # padding and the empty cells of the last row are background
+        self.assertTrue((sheet[0] == 255).all())
+        self.assertTrue((sheet[:, 0] == 255).all())
+        self.assertTrue((sheet[17:, 13:] == 255).all())
+
+    def test_out(self):
+        symbols = get_atlas(7, 5).encode(np.arange(3))
+        out = np.zeros(shape=sheet_shape(3, 7, 5, columns=3, padding=2), dtype=np.uint8)
+        self.assertIs(tile_symbols(symbols, columns=3, padding=2, out=out), out)
+        np.testing.assert_array_equal(out, tile_symbols(symbols, columns=3, padding=2))
+
+
+class TestWriteSheets(unittest.TestCase):
+    def setUp(self) -> None:
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.image = np.random.default_rng(0).integers(0, 256, size=(300, 17), dtype=np.uint8)
+
+    def tearDown(self) -> None:
+        self.temp_dir.cleanup()
+
+    def test_pgm(self):
+        path = os.path.join(self.temp_dir.name, 'image.pgm')
+        write_pgm(path, self.image)
+        np.testing.assert_array_equal(read_pgm(path), self.image)
+
+    def test_png(self):
+        path = os.path.join(self.temp_dir.name, 'image.png')
+        write_png(path, self.image, rows_per_chunk=64)
+        np.testing.assert_array_equal(read_png(path), self.image)
+
+    def test_read_filtered_png(self):
+        path = os.path.join(self.temp_dir.name, 'filtered.png')
+        image = np.random.default_rng(0).integers(0, 256, size=(12, 9, 4), dtype=np.uint8)
+        for color_type, channels in [(0, 1), (4, 2), (2, 3), (6, 4)]:
+            _write_filtered_png(path, image[:, :, :channels], color_type)
+            expected = image[:, :, 0] if channels == 1 else image[:, :, :channels]
+            np.testing.assert_array_equal(read_png(path), expected, err_msg=f"color type {color_type}")
+
+
+class TestRenderSheet(unittest.TestCase):
+    def setUp(self) -> None:
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.numbers = np.arange(0, 1000, 3)
+        self.expected = tile_symbols(get_atlas(17, 15).encode(self.numbers), columns=20, padding=2)
+
+    def tearDown(self) -> None:
+        self.temp_dir.cleanup()
+
+    def test_pgm(self):
+        path = os.path.join(self.temp_dir.name, 'sheet.pgm')
+        shape = render_sheet(self.numbers, path, height=17, width=15, columns=20, padding=2, jobs=1, rows_per_tile=3)
+        self.assertEqual(shape, self.expected.shape)
+        np.testing.assert_array_equal(read_pgm(path), self.expected)
+
+    def test_png_parallel(self):
+        path = os.path.join(self.temp_dir.name, 'sheet.png')
+        render_sheet(self.numbers, path, height=17, width=15, columns=20, padding=2, jobs=2, rows_per_tile=4)
+        np.testing.assert_array_equal(read_png(path), self.expected)
+        self.assertEqual(os.listdir(self.temp_dir.name), ['sheet.png'])  # the temporary raw sheet is removed
+
+    def test_large_symbols_build_no_atlas(self):
+        path = os.path.join(self.temp_dir.name, 'sheet.pgm')
+        numbers = np.array([1993, 5, 6002])
+        with mock.patch('symbol_generation.glyph_atlas.GlyphAtlas') as glyph_atlas:
+            render_sheet(numbers, path, height=280, width=200, columns=3, padding=2, jobs=1)
+        glyph_atlas.assert_not_called()
+        np.testing.assert_array_equal(read_pgm(path), tile_symbols(
+            arabic_to_cistercian_batch(numbers, symbol_height=280, symbol_width=200), columns=3, padding=2))
+
+    def test_number_out_of_range(self):
+        with self.assertRaisesRegex(AssertionError, "Number out of range"):
+            render_sheet(np.array([10000]), os.path.join(self.temp_dir.name, 'sheet.pgm'), height=17, width=15)
+
+    def test_unsupported_format(self):
+        with self.assertRaisesRegex(AssertionError, "Unsupported sheet format"):
+            render_sheet(self.numbers, 'sheet.jpg', height=17, width=15)
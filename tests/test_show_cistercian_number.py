@@ -0,0 +1,84 @@
+import contextlib
+import io
+import os
+import tempfile
+import unittest
+
+import numpy as np
+
+from show_cistercian_number import parse_args, run_encode, run_decode, run_atlas, DEFAULT_HEIGHT, DEFAULT_WIDTH
+from symbol_generation.atlas_file import open_atlas_file
+from symbol_generation.glyph_atlas import get_atlas
+
+
+class TestBatchCommands(unittest.TestCase):
+    def setUp(self) -> None:
+        self.temp_dir = tempfile.TemporaryDirectory()
+
+    def tearDown(self) -> None:
+        self.temp_dir.cleanup()
+
+    def test_no_command(self):
+        args = parse_args([])
+        self.assertIsNone(args.command)
+        self.assertEqual((args.height, args.width), (DEFAULT_HEIGHT, DEFAULT_WIDTH))
+
+    def test_encode_decode_directory(self):
+        images_dir = os.path.join(self.temp_dir.name, 'images')
+        output = os.path.join(self.temp_dir.name, 'decoded.csv')
+        run_encode(parse_args(['-hh', '35', '-ww', '25', 'encode', '--start', '1990', '--stop', '2010',
+                               '-o', images_dir, '-j', '2']))
+        self.assertEqual(len(os.listdir(images_dir)), 20)
+
+        run_decode(parse_args(['decode', images_dir, '-o', output, '-j', '2']))
+        with open(output) as f:
+            lines = sorted(f.read().split())
+        self.assertEqual(lines, sorted(f"{number}.pgm,{number}" for number in range(1990, 2010)))
+
+    def test_encode_decode_wide_symbols(self):
+        images_dir = os.path.join(self.temp_dir.name, 'images')
+        output = os.path.join(self.temp_dir.name, 'decoded.csv')
+        run_encode(parse_args(['-hh', '28', '-ww', '45', 'encode', '--start', '100', '--stop', '110',
+                               '-o', images_dir]))
+        run_decode(parse_args(['decode', images_dir, '-o', output, '-j', '1']))
+        with open(output) as f:
+            self.assertEqual(sorted(f.read().split()), sorted(f"{number}.pgm,{number}" for number in range(100, 110)))
+
+    def test_encode_file_to_archive(self):
+        numbers_path = os.path.join(self.temp_dir.name, 'numbers.txt')
+        archive = os.path.join(self.temp_dir.name, 'symbols.npy')
+        with open(numbers_path, 'w') as f:
+            f.write("5\n1993\n9999\n")
+        run_encode(parse_args(['encode', '-i', numbers_path, '-o', archive]))
+        np.testing.assert_array_equal(np.load(archive), get_atlas(DEFAULT_HEIGHT, DEFAULT_WIDTH).encode(
+            np.array([5, 1993, 9999])))
+
+    def test_decode_png(self):
+        images_dir = os.path.join(self.temp_dir.name, 'images')
+        run_encode(parse_args(['encode', '--start', '1990', '--stop', '1995', '-o', images_dir, '--format', 'png']))
+        output = os.path.join(self.temp_dir.name, 'decoded.csv')
+        run_decode(parse_args(['decode', images_dir, '-o', output, '-j', '1']))
+        with open(output) as f:
+            self.assertEqual(sorted(f.read().split()), [f"{number}.png,{number}" for number in range(1990, 1995)])
+
+    def test_archive_rejects_jobs(self):
+        with self.assertRaises(SystemExit), contextlib.redirect_stderr(io.StringIO()):
+            parse_args(['encode', '-o', 'symbols.npy', '-j', '2'])
+
+    def test_atlas_rejects_jobs(self):
+        for output in ['atlas.bin', 'sheet.svg']:
+            with self.assertRaises(SystemExit), contextlib.redirect_stderr(io.StringIO()):
+                parse_args(['atlas', '-o', output, '-j', '2'])
+        self.assertEqual(parse_args(['atlas', '-o', 'sheet.png', '-j', '2']).jobs, 2)
+
+    def test_atlas(self):
+        path = os.path.join(self.temp_dir.name, 'atlas.bin')
+        run_atlas(parse_args(['-hh', '7', '-ww', '5', 'atlas', '-o', path, '--packed']))
+        atlas = open_atlas_file(path, height=7, width=5)
+        self.assertTrue(atlas.packed)
+
+    def test_atlas_svg(self):
+        path = os.path.join(self.temp_dir.name, 'sheet.svg')
+        run_atlas(parse_args(['atlas', '-o', path, '--columns', '50']))
+        with open(path) as f:
+            self.assertEqual(f.read().count('<path '), 9999)
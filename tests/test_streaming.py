@@ -0,0 +1,85 @@
+import io
+import os
+import tempfile
+import unittest
+
+import numpy as np
+
+from symbol_generation.glyph_atlas import get_atlas
+from symbol_generation.streaming import read_number_chunks, write_number_chunks, write_symbol_chunks, \
+    read_symbol_chunks, encode_chunks, encode_stream, decode_stream
+
+
+class TestNumberChunks(unittest.TestCase):
+    def test_chunks(self):
+        chunks = list(read_number_chunks(io.StringIO("1\n2\n\n3\n4\n5\n"), chunk_size=2))
+        self.assertEqual([chunk.tolist() for chunk in chunks], [[1, 2], [3, 4], [5]])
+
+    def test_csv(self):
+        text = "id,name\n1993,a\n7,b\n"
+        chunks = list(read_number_chunks(io.StringIO(text), column=0, skip_header=True))
+        self.assertEqual(chunks[0].tolist(), [1993, 7])
+
+    def test_write(self):
+        output = io.StringIO()
+        self.assertEqual(write_number_chunks([np.array([1, 2]), np.array([], dtype=int), np.array([3])], output), 3)
+        self.assertEqual(output.getvalue(), "1\n2\n3\n")
+
+
+class TestSymbolChunks(unittest.TestCase):
+    def setUp(self) -> None:
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.atlas = get_atlas(7, 5)
+
+    def tearDown(self) -> None:
+        self.temp_dir.cleanup()
+
+    def test_npy(self):
+        path = os.path.join(self.temp_dir.name, 'symbols.npy')
+        chunks = list(encode_chunks([np.array([1, 2, 3]), np.array([1993])], self.atlas))
+        self.assertEqual(write_symbol_chunks(iter(chunks), path, symbol_shape=(7, 5), dtype=np.uint8), 4)
+        np.testing.assert_array_equal(np.load(path), self.atlas.encode(np.array([1, 2, 3, 1993])))
+
+        with open(path, 'rb') as f:
+            read_chunks = list(read_symbol_chunks(f, chunk_size=3))
+        self.assertEqual([len(chunk) for chunk in read_chunks], [3, 1])
+        np.testing.assert_array_equal(np.concatenate(read_chunks), np.load(path))
+
+    def test_empty_npy(self):
+        path = os.path.join(self.temp_dir.name, 'empty.npy')
+        self.assertEqual(write_symbol_chunks(iter([]), path, symbol_shape=(7, 5), dtype=np.uint8), 0)
+        self.assertEqual(np.load(path).shape, (0, 7, 5))
+
+    def test_raw(self):
+        path = os.path.join(self.temp_dir.name, 'symbols.raw')
+        write_symbol_chunks(encode_chunks([np.array([5, 6])], self.atlas), path, symbol_shape=(7, 5), dtype=np.uint8)
+        self.assertEqual(os.path.getsize(path), 2 * 7 * 5)
+        with open(path, 'rb') as f:
+            symbols = next(read_symbol_chunks(f, symbol_shape=(7, 5), dtype=np.uint8))
+        np.testing.assert_array_equal(symbols, self.atlas.encode(np.array([5, 6])))
+
+    def test_size_mismatch(self):
+        path = os.path.join(self.temp_dir.name, 'symbols.npy')
+        with self.assertRaisesRegex(AssertionError, "Size mismatch between symbols and stream"):
+            write_symbol_chunks(iter([np.zeros(shape=(1, 9, 9))]), path, symbol_shape=(7, 5), dtype=np.uint8)
+
+
+class TestStreams(unittest.TestCase):
+    def setUp(self) -> None:
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.atlas = get_atlas(17, 15)
+
+    def tearDown(self) -> None:
+        self.temp_dir.cleanup()
+
+    def test_round_trip(self):
+        numbers = np.random.default_rng(0).integers(0, 10000, size=1000)
+        for file_name, raw in [('symbols.npy', False), ('symbols.raw', True)]:
+            path = os.path.join(self.temp_dir.name, file_name)
+            input_file = io.StringIO('\n'.join(map(str, numbers)))
+            self.assertEqual(encode_stream(input_file, path, self.atlas, chunk_size=64), 1000)
+
+            output_file = io.StringIO()
+            with open(path, 'rb') as f:
+                self.assertEqual(decode_stream(f, output_file, self.atlas, chunk_size=100, raw=raw), 1000)
+            self.assertEqual(output_file.getvalue().split(), [str(number) for number in numbers])
@@ -0,0 +1,40 @@
+import unittest
+
+import numpy as np
+
+from symbol_generation.stroke_glyph import StrokeGlyph
+from symbol_generation.symbol_mapping import create_symbols
+from symbol_generation.translating_cistercian_symbols import arabic_to_cistercian, arabic_to_cistercian_batch
+
+
+class TestStrokeGlyph(unittest.TestCase):
+    def test_compose(self):
+        glyph = StrokeGlyph.from_number(1000) | StrokeGlyph.from_number(900) | StrokeGlyph.from_number(93)
+        self.assertEqual(glyph, StrokeGlyph.from_number(1993))
+        self.assertEqual(glyph.value, 1993)
+        self.assertEqual(glyph.order_used, [True, True, True, True])
+        self.assertEqual(StrokeGlyph.from_number(0), StrokeGlyph())
+
+    def test_hash(self):
+        glyphs = {StrokeGlyph.from_number(number % 100) for number in range(1000)}
+        self.assertEqual(len(glyphs), 100)
+        self.assertIn(StrokeGlyph.from_number(1) | StrokeGlyph.from_number(40), glyphs)
+
+    def test_compose_same_order(self):
+        with self.assertRaisesRegex(Exception, "both use order 0"):
+            StrokeGlyph.from_number(3) | StrokeGlyph.from_number(1995)
+
+    def test_not_a_number(self):
+        glyph = StrokeGlyph(StrokeGlyph.from_number(3).stroke_mask | StrokeGlyph.from_number(5).stroke_mask)
+        with self.assertRaisesRegex(Exception, "not a digit"):
+            glyph.value
+
+    def test_rasterize(self):
+        for height, width in [(7, 5), (64, 48)]:
+            np.testing.assert_array_equal(StrokeGlyph.from_number(6002).rasterize(height, width),
+                                          arabic_to_cistercian_batch(np.array([6002]), height, width)[0])
+
+    def test_to_cistercian_number(self):
+        mapping = create_symbols(symbol_height=17, symbol_width=15)
+        self.assertEqual(StrokeGlyph.from_number(2047).to_cistercian_number(17, 15),
+                         arabic_to_cistercian(2047, symbol_height=17, symbol_width=15, symbol_mapping=mapping))
@@ -0,0 +1,61 @@
+import unittest
+
+import numpy as np
+
+from symbol_generation.strokes import get_stroke_indices, number_to_stroke_mask, rasterize_stroke_mask, \
+    rasterize_stroke_masks, stroke_mask_to_number, stroke_bit, NUM_STROKES, CENTRAL_LINE, TOP_LINE, DIAGONAL_UP
+from symbol_generation.symbol_mapping import create_symbols
+from symbol_generation.translating_cistercian_symbols import arabic_to_cistercian_batch
+
+
+class TestStrokeMasks(unittest.TestCase):
+    def test_zero(self):
+        self.assertEqual(number_to_stroke_mask(0), 0)
+
+    def test_five(self):
+        expected = 1 << stroke_bit(0, CENTRAL_LINE) | 1 << stroke_bit(0, TOP_LINE) | 1 << stroke_bit(0, DIAGONAL_UP)
+        self.assertEqual(number_to_stroke_mask(5), expected)
+
+    def test_unique(self):
+        self.assertEqual(len(np.unique(number_to_stroke_mask(np.arange(10000)))), 10000)
+
+    def test_to_number(self):
+        np.testing.assert_array_equal(stroke_mask_to_number(number_to_stroke_mask(np.arange(10000))), np.arange(10000))
+        self.assertEqual(stroke_mask_to_number(number_to_stroke_mask(3) | number_to_stroke_mask(5)), -1)
+
+
+class TestStrokeIndices(unittest.TestCase):
+    def test_count(self):
+        self.assertEqual(len(get_stroke_indices(7, 5)), NUM_STROKES)
+
+    def test_central_line(self):
+        np.testing.assert_array_equal(get_stroke_indices(7, 5)[stroke_bit(0, CENTRAL_LINE)], np.arange(2, 35, 5))
+
+    def test_top_line(self):
+        np.testing.assert_array_equal(get_stroke_indices(7, 5)[stroke_bit(0, TOP_LINE)], [2, 3, 4])
+        np.testing.assert_array_equal(get_stroke_indices(7, 5)[stroke_bit(3, TOP_LINE)], [30, 31, 32])
+
+    def test_cached(self):
+        self.assertIs(get_stroke_indices(7, 5), get_stroke_indices(7, 5))
+
+
+class TestRasterizeStrokes(unittest.TestCase):
+    def test_matches_mapping_templates(self):
+        # even widths and heights that are not multiples of 3 flip to different pixels than the string-defined strokes
+        for height, width in [(7, 5), (4, 4), (14, 11), (17, 15), (8, 6), (256, 256)]:
+            mapping = create_symbols(symbol_height=height, symbol_width=width)
+            for value, symbol in mapping.items():
+                np.testing.assert_array_equal(
+                    rasterize_stroke_mask(number_to_stroke_mask(value), height, width), symbol.get_symbol())
+
+    def test_batch_matches_mapping_gather(self):
+        numbers = np.arange(0, 10000, 13)
+        for height, width in [(7, 5), (8, 6), (17, 15)]:
+            mapping = create_symbols(symbol_height=height, symbol_width=width)
+            np.testing.assert_array_equal(
+                rasterize_stroke_masks(number_to_stroke_mask(numbers), height, width),
+                arabic_to_cistercian_batch(numbers, symbol_height=height, symbol_width=width, symbol_mapping=mapping))
+
+    def test_dtype(self):
+        self.assertEqual(rasterize_stroke_masks(number_to_stroke_mask([1, 2]), 7, 5, dtype=bool).dtype, bool)
+        self.assertEqual(rasterize_stroke_mask(0, 7, 5).sum(), 0)
@@ -0,0 +1,51 @@
+import os
+import tempfile
+import unittest
+import xml.etree.ElementTree as ElementTree
+
+import numpy as np
+
+from symbol_generation.svg_rendering import get_template_path, get_number_path, symbol_to_svg, write_svg
+
+SVG_NAMESPACE = '{http://www.w3.org/2000/svg}'
+
+
+class TestPaths(unittest.TestCase):
+    def test_template_paths(self):
+        self.assertEqual(get_template_path(1, 0, height=90, width=60), 'M30 0L60 0')
+        self.assertEqual(get_template_path(1, 1, height=90, width=60), 'M30 0L0 0')
+        self.assertEqual(get_template_path(2, 2, height=90, width=60), 'M30 60L60 60')
+        self.assertEqual(get_template_path(6, 3, height=90, width=60), 'M0 90L0 60')
+        self.assertEqual(get_template_path(0, 3, height=90, width=60), '')
+
+    def test_templates_cached(self):
+        get_template_path.cache_clear()
+        for number in range(10000):
+            get_number_path(number, height=91, width=61)
+        self.assertEqual(get_template_path.cache_info().currsize, 40)  # 9 digits and 0 in each order
+
+    def test_number_path(self):
+        self.assertEqual(get_number_path(0), '')
+        self.assertEqual(get_number_path(11, height=90, width=60), 'M30 0L30 90M30 0L60 0M30 0L0 0')
+        self.assertEqual(get_number_path(5, height=90, width=60), 'M30 0L30 90M30 30L60 0M30 0L60 0')
+
+
+class TestSvgDocuments(unittest.TestCase):
+    def test_symbol_to_svg(self):
+        root = ElementTree.fromstring(symbol_to_svg(1993))
+        paths = root.iter(f'{SVG_NAMESPACE}path')
+        self.assertEqual([path.get('d') for path in paths], [get_number_path(1993)])
+
+    def test_write_svg(self):
+        numbers = np.arange(10000)
+        with tempfile.TemporaryDirectory() as temp_dir:
+            path = os.path.join(temp_dir, 'sheet.svg')
+            sheet_height, sheet_width = write_svg(numbers, path, height=14, width=10, columns=100, padding=5,
+                                                  chunk_size=999)
+            root = ElementTree.parse(path).getroot()
+        self.assertEqual((sheet_height, sheet_width), (100 * 19 + 5, 100 * 15 + 5))
+        self.assertEqual(root.get('viewBox'), f"0 0 {sheet_width} {sheet_height}")
+        paths = list(root.iter(f'{SVG_NAMESPACE}path'))
+        self.assertEqual(len(paths), 9999)  # the symbol of 0 is blank
+        self.assertEqual(paths[-1].get('transform'), 'translate(1490 1886)')
+        self.assertEqual(paths[-1].get('d'), get_number_path(9999, height=14, width=10))
@@ -89,6 +89,63 @@ class TestCistercianSymbol(unittest.TestCase):
         for val in [5, 70, 300, 6000, 0]:
             self.assertEqual(symbol_mapping[val].get_value(symbol_mapping), val)
 
+    def test_dtype(self):
+        self.assertEqual(CistercianSymbol(height=7, width=5).get_symbol().dtype, np.uint8)
+        self.assertEqual(CistercianSymbol(height=7, width=5, dtype=bool).get_symbol().dtype, bool)
+
+    def test_get_value_bool(self):
+        symbol_mapping = create_symbols(symbol_height=7, symbol_width=5, dtype=bool)
+        for val in [5, 70, 300, 6000, 0]:
+            self.assertEqual(symbol_mapping[val].get_value(symbol_mapping), val)
+
+    def test_copy(self):
+        symbol = CistercianSymbol(height=7, width=5)
+        copied = symbol.copy()
+        self.assertEqual(copied, symbol)
+        copied.add_horizontal_line(location_str=TOP, direction_str=RIGHT)
+        self.assertNotEqual(copied, symbol)
+        self.assertEqual(symbol.get_symbol().sum(), 7)
+
+    def test_freeze(self):
+        symbol = CistercianSymbol(height=7, width=5)
+        symbol.freeze()
+        with self.assertRaisesRegex(Exception, "Cannot modify a read-only"):
+            symbol.set_symbol(np.zeros(shape=(7, 5)))
+        with self.assertRaises(ValueError):
+            symbol.add_horizontal_line(location_str=TOP, direction_str=RIGHT)
+        copied = symbol.copy()
+        self.assertFalse(copied.frozen)
+        copied.add_horizontal_line(location_str=TOP, direction_str=RIGHT)
+
+    def test_hash(self):
+        symbol = CistercianSymbol(height=7, width=5)
+        same_symbol = CistercianSymbol(height=7, width=5)
+        self.assertEqual(hash(symbol), hash(same_symbol))
+        self.assertEqual(len({symbol, same_symbol, CistercianSymbol(height=7, width=3)}), 2)
+        self.assertNotEqual(symbol, 'symbol')
+
+    def test_digest_changes_with_symbol(self):
+        symbol = CistercianSymbol(height=7, width=5)
+        digest = symbol.digest()
+        symbol.add_horizontal_line(location_str=TOP, direction_str=RIGHT)
+        self.assertNotEqual(symbol.digest(), digest)
+        self.assertEqual(symbol.fliplr().digest(), symbol.fliplr().digest())
+        self.assertNotEqual(symbol.fliplr().digest(), symbol.digest())
+        symbol.set_symbol(CistercianSymbol(height=7, width=5).get_symbol())
+        self.assertEqual(symbol.digest(), digest)
+        self.assertEqual(symbol, CistercianSymbol(height=7, width=5))
+
+    def test_flips_are_copies(self):
+        symbol = CistercianSymbol(height=7, width=5)
+        symbol.add_horizontal_line(location_str=TOP, direction_str=RIGHT)
+        flipped_lr, flipped_ud = symbol.fliplr(), symbol.flipud()
+        np.testing.assert_array_equal(flipped_lr.get_symbol(), np.fliplr(symbol.get_symbol()))
+        np.testing.assert_array_equal(flipped_ud.get_symbol(), np.flipud(symbol.get_symbol()))
+        flipped_lr.add_horizontal_line(location_str=TOP_THIRD, direction_str=RIGHT)
+        flipped_ud.add_horizontal_line(location_str=TOP_THIRD, direction_str=RIGHT)
+        self.assertEqual(symbol.get_symbol().sum(), 9)
+        self.assertEqual((symbol.third_height, symbol.mid_width), (flipped_lr.third_height, flipped_lr.mid_width))
+
     def test_equal(self):
         symbol_1 = CistercianSymbol(height=7, width=5)
         symbol_1.add_horizontal_line(location_str=TOP, direction_str=RIGHT)
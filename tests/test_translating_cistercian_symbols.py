@@ -4,7 +4,8 @@ import numpy as np
 from symbol_generation.symbol_classes import CistercianSymbol
 from symbol_generation.symbol_mapping import create_symbols
 from symbol_generation.translating_cistercian_symbols import CistercianNumber, SYMBOL_WIDTH, SYMBOL_HEIGHT, \
-    arabic_to_cistercian, cistercian_to_arabic, _validate_cistercian_number_size
+    arabic_to_cistercian, cistercian_to_arabic, _validate_cistercian_number_size, \
+    arabic_to_cistercian_batch, cistercian_to_arabic_batch, cistercian_to_arabic_tolerant, clear_interned_numbers
 
 SYMBOL_MAPPING = create_symbols(symbol_height=7, symbol_width=5)
 
@@ -285,6 +286,116 @@ class TestArabicToCistercian(unittest.TestCase):
             arabic_to_cistercian(5.3)
 
 
+class TestHashCistercianNumber(unittest.TestCase):
+    def test_dedup(self):
+        numbers = [arabic_to_cistercian(number % 100, symbol_mapping=SYMBOL_MAPPING) for number in range(1000)]
+        self.assertEqual(len(set(numbers)), 100)
+        counts = {}
+        for cistercian in numbers:
+            counts[cistercian] = counts.get(cistercian, 0) + 1
+        self.assertEqual(counts[arabic_to_cistercian(42)], 10)
+
+    def test_hash_follows_changes(self):
+        cistercian = arabic_to_cistercian(993)
+        cistercian.add_symbol(SYMBOL_MAPPING[1000], SYMBOL_MAPPING)
+        self.assertEqual(hash(cistercian), hash(arabic_to_cistercian(1993)))
+        self.assertEqual(cistercian, arabic_to_cistercian(1993))
+        self.assertNotEqual(cistercian, 1993)
+
+
+class TestInternedNumbers(unittest.TestCase):
+    def setUp(self) -> None:
+        clear_interned_numbers()
+
+    def test_shared(self):
+        cistercian = arabic_to_cistercian(1993, intern=True)
+        self.assertIs(arabic_to_cistercian(1993, intern=True), cistercian)
+        self.assertEqual(cistercian, arabic_to_cistercian(1993))
+        other_size = arabic_to_cistercian(1993, symbol_height=17, symbol_width=15,
+                                          symbol_mapping=create_symbols(symbol_height=17, symbol_width=15), intern=True)
+        self.assertEqual(other_size.get_symbol().shape, (17, 15))
+        self.assertIsNot(arabic_to_cistercian(1993), cistercian)
+
+    def test_read_only(self):
+        cistercian = arabic_to_cistercian(1993, intern=True)
+        self.assertTrue(cistercian.frozen)
+        with self.assertRaises(ValueError):
+            cistercian.get_symbol()[0, 0] = 1
+        with self.assertRaisesRegex(Exception, "Cannot add a symbol to a read-only"):
+            cistercian.add_symbol(SYMBOL_MAPPING[5000], SYMBOL_MAPPING)
+        with self.assertRaisesRegex(Exception, "Cannot modify a read-only"):
+            cistercian.set_symbol(np.zeros(shape=(7, 5)))
+
+    def test_copy_is_mutable(self):
+        copied = arabic_to_cistercian(993, intern=True).copy()
+        self.assertFalse(copied.frozen)
+        copied.add_symbol(SYMBOL_MAPPING[1000], SYMBOL_MAPPING)
+        self.assertEqual(copied, arabic_to_cistercian(1993))
+        self.assertEqual(arabic_to_cistercian(993, intern=True).value, 993)
+
+    def test_bounded(self):
+        from symbol_generation import translating_cistercian_symbols
+        for number in range(translating_cistercian_symbols.MAX_INTERNED_NUMBERS + 10):
+            arabic_to_cistercian(number, intern=True)
+        self.assertEqual(len(translating_cistercian_symbols._INTERNED_NUMBERS),
+                         translating_cistercian_symbols.MAX_INTERNED_NUMBERS)
+
+
+class TestDefaultMapping(unittest.TestCase):
+    def test_symbol_mapping_attribute(self):
+        from symbol_generation import translating_cistercian_symbols
+        self.assertIs(translating_cistercian_symbols.SYMBOL_MAPPING,
+                      translating_cistercian_symbols.get_default_symbol_mapping())
+        self.assertEqual(translating_cistercian_symbols.SYMBOL_MAPPING[3], SYMBOL_MAPPING[3])
+
+
+class TestCompactDtypes(unittest.TestCase):
+    def test_uint8_by_default(self):
+        self.assertEqual(arabic_to_cistercian(1993).get_symbol().dtype, np.uint8)
+
+    def test_bool(self):
+        mapping = create_symbols(symbol_height=7, symbol_width=5, dtype=bool)
+        cistercian = arabic_to_cistercian(1735, symbol_mapping=mapping)
+        self.assertEqual(cistercian.get_symbol().dtype, bool)
+        np.testing.assert_array_equal(cistercian.get_symbol(), arabic_to_cistercian(1735).get_symbol())
+        self.assertEqual(cistercian_to_arabic(cistercian, mapping), 1735)
+        self.assertEqual(cistercian_to_arabic_batch(cistercian.get_symbol()[None], mapping), [1735])
+
+        expected_number = CistercianNumber(height=SYMBOL_HEIGHT, width=SYMBOL_WIDTH, dtype=bool)
+        for value in [1000, 700, 30, 5]:
+            expected_number.add_symbol(mapping[value], mapping)
+        self.assertEqual(expected_number, cistercian)
+
+
+class TestArabicToCistercianBatch(unittest.TestCase):
+    def test_matches_single_conversion(self):
+        numbers = np.array([0, 1, 9, 10, 99, 100, 1000, 1993, 2047, 6002, 9999] + list(range(3, 10000, 397)))
+        symbols = arabic_to_cistercian_batch(numbers)
+        self.assertEqual(symbols.shape, (len(numbers), SYMBOL_HEIGHT, SYMBOL_WIDTH))
+        for number, symbol in zip(numbers, symbols):
+            np.testing.assert_array_equal(symbol, arabic_to_cistercian(int(number)).get_symbol())
+
+    def test_other_size(self):
+        mapping = create_symbols(symbol_height=17, symbol_width=15)
+        numbers = np.array([5, 1730, 8888])
+        symbols = arabic_to_cistercian_batch(numbers, symbol_height=17, symbol_width=15)
+        for number, symbol in zip(numbers, symbols):
+            expected = arabic_to_cistercian(int(number), symbol_height=17, symbol_width=15, symbol_mapping=mapping)
+            np.testing.assert_array_equal(symbol, expected.get_symbol())
+
+    def test_empty(self):
+        symbols = arabic_to_cistercian_batch(np.array([], dtype=int))
+        self.assertEqual(symbols.shape, (0, SYMBOL_HEIGHT, SYMBOL_WIDTH))
+
+    def test_number_out_of_range(self):
+        with self.assertRaisesRegex(AssertionError, "Number out of range"):
+            arabic_to_cistercian_batch(np.array([5, 10342]))
+
+    def test_number_not_an_int(self):
+        with self.assertRaisesRegex(AssertionError, "Unsupported input, only int arrays supported"):
+            arabic_to_cistercian_batch(np.array([5.3]))
+
+
 class TestCistercianToArabic(unittest.TestCase):
     def test_1_symbol(self):
         # single symbol - 1000
@@ -406,6 +517,69 @@ class TestCistercianToArabic(unittest.TestCase):
         self.assertEqual(expected_arabic, arabic)
 
 
+class TestCistercianToArabicBatch(unittest.TestCase):
+    def test_round_trip(self):
+        numbers = np.arange(10000)
+        symbols = arabic_to_cistercian_batch(numbers)
+        np.testing.assert_array_equal(cistercian_to_arabic_batch(symbols, SYMBOL_MAPPING), numbers)
+
+    def test_matches_single_conversion(self):
+        # 1000 is contained in 9000, the larger overlap should be taken
+        numbers = [1000, 9000, 1735, 1030, 0]
+        symbols = np.stack([arabic_to_cistercian(number).get_symbol() for number in numbers])
+        expected = [cistercian_to_arabic(arabic_to_cistercian(number), SYMBOL_MAPPING) for number in numbers]
+        np.testing.assert_array_equal(cistercian_to_arabic_batch(symbols, SYMBOL_MAPPING), expected)
+
+    def test_other_size(self):
+        mapping = create_symbols(symbol_height=17, symbol_width=15)
+        numbers = np.array([5, 1730, 8888, 9000])
+        symbols = arabic_to_cistercian_batch(numbers, symbol_height=17, symbol_width=15, symbol_mapping=mapping)
+        np.testing.assert_array_equal(cistercian_to_arabic_batch(symbols, mapping), numbers)
+
+    def test_size_mismatch(self):
+        with self.assertRaisesRegex(AssertionError, "Size mismatch between symbol and mapping"):
+            cistercian_to_arabic_batch(np.zeros(shape=(3, 50, 50)), SYMBOL_MAPPING)
+
+
+class TestCistercianToArabicTolerant(unittest.TestCase):
+    def test_exact_symbols(self):
+        numbers = np.arange(10000)
+        values, confidences = cistercian_to_arabic_tolerant(arabic_to_cistercian_batch(numbers), SYMBOL_MAPPING)
+        np.testing.assert_array_equal(values, numbers)
+        np.testing.assert_array_equal(confidences, np.ones(shape=(10000, 4)))
+
+    def test_missing_pixel(self):
+        mapping = create_symbols(symbol_height=17, symbol_width=15)
+        symbols = arabic_to_cistercian_batch(np.array([1000]), symbol_height=17, symbol_width=15)
+        symbols[0, 16, 0] = 0  # first pixel of the bottom line of 1000
+        self.assertEqual(cistercian_to_arabic_batch(symbols, mapping), [0])  # exact containment loses the stroke
+
+        values, confidences = cistercian_to_arabic_tolerant(symbols, mapping)
+        np.testing.assert_array_equal(values, [1000])
+        self.assertLess(confidences[0, 3], 1)
+        np.testing.assert_array_equal(confidences[0, :3], [1, 1, 1])
+
+    def test_noisy_symbols(self):
+        mapping = create_symbols(symbol_height=64, symbol_width=48)
+        numbers = np.random.default_rng(0).integers(0, 10000, size=500)
+        symbols = arabic_to_cistercian_batch(numbers, symbol_height=64, symbol_width=48).astype(float)
+        symbols = np.abs(symbols - (np.random.default_rng(1).random(size=symbols.shape) < 0.05))
+        values, _ = cistercian_to_arabic_tolerant(symbols, mapping)
+        np.testing.assert_array_equal(values, numbers)
+
+    def test_indistinct_candidates(self):
+        numbers = np.arange(10000)
+        mapping = create_symbols(symbol_height=6, symbol_width=4)  # too small, some digits are the same strokes
+        values, confidences = cistercian_to_arabic_tolerant(arabic_to_cistercian_batch(numbers, 6, 4), mapping)
+        is_confident = (confidences > 0).all(axis=1)
+        self.assertTrue((~is_confident).any())
+        np.testing.assert_array_equal(values[is_confident], numbers[is_confident])
+
+    def test_size_mismatch(self):
+        with self.assertRaisesRegex(AssertionError, "Size mismatch between symbol and mapping"):
+            cistercian_to_arabic_tolerant(np.zeros(shape=(3, 50, 50)), SYMBOL_MAPPING)
+
+
 class TestValidateCistercianNumberSize(unittest.TestCase):
     def test_validate_cistercian_number_size(self):
         number = CistercianNumber(height=50, width=50)